@@ -0,0 +1,89 @@
+"""Spawn calibration benchmark: plain-list ladder vs. indexed EloLadder.
+
+Run from the project root:
+    python -m benchmarks.calibration_bench
+    python -m benchmarks.calibration_bench --monsters 300 --fights 100
+
+Loads the ladder from monster_elo_ratings.json, rolls spawn-like monsters
+and times calibrate_instance_elo against the same fighters held two ways:
+a plain list (linear closest-Elo scans, per-fight duel_stats) and the
+EloLadder load_elo_ladder returns (bisect, prebuilt stats). With a duel
+table (--table) most fights are lookups, so the ladder work dominates.
+Ratings are checked for equality first.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import random
+import time
+
+from duel_table import DuelTable, build_duel_table, load_duel_table
+from monster import Monster
+from monster_elo import EloLadder, calibrate_instance_elo, reload_elo_ladder
+from monster_types.registry import MONSTER_TYPES
+
+
+def build_monsters(count, seed):
+    rng = random.Random(seed)
+    type_ids = sorted(t for t, d in MONSTER_TYPES.items() if d.spawn_weight > 0)
+    monsters = []
+    for n in range(count):
+        type_id = rng.choice(type_ids)
+        level = rng.randint(1, MONSTER_TYPES[type_id].max_level)
+        monsters.append(Monster.from_type(type_id, [0, 0], monster_id=f'b{n}', level=level, rng=rng))
+    return monsters
+
+
+def _time(monsters, ladder, fights, table, seed):
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    ratings = [
+        calibrate_instance_elo(copy.copy(m), fights=fights, rng=rng, ladder=ladder, table=table)
+        for m in monsters
+    ]
+    return time.perf_counter() - start, ratings
+
+
+def run(monsters=200, fights=100, seed=1, table_path=None, full_table=False):
+    indexed = reload_elo_ladder()
+    if not indexed:
+        raise SystemExit('monster_elo_ratings.json has no ladder; run monster_elo.py first')
+    plain = list(indexed)
+    spawned = build_monsters(monsters, seed)
+    if full_table:
+        table = build_duel_table(list(indexed) + spawned)
+    elif table_path:
+        table = load_duel_table(table_path, force=True)
+    else:
+        table = DuelTable()
+
+    old_s, old_ratings = _time(spawned, plain, fights, table, seed)
+    new_s, new_ratings = _time(spawned, indexed, fights, table, seed)
+    if old_ratings != new_ratings:
+        raise AssertionError('plain and indexed ladders disagree')
+    mode = f'table ({len(table):,} matchups)' if len(table) else 'simulated fights'
+    print(f'{monsters} calibrations x {fights} fights, ladder of {len(indexed)}, {mode}')
+    print(f'  plain list:  {monsters / old_s:10.1f} calibrations/s')
+    print(f'  EloLadder:   {monsters / new_s:10.1f} calibrations/s')
+    print(f'  speedup: {old_s / new_s:.2f}x')
+    return {'plain_s': old_s, 'indexed_s': new_s}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--monsters', type=int, default=200)
+    parser.add_argument('--fights', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--table', type=str, default=None, help='duel_table.py JSON to use')
+    parser.add_argument(
+        '--full-table', action='store_true',
+        help='build a duel table for exactly these monsters first (all lookups)',
+    )
+    args = parser.parse_args(argv)
+    run(args.monsters, args.fights, args.seed, args.table, args.full_table)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""FOV micro-benchmark: recursive shadowcaster vs. bitmap shadowcaster.
+
+Run from the project root:
+    python -m benchmarks.fov_bench
+    python -m benchmarks.fov_bench --levels 10 --samples 500 --radius 20
+
+Generates dungeon levels with MapGenerator, picks random floor origins and
+times compute_fov_recursive (set of tuples) against compute_fov (FovMask),
+both on the same TileGrid, so the difference is the algorithm rather than
+how the map is stored. Results are checked for equality first.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from map_generator import MapGenerator
+from tile_grid import TileGrid
+from visibility import OPEN_GROUND, compute_fov, compute_fov_recursive
+
+
+def build_cases(levels, samples, seed):
+    """[(list map, TileGrid, origins)] for `levels` generated dungeons."""
+    random.seed(seed)
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(levels):
+        rows, _monsters = MapGenerator().generate_level()
+        floors = [
+            (y, x) for y, row in enumerate(rows) for x, cell in enumerate(row)
+            if cell in OPEN_GROUND
+        ]
+        origins = [rng.choice(floors) for _ in range(samples)]
+        cases.append((rows, TileGrid.from_rows(rows), origins))
+    return cases
+
+
+def _time(fn, cases, radius):
+    start = time.perf_counter()
+    tiles = 0
+    for _rows, grid, origins in cases:
+        for origin in origins:
+            tiles += len(fn(grid, origin, radius))
+    return time.perf_counter() - start, tiles
+
+
+def run(levels=5, samples=200, radius=8, seed=1):
+    cases = build_cases(levels, samples, seed)
+    for rows, grid, origins in cases:
+        for origin in origins[:20]:
+            if set(compute_fov(grid, origin, radius)) != compute_fov_recursive(grid, origin, radius):
+                raise AssertionError(f"FOV mismatch at {origin} (radius {radius})")
+
+    calls = levels * samples
+    old_s, old_tiles = _time(compute_fov_recursive, cases, radius)
+    new_s, new_tiles = _time(compute_fov, cases, radius)
+    print(f"{calls} FOV calls, radius {radius}, {levels} levels (TileGrid)")
+    print(f"  recursive: {old_s * 1e6 / calls:8.1f} us/call  ({old_tiles} tiles)")
+    print(f"  bitmap:    {new_s * 1e6 / calls:8.1f} us/call  ({new_tiles} tiles)")
+    print(f"  speedup: {old_s / new_s:.2f}x")
+    return {'calls': calls, 'recursive_s': old_s, 'bitmap_s': new_s}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--levels', type=int, default=5)
+    parser.add_argument('--samples', type=int, default=200, help='origins per level')
+    parser.add_argument('--radius', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+    run(args.levels, args.samples, args.radius, args.seed)
+
+
+if __name__ == '__main__':
+    main()
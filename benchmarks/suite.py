@@ -0,0 +1,313 @@
+"""Seeded benchmark suite for the server hot paths, with a baseline check.
+
+Run from the project root:
+    python -m benchmarks.suite
+    python -m benchmarks.suite --filter game_state --repeat 9
+    python -m benchmarks.suite --json > results.json
+    python -m benchmarks.suite --save benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 0.25
+
+Every case builds its inputs from --seed, runs once to warm up, then takes
+--repeat samples. A sample is one call of the case's body covering `ops`
+operations (FOV calls, frames, rounds, fights...); results are microseconds
+per operation, median and min over the samples.
+
+With --baseline, a case whose fastest sample (--stat min_us, or median_us)
+is more than --threshold (a fraction, 0.25 = 25%) slower than the stored
+one is a regression and the run exits 1. Baselines are machine-specific: --save one on the box you compare on.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from camera import MAX_VIEWPORT
+
+DEFAULT_REPEAT = 7
+DEFAULT_THRESHOLD = 0.25
+# Fastest sample: the least disturbed by other load on a shared box.
+DEFAULT_STAT = 'min_us'
+VIEWPORTS = ((21, 35), (41, 61), (MAX_VIEWPORT, MAX_VIEWPORT))
+ROUND_MONSTERS = (10, 50, 100, 500)
+ROUND_PLAYERS = 4
+
+CASES = {}
+
+
+def case(name):
+    """
+    Register setup(seed) under name. setup returns (body, ops) or
+    (body, ops, reset), where reset runs untimed before every sample; None
+    skips the case.
+    """
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def _game_with_players(seed, level, count=1):
+    """A GameState with `count` players placed on `level` (0 = town)."""
+    from dungeon_crawler import GameState
+
+    random.seed(seed)
+    game = GameState()
+    game.ensure_level(level)
+    pids = []
+    for n in range(count):
+        pid = f'bench{n}'
+        game.add_player(pid)
+        player = game.players[pid]
+        player.dungeon_level = level
+        player.pos = game.find_random_start(level)
+        game.update_interest(player)
+        game.recompute_visibility(player)
+        pids.append(pid)
+    return game, pids
+
+
+def _populate(game, level, count, rng):
+    """Replace level's monsters with `count` of them on random floor tiles."""
+    from monster import Monster
+    from monster_types.registry import MONSTER_TYPES
+
+    game_map, monsters = game.ensure_level(level)
+    for y, x in list(monsters):
+        if game_map[y][x] == '&':
+            game_map[y][x] = '.'
+    monsters.clear()
+    occupied = {tuple(p.pos) for p in game.players_on_level(level).values()}
+    floors = [
+        (y, x) for y in range(len(game_map)) for x in range(len(game_map[0]))
+        if game_map[y][x] == '.' and (y, x) not in occupied
+    ]
+    type_ids = sorted(t for t, d in MONSTER_TYPES.items() if d.spawn_weight > 0)
+    for n, (y, x) in enumerate(rng.sample(floors, min(count, len(floors)))):
+        monster = Monster.from_type(rng.choice(type_ids), [y, x], monster_id=f'bench-{n}', rng=rng)
+        monsters[(y, x)] = monster
+        game_map[y][x] = '&'
+    game.touch_world()
+
+
+@case('fov.compute_fov.r8')
+def _fov(seed):
+    from benchmarks.fov_bench import build_cases
+    from visibility import compute_fov
+
+    cases = build_cases(levels=2, samples=100, seed=seed)
+
+    def body():
+        for _rows, grid, origins in cases:
+            for origin in origins:
+                compute_fov(grid, origin, 8)
+    return body, sum(len(origins) for _r, _g, origins in cases)
+
+
+def _game_state_case(level, vh, vw):
+    def setup(seed):
+        game, (pid,) = _game_with_players(seed, level)
+        game.viewports[pid] = (vh, vw)
+
+        frames = 20
+
+        def body():
+            for _ in range(frames):
+                game.get_game_state(pid)
+        return body, frames
+    return setup
+
+
+for _vh, _vw in VIEWPORTS:
+    case(f'game_state.fog.{_vh}x{_vw}')(_game_state_case(1, _vh, _vw))
+    case(f'game_state.lit.{_vh}x{_vw}')(_game_state_case(0, _vh, _vw))
+
+
+@case('map.generate_level')
+def _generate_level(seed):
+    from map_generator import MapGenerator
+
+    generator = MapGenerator()
+
+    def body():
+        random.seed(seed)
+        generator.generate_level()
+    return body, 1
+
+
+def _round_case(count):
+    def setup(seed):
+        from monster_ai import run_monster_round_for_level
+
+        rounds = 5
+        world = {}
+
+        def reset():
+            # Rounds move monsters toward the players: start every sample
+            # from the same seeded level.
+            game, _pids = _game_with_players(seed, 1, ROUND_PLAYERS)
+            _populate(game, 1, count, random.Random(seed))
+            world['game'] = game
+            random.seed(seed)
+
+        def body():
+            for _ in range(rounds):
+                run_monster_round_for_level(world['game'], 1, None, None, broadcast=False)
+        return body, rounds, reset
+    return setup
+
+
+for _count in ROUND_MONSTERS:
+    case(f'monster_round.{_count}')(_round_case(_count))
+
+
+@case('elo.calibrate_instance_elo')
+def _calibrate(seed):
+    from benchmarks.calibration_bench import build_monsters
+    from duel_table import DuelTable
+    from monster_elo import SPAWN_ELO_FIGHTS, calibrate_instance_elo, reload_elo_ladder
+
+    ladder = reload_elo_ladder()
+    if not ladder:
+        return None  # no monster_elo_ratings.json
+    monsters = build_monsters(10, seed)
+    table = DuelTable()  # simulate every fight; the bundled table would skip them
+
+    def body():
+        rng = random.Random(seed)
+        for monster in monsters:
+            calibrate_instance_elo(monster, fights=SPAWN_ELO_FIGHTS, rng=rng, ladder=ladder, table=table)
+    return body, len(monsters)
+
+
+@case('elo.simulate_monster_fight')
+def _fight(seed):
+    from benchmarks.calibration_bench import build_monsters
+    from monster_elo import simulate_monster_fight
+
+    monsters = build_monsters(40, seed)
+    pairs = list(zip(monsters[::2], monsters[1::2]))
+
+    def body():
+        rng = random.Random(seed)
+        for a, b in pairs:
+            simulate_monster_fight(a, b, first_is_a=rng.random() < 0.5, rng=rng)
+    return body, len(pairs)
+
+
+def measure(setup, seed, repeat):
+    """{'ops', 'median_us', 'min_us', 'samples'} or None if setup skips."""
+    prepared = setup(seed)
+    if prepared is None:
+        return None
+    body, ops = prepared[:2]
+    reset = prepared[2] if len(prepared) > 2 else None
+    if reset is not None:
+        reset()
+    body()  # warm caches and lazy imports
+    samples = []
+    for _ in range(repeat):
+        if reset is not None:
+            reset()
+        gc.collect()
+        start = time.perf_counter()
+        body()
+        samples.append((time.perf_counter() - start) * 1e6 / ops)
+    return {
+        'ops': ops,
+        'median_us': round(statistics.median(samples), 3),
+        'min_us': round(min(samples), 3),
+        'samples': len(samples),
+    }
+
+
+def run(names=None, seed=1, repeat=DEFAULT_REPEAT, echo=None):
+    """Run the named cases (all by default); returns the results document."""
+    results = {}
+    skipped = []
+    for name in names or CASES:
+        result = measure(CASES[name], seed, repeat)
+        if result is None:
+            skipped.append(name)
+            continue
+        results[name] = result
+        if echo is not None:
+            echo(f"  {name:<32} {result['median_us']:12.1f} us  (min {result['min_us']:.1f}, x{result['ops']})")
+    return {
+        'meta': {
+            'seed': seed,
+            'repeat': repeat,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+        'skipped': skipped,
+    }
+
+
+def compare(document, baseline, threshold=DEFAULT_THRESHOLD, stat=DEFAULT_STAT):
+    """[(name, baseline_us, now_us, ratio)] for cases over threshold."""
+    regressions = []
+    stored = baseline.get('results', {})
+    for name, result in document['results'].items():
+        before = stored.get(name)
+        if not before or before[stat] <= 0:
+            continue
+        ratio = result[stat] / before[stat]
+        if ratio > 1 + threshold:
+            regressions.append((name, before[stat], result[stat], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--filter', action='append', default=[], help='only cases containing this text')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--json', action='store_true', help='print the results document')
+    parser.add_argument('--save', type=str, default=None, help='write results as a baseline file')
+    parser.add_argument('--baseline', type=str, default=None, help='compare against this baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--stat', choices=('min_us', 'median_us'), default=DEFAULT_STAT)
+    parser.add_argument('--list', action='store_true')
+    args = parser.parse_args(argv)
+    if args.list:
+        print('\n'.join(CASES))
+        return 0
+    names = [n for n in CASES if not args.filter or any(f in n for f in args.filter)]
+    echo = None if args.json else print
+    if echo:
+        print(f'{len(names)} cases, seed {args.seed}, {args.repeat} samples each (median us/op)')
+    document = run(names, args.seed, args.repeat, echo)
+    if args.save:
+        Path(args.save).write_text(json.dumps(document, indent=2) + '\n', encoding='utf-8')
+    regressions = []
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        regressions = compare(document, baseline, args.threshold, args.stat)
+        document['regressions'] = [
+            {'name': n, 'baseline_us': b, 'median_us': m, 'ratio': round(r, 3)}
+            for n, b, m, r in regressions
+        ]
+    if args.json:
+        print(json.dumps(document, indent=2))
+    elif args.baseline:
+        if regressions:
+            print(f'Regressions over {args.threshold:.0%}:')
+            for name, before, now, ratio in regressions:
+                print(f'  {name:<32} {before:12.1f} -> {now:.1f} us  ({ratio:.2f}x)')
+        else:
+            print(f'No regressions over {args.threshold:.0%} against {args.baseline}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
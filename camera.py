@@ -149,6 +149,9 @@ def pan_camera(prev_cam, dcam_y, dcam_x, player_pos, map_h, map_w,
 
 def slice_map(game_map, cam_y, cam_x, vh=VIEWPORT_H, vw=VIEWPORT_W, oob='#'):
     """Return an exact vh×vw viewport slice; out-of-bounds cells are `oob`."""
+    if hasattr(game_map, 'glyph_row'):
+        # TileGrid: one decoded row slice per viewport row
+        return game_map.slice(cam_y, cam_x, vh, vw, oob)
     h = len(game_map)
     w = len(game_map[0]) if h else 0
     rows = []
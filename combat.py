@@ -5,7 +5,9 @@ from monster import Monster
 from combat_damage import resolve_attack
 from combat_elo import apply_elo_outcome
 from player_xp import calculate_xp_from_elo
+from interest import context_key
 import uuid
+from contextlib import nullcontext
 
 TURN_TIMEOUT_SECONDS = 20
 MONSTER_TURN_DELAY_SECONDS = 1  # pause before monster acts after another turn
@@ -17,6 +19,7 @@ class CombatSystem:
         self.game_state = game_state
         self.socketio = socketio
         self.battles = {}  # Dictionary to store battle instances by battle_id
+        self.live_timers = 0  # sleeping turn / pause background tasks
 
     def _emit(self, event, data=None, room=None):
         """Emit via SocketIO so background turn timers work outside request context"""
@@ -24,6 +27,27 @@ class CombatSystem:
             self.socketio.emit(event, room=room)
         else:
             self.socketio.emit(event, data, room=room)
+
+    def _start_timer(self, fn, *args):
+        """Run fn(*args) as a background task, counted in live_timers."""
+        self.live_timers = getattr(self, 'live_timers', 0) + 1
+
+        def run():
+            try:
+                fn(*args)
+            finally:
+                self.live_timers -= 1
+
+        self.socketio.start_background_task(run)
+
+    def _emit_game_state(self, player_id):
+        """Push a player's next frame (full game_state or a delta when supported)."""
+        encode = getattr(self.game_state, 'state_update_for', None)
+        if encode is None:
+            event, data = 'game_state', self.game_state.get_game_state(player_id)
+        else:
+            event, data = encode(player_id)
+        self._emit(event, data, room=player_id)
     
     def start_combat(self, attacker_id, defender_id, emit_game_state=True):
         """Initialize combat between two entities (players or monsters)"""
@@ -143,7 +167,7 @@ class CombatSystem:
         self._start_turn_timer(battle, attacker_id)
         
         if emit_game_state:
-            self._update_all_players()
+            self._update_observers(battle['participants'])
         
         return battle_id
     
@@ -167,7 +191,7 @@ class CombatSystem:
             self._send_combat_start(participant_id, battle)
         
         if emit_game_state:
-            self._update_all_players()
+            self._update_observers(battle['participants'])
         
         return battle_id
     
@@ -292,7 +316,7 @@ class CombatSystem:
                 'player_id': player_id,
                 'action': 'item',
             }, room=p_id)
-            self._emit('game_state', self.game_state.get_game_state(p_id), room=p_id)
+            self._emit_game_state(p_id)
 
         if battle['status'] == 'active':
             self._cancel_turn_timer(battle)
@@ -479,7 +503,7 @@ class CombatSystem:
         token = str(uuid.uuid4())
         battle['turn_token'] = token
         # Use SocketIO background task so it runs on the server event loop
-        self.socketio.start_background_task(
+        self._start_timer(
             self._turn_timer_expire,
             battle['battle_id'],
             player_id,
@@ -591,7 +615,7 @@ class CombatSystem:
                 return
             self._handle_monster_turn(monster_id, current)
 
-        self.socketio.start_background_task(run_monster_turn)
+        self._start_timer(run_monster_turn)
 
     def _handle_player_turn(self, player_id, battle):
         """Send turn notification to a player and start the forfeit timer"""
@@ -786,7 +810,7 @@ class CombatSystem:
 
         # Pass 2: map/stats after FX
         for p_id in participants:
-            self._emit('game_state', self.game_state.get_game_state(p_id), room=p_id)
+            self._emit_game_state(p_id)
 
     def _broadcast_monster_hit(self, battle, monster, target_id, attack_result):
         """Emit monster hit FX to all participants, then game_state."""
@@ -830,7 +854,7 @@ class CombatSystem:
             self._emit('combat_update', update, room=p_id)
 
         for p_id in participants:
-            self._emit('game_state', self.game_state.get_game_state(p_id), room=p_id)
+            self._emit_game_state(p_id)
 
     def _send_defend_update(self, player_id, battle, defender_id):
         """Send a combat update to a player after a defend action"""
@@ -846,7 +870,7 @@ class CombatSystem:
             action='defend', defender_id=defender_display
         )
         self._emit('combat_update', update, room=player_id)
-        self._emit('game_state', self.game_state.get_game_state(player_id), room=player_id)
+        self._emit_game_state(player_id)
     
     def _get_combatants_status(self, battle):
         """Get the status of all combatants in a battle"""
@@ -931,6 +955,7 @@ class CombatSystem:
             killer_id,
             f"Elo {delta_txt} (now {new_elo:.0f}).",
         )
+        self._record_player(killer)
         
         # Remove monster from battle
         battle['monsters'].remove(monster)
@@ -975,9 +1000,9 @@ class CombatSystem:
                 if current.get('status') == 'ending':
                     current['status'] = 'active'
                     self._advance_turn(current)
-            self._update_all_players()
+            self._update_observers(participants)
 
-        self.socketio.start_background_task(finish_after_pause)
+        self._start_timer(finish_after_pause)
     
     def _handle_player_death(self, player_id, battle, killer_id=None, killer_monster=None):
         """Handle a player's death in combat. killer_id set for PvP kills."""
@@ -985,6 +1010,7 @@ class CombatSystem:
         
         # Store player position before removal
         player_position = tuple(player.pos)
+        dead_context = context_key(player)
         dead_name = player.id
 
         # Elo: PvP kill or monster kill (before the dead player is removed)
@@ -1027,6 +1053,9 @@ class CombatSystem:
         game_map, _ = self.game_state.ensure_level(player.dungeon_level)
         if game_map[player_position[0]][player_position[1]] not in ('#', '↓', '↑'):
             game_map[player_position[0]][player_position[1]] = '.'
+        touch_world = getattr(self.game_state, 'touch_world', None)
+        if touch_world is not None:
+            touch_world()
         
         # Remove player from active combat
         if player_id in self.game_state.active_combats:
@@ -1039,6 +1068,9 @@ class CombatSystem:
         # Remove player completely from the game
         if player_id in self.game_state.players:
             del self.game_state.players[player_id]
+        forget_player = getattr(self.game_state, 'forget_player', None)
+        if forget_player is not None:
+            forget_player(player_id)
         
         remaining = list(battle['participants'])
         battle_id = battle['battle_id']
@@ -1074,9 +1106,13 @@ class CombatSystem:
                 if current.get('status') == 'ending':
                     current['status'] = 'active'
                     self._advance_turn(current)
-            self._update_all_players()
+            if killer_id:
+                # PvP kill line went to everyone's log
+                self._update_all_players()
+            else:
+                self._update_observers(remaining, contexts=[dead_context])
 
-        self.socketio.start_background_task(finish_after_pause)
+        self._start_timer(finish_after_pause)
     
     def _check_battle_end(self, battle, victory=False):
         """End battle if only one (or zero) combatants remain. Returns True if ended."""
@@ -1091,6 +1127,7 @@ class CombatSystem:
                 last_player_id = battle['participants'][0]
                 if last_player_id in self.game_state.players:
                     self.game_state.players[last_player_id].in_combat = False
+                    self._record_player(self.game_state.players[last_player_id])
                 
                 # Remove from active combat
                 if last_player_id in self.game_state.active_combats:
@@ -1110,7 +1147,32 @@ class CombatSystem:
             del self.battles[battle['battle_id']]
             return True
         return False    
+
+    def _record_player(self, player):
+        """Log a combat outcome (HP, XP, Elo, items used) if the world persists."""
+        record_player = getattr(self.game_state, 'record_player', None)
+        if record_player is not None:
+            record_player(player)
+
+    def _render_tick(self):
+        tick = getattr(self.game_state, 'render_tick', None)
+        return tick() if tick is not None else nullcontext()
+
     def _update_all_players(self):
         """Update game state for all active players"""
-        for pid in self.game_state.active_players:
-            self._emit('game_state', self.game_state.get_game_state(pid), room=pid)
+        with self._render_tick():
+            for pid in list(self.game_state.active_players):
+                self._emit_game_state(pid)
+
+    def _update_observers(self, player_ids, contexts=()):
+        """Update game state for active players sharing a map with player_ids."""
+        observers = getattr(self.game_state, 'observers', None)
+        if observers is None:
+            self._update_all_players()
+            return
+        players = self.game_state.players
+        keys = list(contexts)
+        keys.extend(context_key(players[pid]) for pid in player_ids if pid in players)
+        with self._render_tick():
+            for pid in observers(keys):
+                self._emit_game_state(pid)
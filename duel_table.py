@@ -0,0 +1,327 @@
+"""Precomputed duel outcomes for the Elo balancing tool.
+
+    py duel_table.py                 # build from monster_elo_ratings.json
+    py duel_table.py --output x.json
+
+A headless duel depends only on the two stat vectors (mhp, str, acc, dex,
+armour, weapon base) and who swings first, so its outcome distribution can
+be computed once instead of re-simulated. duel_odds() does that exactly by
+dynamic programming over (hp_a, hp_b) states, using calculate_hit_chance and
+the discretised Gaussian damage of calculate_attack_damage (round, floor of
+1, armour divisor). The round cap is not modelled: matchups expected to run
+near MAX_COMBAT_ROUNDS are left to simulation (see DuelTable.lookup).
+
+The table is saved next to monster_elo_ratings.json; monster_elo consults
+it for calibration and tournament fights and simulates anything missing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+from pathlib import Path
+
+from combat_damage import (
+    DEFAULT_CONSISTENCY_FACTOR,
+    _non_negative_stat,
+    _weapon_base_for,
+    calculate_hit_chance,
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+DEFAULT_TABLE_PATH = PROJECT_ROOT / 'monster_duel_table.json'
+
+# Damage outcomes rarer than this are dropped (and the rest renormalised).
+DAMAGE_TAIL_EPSILON = 1e-9
+# Use a table entry only if the duel is expected to end well inside the cap
+# (expected rounds * margin < max_rounds); otherwise simulate for the draws.
+ROUND_CAP_MARGIN = 4
+
+
+def duel_stats(combatant):
+    """Stat vector a headless duel depends on: (mhp, str, acc, dex, armour, base)."""
+    try:
+        strength = int(getattr(combatant, 'str', 1))
+    except (TypeError, ValueError):
+        strength = 1
+    try:
+        armour = max(1, int(getattr(combatant, 'armour', 1)))
+    except (TypeError, ValueError):
+        armour = 1
+    return (
+        max(1, int(combatant.mhp)),
+        strength,
+        _non_negative_stat(getattr(combatant, 'acc', 1), 0),
+        _non_negative_stat(getattr(combatant, 'dex', 1), 0),
+        armour,
+        int(_weapon_base_for(combatant)),
+    )
+
+
+def _normal_cdf(z):
+    return 0.5 * (1.0 + math.erf(z / math.sqrt(2.0)))
+
+
+def damage_pmf(strength, armour, weapon_base):
+    """
+    [(damage, probability)] of one hit, damage >= 1, as calculate_attack_damage
+    rolls it: max(1, round(Gaussian(mean, |mean| / 3) / max(1, armour))).
+    """
+    mean = float(weapon_base) + float(strength)
+    divisor = max(1.0, float(armour))
+    mu = mean / divisor
+    sigma = abs(mean) / DEFAULT_CONSISTENCY_FACTOR / divisor
+    if sigma == 0.0:
+        return [(max(1, int(round(mu))), 1.0)]
+    top = max(1, int(math.ceil(mu + 8 * sigma)) + 1)
+    pmf = []
+    below = 0.0
+    for damage in range(1, top + 1):
+        upper = _normal_cdf((damage + 0.5 - mu) / sigma)
+        prob = upper - below
+        below = upper
+        if prob > DAMAGE_TAIL_EPSILON:
+            pmf.append((damage, prob))
+    total = sum(prob for _, prob in pmf)
+    return [(damage, prob / total) for damage, prob in pmf]
+
+
+def duel_odds(stats_a, stats_b):
+    """
+    Outcome of a duel between two duel_stats() vectors, without a round cap.
+
+    Returns {first_is_a: (win_a, win_b, draw, expected_rounds)} for both
+    values of first_is_a. Only a duel where neither side can ever hit is a
+    draw.
+    """
+    hp_a, str_a, acc_a, dex_a, arm_a, base_a = stats_a
+    hp_b, str_b, acc_b, dex_b, arm_b, base_b = stats_b
+    p_a = calculate_hit_chance(acc_a, dex_b)  # a hits b
+    p_b = calculate_hit_chance(acc_b, dex_a)
+    if p_a <= 0.0 and p_b <= 0.0:
+        return {True: (0.0, 0.0, 1.0, math.inf), False: (0.0, 0.0, 1.0, math.inf)}
+    dmg_a = damage_pmf(str_a, arm_b, base_a)
+    dmg_b = damage_pmf(str_b, arm_a, base_b)
+
+    # win_a_first[a][b]: P(a wins) with hp (a, b) and a about to swing; the
+    # *_second tables are the same with b about to swing. rounds_* likewise.
+    win_first = [[0.0] * (hp_b + 1) for _ in range(hp_a + 1)]
+    win_second = [[0.0] * (hp_b + 1) for _ in range(hp_a + 1)]
+    rounds_first = [[0.0] * (hp_b + 1) for _ in range(hp_a + 1)]
+    rounds_second = [[0.0] * (hp_b + 1) for _ in range(hp_a + 1)]
+    miss_loop = 1.0 - (1.0 - p_a) * (1.0 - p_b)
+    for a in range(1, hp_a + 1):
+        for b in range(1, hp_b + 1):
+            # After a hit by a (b -> b - k): b swings next, or a has won.
+            hit_win_a = 0.0
+            hit_rounds_a = 0.0
+            for k, prob in dmg_a:
+                if k >= b:
+                    hit_win_a += prob
+                else:
+                    hit_win_a += prob * win_second[a][b - k]
+                    hit_rounds_a += prob * rounds_second[a][b - k]
+            hit_win_b = 0.0
+            hit_rounds_b = 0.0
+            for k, prob in dmg_b:
+                if k < a:
+                    hit_win_b += prob * win_first[a - k][b]
+                    hit_rounds_b += prob * rounds_first[a - k][b]
+            # first = (1-p_a)*second + p_a*hit_a ; second = (1-p_b)*first + p_b*hit_b
+            x_win, y_win = p_a * hit_win_a, p_b * hit_win_b
+            x_rounds, y_rounds = 1.0 + p_a * hit_rounds_a, 1.0 + p_b * hit_rounds_b
+            first = (x_win + (1.0 - p_a) * y_win) / miss_loop
+            win_first[a][b] = first
+            win_second[a][b] = (1.0 - p_b) * first + y_win
+            first_rounds = (x_rounds + (1.0 - p_a) * y_rounds) / miss_loop
+            rounds_first[a][b] = first_rounds
+            rounds_second[a][b] = (1.0 - p_b) * first_rounds + y_rounds
+    a_first = win_first[hp_a][hp_b]
+    b_first = win_second[hp_a][hp_b]
+    return {
+        True: (a_first, 1.0 - a_first, 0.0, rounds_first[hp_a][hp_b]),
+        False: (b_first, 1.0 - b_first, 0.0, rounds_second[hp_a][hp_b]),
+    }
+
+
+def _mirror(odds):
+    """duel_odds seen from the other side: swap winners and who swings first."""
+    return {
+        first: (win_b, win_a, draw, rounds)
+        for first, (win_a, win_b, draw, rounds) in ((not f, v) for f, v in odds.items())
+    }
+
+
+def _stats_label(stats):
+    return ','.join(str(v) for v in stats)
+
+
+def _parse_stats(label):
+    return tuple(int(v) for v in label.split(','))
+
+
+class DuelTable:
+    """(stats_a, stats_b) -> duel_odds(), filled on demand or from JSON."""
+
+    def __init__(self, entries=None):
+        self.entries = dict(entries or {})
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _stored(self, stats_a, stats_b):
+        odds = self.entries.get((stats_a, stats_b))
+        if odds is None:
+            mirrored = self.entries.get((stats_b, stats_a))
+            if mirrored is not None:
+                odds = _mirror(mirrored)
+        return odds
+
+    def odds(self, stats_a, stats_b):
+        """duel_odds for the pair, computed and stored if not known yet."""
+        odds = self._stored(stats_a, stats_b)
+        if odds is None:
+            odds = duel_odds(stats_a, stats_b)
+            self.entries[(stats_a, stats_b)] = odds
+        return odds
+
+    def lookup(self, stats_a, stats_b, first_is_a, max_rounds):
+        """
+        (win_a, win_b, draw, expected_rounds) from stored entries only, or
+        None when the pair is unknown or likely to hit the round cap.
+        """
+        odds = self.entries.get((stats_a, stats_b))
+        if odds is not None:
+            outcome = odds[first_is_a]
+        else:
+            mirrored = self.entries.get((stats_b, stats_a))
+            if mirrored is None:
+                self.misses += 1
+                return None
+            win_b, win_a, draw, rounds = mirrored[not first_is_a]
+            outcome = (win_a, win_b, draw, rounds)
+        if outcome[3] * ROUND_CAP_MARGIN >= max_rounds:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return outcome
+
+    def expected_score(self, stats_a, stats_b, first_is_a, max_rounds):
+        """Expected score for a (win 1, draw 0.5), or None to simulate."""
+        outcome = self.lookup(stats_a, stats_b, first_is_a, max_rounds)
+        if outcome is None:
+            return None
+        win_a, _win_b, draw, _rounds = outcome
+        return win_a + 0.5 * draw
+
+    def sample_fight(self, stats_a, stats_b, first_is_a, rng, max_rounds):
+        """
+        (score_a, rounds) drawn from the stored odds, like one
+        simulate_monster_fight result (rounds is the expected length), or
+        None to simulate.
+        """
+        outcome = self.lookup(stats_a, stats_b, first_is_a, max_rounds)
+        if outcome is None:
+            return None
+        win_a, win_b, _draw, rounds = outcome
+        roll = rng.random()
+        if roll < win_a:
+            score_a = 1.0
+        elif roll < win_a + win_b:
+            score_a = 0.0
+        else:
+            score_a = 0.5
+        return score_a, max(1, int(round(rounds)))
+
+    def to_payload(self):
+        rows = []
+        for (stats_a, stats_b), odds in sorted(self.entries.items()):
+            row = {'a': _stats_label(stats_a), 'b': _stats_label(stats_b)}
+            for first, name in ((True, 'a_first'), (False, 'b_first')):
+                win_a, win_b, draw, rounds = odds[first]
+                row[name] = [win_a, win_b, draw, rounds if math.isfinite(rounds) else None]
+            rows.append(row)
+        return {'meta': {'entries': len(rows)}, 'duels': rows}
+
+    @classmethod
+    def from_payload(cls, payload):
+        entries = {}
+        for row in (payload or {}).get('duels') or ():
+            try:
+                key = (_parse_stats(row['a']), _parse_stats(row['b']))
+                odds = {}
+                for first, name in ((True, 'a_first'), (False, 'b_first')):
+                    win_a, win_b, draw, rounds = row[name]
+                    odds[first] = (
+                        float(win_a), float(win_b), float(draw),
+                        math.inf if rounds is None else float(rounds),
+                    )
+            except (KeyError, TypeError, ValueError):
+                continue
+            entries[key] = odds
+        return cls(entries)
+
+
+def build_duel_table(combatants, table=None):
+    """Fill table with every unordered pair of distinct duel_stats among combatants."""
+    table = table if table is not None else DuelTable()
+    vectors = sorted({duel_stats(c) for c in combatants})
+    for i, stats_a in enumerate(vectors):
+        for stats_b in vectors[i:]:
+            table.odds(stats_a, stats_b)
+    return table
+
+
+def save_duel_table(table, path=None):
+    path = Path(path) if path else DEFAULT_TABLE_PATH
+    path.write_text(json.dumps(table.to_payload()), encoding='utf-8')
+    return path
+
+
+_table_cache = None
+_table_cache_path = None
+
+
+def load_duel_table(path=None, force=False):
+    """Cached DuelTable from JSON; an empty table if the file is missing or bad."""
+    global _table_cache, _table_cache_path
+    path = Path(path) if path else DEFAULT_TABLE_PATH
+    if not force and _table_cache is not None and _table_cache_path == path:
+        return _table_cache
+    table = DuelTable()
+    if path.is_file():
+        try:
+            table = DuelTable.from_payload(json.loads(path.read_text(encoding='utf-8')))
+        except Exception as exc:
+            print(f'[duel_table] failed to load {path}: {exc}; simulating duels')
+    _table_cache = table
+    _table_cache_path = path
+    return table
+
+
+def main(argv=None):
+    from monster_elo import DEFAULT_OUTPUT_PATH, load_elo_ladder
+
+    parser = argparse.ArgumentParser(
+        description='Precompute duel odds for every ladder matchup (balancing tool).',
+    )
+    parser.add_argument(
+        '--ratings', type=str, default=str(DEFAULT_OUTPUT_PATH),
+        help='Elo ratings JSON whose ladder to tabulate',
+    )
+    parser.add_argument(
+        '--output', type=str, default=str(DEFAULT_TABLE_PATH),
+        help='Duel table JSON output path',
+    )
+    args = parser.parse_args(argv)
+    ladder = load_elo_ladder(path=args.ratings)
+    table = build_duel_table(ladder)
+    out = save_duel_table(table, args.output)
+    print(f'Saved {len(table):,} matchups to {out}')
+
+
+if __name__ == '__main__':
+    main()
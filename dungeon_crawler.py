@@ -1,14 +1,27 @@
-import eventlet
-eventlet.monkey_patch()
+if __name__ == '__main__':
+    import sys
+
+    if '--profile-startup' not in sys.argv:
+        # Serving: patch before Flask/Socket.IO import socket and threading.
+        # Importers (tests, tools) get the plain stdlib unless they patch.
+        # The server resolves no hostnames; green DNS (dnspython) is most
+        # of eventlet's import time.
+        import os
 
-from flask import Flask, render_template, session, request
+        os.environ.setdefault('EVENTLET_NO_GREENDNS', 'yes')
+        import eventlet
+        eventlet.monkey_patch()
+
+from flask import Flask, Response, render_template, session, request
 from flask_socketio import SocketIO, emit, join_room
+import atexit
 import random
 import os
+import sys
+import time
 import uuid
 from player import Player
 from combat import CombatSystem
-import ssl
 from map_generator import MapGenerator
 from camera import (
     update_camera,
@@ -21,13 +34,29 @@ from camera import (
 )
 from visibility import (
     VISIBILITY_SYSTEM_ENABLED,
-    compute_fov,
-    update_explored,
-    remembered_terrain,
+    recall_glyph,
 )
 from monster_ai import is_terrain_passable
 from level_turns import register_player_turn_action
+from state_delta import SnapshotCache
+from interest import ContextPlayers, InterestIndex, context_key
+from tile_grid import TileGrid, map_row
+from fov_cache import FovCache, merge_explored
+from persistence import persist_world, store_from_env
+from hub_watchdog import watchdog_from_env
+from tracing import echo_payload, parse_trace_meta, span, traced
+from metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    GAME_STATE_SECONDS,
+    LEVEL_GEN_SECONDS,
+    REGISTRY as METRICS,
+    observe_frame,
+    render_metrics,
+    timed_handler,
+)
+from level_pipeline import LEVEL_PREFETCH_ENABLED, LevelPipeline, refine_spawn_ratings
 from collections import deque
+from contextlib import contextmanager
 import item_types  # noqa: F401 — load item_types.xlsx into registry
 from items.service import grant_starter_kit, use_item as use_item_service, discard_item
 from interiors.items_shop import (
@@ -51,7 +80,8 @@ _STAIR_ADJACENT_DIRS = (
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = SECRET_KEY
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet')
+# Bound to app in create_app(); handlers below register on it first.
+socketio = SocketIO(cors_allowed_origins="*", async_mode='eventlet')
 
 class GameState:
     def __init__(self):
@@ -69,15 +99,24 @@ class GameState:
         self.manual_pan = {}  # player_id -> True while user is freely panning
         self.stair_steps = {}  # player_id -> (y, x) origin stair just stepped on
         self.level_turns = {}  # dungeon_level -> LevelTurnState
+        self.monster_rosters = {}  # dungeon_level -> roster version (roster_version)
         self.interiors = {}
         self.town_doors = {}  # (y, x) -> interior_id
         self.town_exits = {}  # interior_id -> [y, x] road tile
         self.pending_inspect = {}
+        self.snapshots = SnapshotCache()  # per-client acked frames for deltas
+        self.interest = InterestIndex()  # (level, interior_id) -> player_ids
+        self.world_version = 0  # bumped whenever something a lit view shows moves
+        self._render_cache = None  # shared lit-view renders during a broadcast
+        self.fov_cache = FovCache()  # shared FOV results per level/origin/radius
+        self.level_pipeline = None  # background level generation (start_level_pipeline)
+        self.persistence = None  # WorldStore when DUNGEON_PERSIST_DIR is set (create_app)
         self.generate_top_level()
 
     def generate_top_level(self):
         """Generate the top level using the MapGenerator"""
-        self.game_map, self.monsters = self.map_generator.generate_top_level()
+        game_map, self.monsters = self.map_generator.generate_top_level()
+        self.game_map = TileGrid.from_rows(game_map)
         self.levels[0] = (self.game_map, self.monsters)
         self.interiors = {}
         self.town_doors = {}
@@ -120,22 +159,57 @@ class GameState:
     def ensure_level(self, level_number, stairs_up_pos=None):
         """Return (map, monsters) for a level, generating it if needed"""
         if level_number not in self.levels:
+            pipeline = getattr(self, 'level_pipeline', None)
             if level_number == 0:
                 self.generate_top_level()
+            elif pipeline is not None:
+                self.levels[level_number] = pipeline.take(level_number, stairs_up_pos)
             else:
+                started = time.perf_counter()
                 game_map, monsters = self.map_generator.generate_level(
                     stairs_up_pos=stairs_up_pos
                 )
-                self.levels[level_number] = (game_map, monsters)
+                LEVEL_GEN_SECONDS.observe(time.perf_counter() - started, 'request')
+                # Resident for the life of the server: keep it compact.
+                self.levels[level_number] = (TileGrid.from_rows(game_map), monsters)
+            store = getattr(self, 'persistence', None)
+            if store is not None:
+                store.level_added(level_number, self.levels[level_number])
         return self.levels[level_number]
 
+    def start_level_pipeline(self, **kwargs):
+        """Pre-generate levels below wherever players are, off the request path."""
+        self.level_pipeline = LevelPipeline(
+            self.levels, self.map_generator.find_tile, **kwargs
+        )
+        for player in self.players.values():
+            self.level_pipeline.reached(player.dungeon_level)
+        return self.level_pipeline
+
+    def level_reached(self, level_number):
+        """Someone arrived on level_number: queue the levels below it."""
+        pipeline = getattr(self, 'level_pipeline', None)
+        if pipeline is not None:
+            pipeline.reached(level_number)
+
+    def hosts_monster(self, monster):
+        """True while monster stands on a resident level (not killed or unloaded)."""
+        pos = tuple(getattr(monster, 'pos', ()) or ())
+        return any(monsters.get(pos) is monster for _grid, monsters in self.levels.values())
+
     def players_on_level(self, level_number):
-        """Players currently on the given dungeon level (not inside an interior)."""
-        return {
-            pid: player for pid, player in self.players.items()
-            if player.dungeon_level == level_number
-            and not getattr(player, 'interior_id', None)
-        }
+        """
+        Players currently on the given dungeon level (not inside an interior).
+
+        The result is a dict with an ``at(y, x)`` occupancy lookup.
+        """
+        return self.players_at_context((level_number, None))
+
+    def players_at_context(self, key):
+        """ContextPlayers for one (level, interior_id) context."""
+        index = self._interest_index()
+        members = {pid: self.players[pid] for pid in index.subscribers(key, self.players)}
+        return ContextPlayers(members, index, key, self.players)
 
     def players_in_context(self, player):
         """Players sharing this player's map (same level and interior)."""
@@ -147,6 +221,69 @@ class GameState:
             and getattr(other, 'interior_id', None) == iid
         }
 
+    def touch_world(self):
+        """Something visible changed (map cell, body or monster moved)."""
+        self.world_version = getattr(self, 'world_version', 0) + 1
+
+    @contextmanager
+    def render_tick(self):
+        """Share identical lit-view renders between viewers for one broadcast pass."""
+        outer = getattr(self, '_render_cache', None)
+        if outer is None:
+            self._render_cache = {}
+        try:
+            yield
+        finally:
+            if outer is None:
+                self._render_cache = None
+
+    def _interest_index(self):
+        index = getattr(self, 'interest', None)
+        if index is None:
+            index = InterestIndex()
+            self.interest = index
+        index.sync(self.players)
+        return index
+
+    def update_interest(self, player):
+        """Re-file player under the map and tile they now stand on."""
+        self._interest_index().update(player.id, player)
+
+    def forget_player(self, player_id):
+        """Drop a body that left the world (death) from the index."""
+        index = getattr(self, 'interest', None)
+        if index is not None:
+            index.discard(player_id)
+        store = getattr(self, 'persistence', None)
+        if store is not None:
+            store.player_gone(player_id)
+
+    def record_move(self, player):
+        """Log where a player now stands (persistence WAL)."""
+        store = getattr(self, 'persistence', None)
+        if store is not None and player is not None:
+            store.player_moved(player)
+
+    def record_player(self, player):
+        """Log a player's whole state: inventory change, combat outcome, join."""
+        store = getattr(self, 'persistence', None)
+        if store is not None and player is not None:
+            store.player_changed(player)
+
+    def player_at(self, key, y, x, exclude=None):
+        """(player_id, player) on (y, x) in context key, or (None, None)."""
+        return self._interest_index().occupant(key, y, x, self.players, exclude)
+
+    def observers(self, contexts):
+        """Active player_ids on any of the given (level, interior_id) contexts."""
+        index = self._interest_index()
+        found = []
+        for key in dict.fromkeys(contexts):
+            for pid in index.subscribers(key, self.players):
+                if pid in self.active_players:
+                    found.append(pid)
+        return found
+
     def _is_arrival_tile_free(self, y, x, game_map, monsters, players, exclude_player_id=None):
         """True if a player may safely arrive on (y, x): in-bounds, walkable, unoccupied."""
         h = len(game_map)
@@ -157,6 +294,10 @@ class GameState:
             return False
         if (y, x) in monsters:
             return False
+        at = getattr(players, 'at', None)
+        if at is not None:
+            pid, _other = at(y, x, exclude=exclude_player_id)
+            return pid is None
         for pid, other in players.items():
             if exclude_player_id is not None and pid == exclude_player_id:
                 continue
@@ -230,6 +371,9 @@ class GameState:
         player.dungeon_level = level_number
         player.interior_id = None
         player.pos = arrival
+        self.update_interest(player)
+        self.touch_world()
+        self.level_reached(level_number)
         if player.id in self.cameras:
             del self.cameras[player.id]
         self.manual_pan.pop(player.id, None)
@@ -241,14 +385,18 @@ class GameState:
         """Recalculate LOS and mark newly seen tiles explored for this level."""
         if not self.uses_fog(player):
             return
-        game_map, _monsters, _npcs = self.view_for(player)
-        player.visible = compute_fov(
-            game_map, player.pos, player.effective_sight_range()
-        )
-        key = player.explored_key()
-        if key not in player.explored:
-            player.explored[key] = set()
-        update_explored(player.explored[key], player.visible)
+        with span('recompute_visibility'):
+            game_map, _monsters, _npcs = self.view_for(player)
+            key = player.explored_key()
+            cache = getattr(self, 'fov_cache', None)
+            if cache is None:
+                cache = self.fov_cache = FovCache()
+            fov_key, player.visible = cache.visible_from(
+                key, game_map, player.pos, player.effective_sight_range()
+            )
+            if key not in player.explored:
+                player.explored[key] = set()
+            merge_explored(player, player.explored[key], fov_key, player.visible)
 
     def inspect_map_tile(self, player_id, y, x):
         """
@@ -305,19 +453,37 @@ class GameState:
 
         Only clear a `&` marker. Stairs under the monster must stay.
         """
-        for game_map, monsters in self.levels.values():
+        store = getattr(self, 'persistence', None)
+        for number, (game_map, monsters) in self.levels.items():
             if position in monsters:
                 del monsters[position]
+                self.roster_changed(number)
                 y, x = position[0], position[1]
                 if game_map[y][x] == '&':
                     game_map[y][x] = '.'
+                self.touch_world()
+                if store is not None:
+                    store.monster_gone(number, None, position)
                 return True
-        for _iid, (_game_map, npcs) in (getattr(self, 'interiors', None) or {}).items():
+        for iid, (_game_map, npcs) in (getattr(self, 'interiors', None) or {}).items():
             if position in npcs:
                 del npcs[position]
+                self.touch_world()
+                if store is not None:
+                    store.monster_gone(None, iid, position)
                 return True
         return False
 
+    def roster_version(self, level_number):
+        """Bumped whenever a monster leaves level_number (see LevelActivity.sync)."""
+        return (getattr(self, 'monster_rosters', None) or {}).get(level_number, 0)
+
+    def roster_changed(self, level_number):
+        rosters = getattr(self, 'monster_rosters', None)
+        if rosters is None:
+            rosters = self.monster_rosters = {}
+        rosters[level_number] = rosters.get(level_number, 0) + 1
+
     def move_monster(self, level_number, monster, dest):
         """
         Move monster to dest (y, x). Updates dict key, pos, and map markers.
@@ -345,16 +511,50 @@ class GameState:
 
         monster.pos = [dest[0], dest[1]]
         monsters[new_key] = monster
+        self.touch_world()
         # Preserve stairs if present; otherwise mark monster
         cell = game_map[dest[0]][dest[1]]
         if cell not in ('↓', '↑'):
             game_map[dest[0]][dest[1]] = '&'
         return True
 
+    def state_update_for(self, player_id, full=False):
+        """
+        (event, data) to push to one player: a full 'game_state' frame, or a
+        'game_state_delta' against the newest frame the client acked.
+        """
+        with span('get_game_state', to=player_id):
+            payload = self.get_game_state(player_id)
+        snapshots = getattr(self, 'snapshots', None)
+        if snapshots is None or player_id not in (getattr(self, 'players', None) or {}):
+            event, data = 'game_state', payload
+        else:
+            with span('encode', to=player_id):
+                event, data = snapshots.encode(player_id, payload, full=full)
+        observe_frame(event, data)
+        return event, data
+
+    def reset_client_state(self, player_id):
+        """Next update for this player is a full frame (new socket / resync)."""
+        snapshots = getattr(self, 'snapshots', None)
+        if snapshots is not None:
+            snapshots.reset(player_id)
+
     def broadcast_active_players(self, socketio_ref):
         """Push game_state to all currently active (connected) players."""
-        for pid in list(self.active_players.keys()):
-            socketio_ref.emit('game_state', self.get_game_state(pid), room=pid)
+        with self.render_tick():
+            for pid in list(self.active_players.keys()):
+                event, data = self.state_update_for(pid)
+                with span('emit', to=pid, event=event):
+                    socketio_ref.emit(event, data, room=pid)
+
+    def broadcast_level(self, socketio_ref, level_number):
+        """Push game_state only to active players on a level's open map."""
+        with self.render_tick():
+            for pid in self.observers([(level_number, None)]):
+                event, data = self.state_update_for(pid)
+                with span('emit', to=pid, event=event):
+                    socketio_ref.emit(event, data, room=pid)
 
     def add_player(self, player_id):
         if player_id not in self.players:
@@ -369,6 +569,10 @@ class GameState:
             self.add_player_message(player_id, f"Welcome, {player_id}, to the realm of PermaQuest. Thy quest begins, and glory or ruin lies ahead.")
             grant_starter_kit(new_player)
             self.recompute_visibility(new_player)
+            self.update_interest(new_player)
+            self.touch_world()
+            self.level_reached(new_player.dungeon_level)
+            self.record_player(new_player)
 
         # Mark player as active
         self.active_players[player_id] = self.players[player_id]
@@ -488,6 +692,8 @@ class GameState:
                     return True
 
             player.pos = new_pos
+            self.update_interest(player)
+            self.touch_world()
             self.recompute_visibility(player)
             return True
         return False
@@ -535,22 +741,18 @@ class GameState:
             return False
         game_map, npcs = interiors[interior_id]
         spawn = interior_spawn(game_map)
-        players = {
-            pid: other for pid, other in self.players.items()
-            if getattr(other, 'interior_id', None) == interior_id
-        }
-        occupied = set(npcs)
-        for pid, other in players.items():
-            if pid == player.id:
-                continue
-            occupied.add((other.pos[0], other.pos[1]))
-        if tuple(spawn) in occupied or not is_terrain_passable(
+        occupant, _other = self.player_at(
+            (player.dungeon_level, interior_id), spawn[0], spawn[1], exclude=player.id
+        )
+        if occupant is not None or tuple(spawn) in npcs or not is_terrain_passable(
             game_map, spawn[0], spawn[1]
         ):
             return False
         arrival = list(spawn)
         player.interior_id = interior_id
         player.pos = arrival
+        self.update_interest(player)
+        self.touch_world()
         if player.id in self.cameras:
             del self.cameras[player.id]
         self.manual_pan.pop(player.id, None)
@@ -573,6 +775,8 @@ class GameState:
             return False
         player.interior_id = None
         player.pos = arrival
+        self.update_interest(player)
+        self.touch_world()
         if player.id in self.cameras:
             del self.cameras[player.id]
         self.manual_pan.pop(player.id, None)
@@ -598,13 +802,12 @@ class GameState:
         player = self.players[player_id]
 
         # Check for player-player combat (same map; includes offline players)
-        for other_id, other_player in self.players.items():
-            if (other_id != player_id and
-                other_player.dungeon_level == player.dungeon_level and
-                getattr(other_player, 'interior_id', None) == getattr(player, 'interior_id', None) and
-                other_player.pos == new_pos):
-                combat_system.start_combat(player_id, other_id, emit_game_state=False)
-                return True
+        other_id, _other = self.player_at(
+            context_key(player), new_pos[0], new_pos[1], exclude=player_id
+        )
+        if other_id is not None:
+            combat_system.start_combat(player_id, other_id, emit_game_state=False)
+            return True
         
         # Check for player-monster combat
         monster_pos = (new_pos[0], new_pos[1])
@@ -615,7 +818,86 @@ class GameState:
         
         return False
 
+    def _render_lit_view(self, level, viewer_interior, game_map, monsters, npcs,
+                         cam_y, cam_x, vh, vw):
+        """
+        (visible_map, fog, entities) for a fully lit map (town / interiors).
+
+        Depends only on the map and camera, not on who is looking, so one
+        render can serve every viewer with the same framing.
+        """
+        map_h = len(game_map)
+        map_w = len(game_map[0]) if map_h else 0
+        entities = []
+        # Build viewport only (no full-map deep copy) — keeps hold-to-move snappy.
+        overlay = {}
+        for player in self.players.values():
+            if (player.dungeon_level == level
+                    and getattr(player, 'interior_id', None) == viewer_interior):
+                overlay[(player.pos[0], player.pos[1])] = '@'
+        for pos in monsters:
+            overlay[pos] = '&'
+        visible_map = []
+        fog = []
+        for vy in range(vh):
+            row_chars = []
+            row_fog = []
+            wy = cam_y + vy
+            glyphs = map_row(game_map, wy) if 0 <= wy < map_h else None
+            for vx in range(vw):
+                wx = cam_x + vx
+                if glyphs is not None and 0 <= wx < map_w:
+                    char = overlay.get((wy, wx), glyphs[wx])
+                else:
+                    char = ' '
+                row_chars.append(char)
+                row_fog.append('visible' if 0 <= wy < map_h and 0 <= wx < map_w else 'unexplored')
+            visible_map.append(row_chars)
+            fog.append(row_fog)
+        for player in self.players.values():
+            if (player.dungeon_level == level
+                    and getattr(player, 'interior_id', None) == viewer_interior):
+                vy = player.pos[0] - cam_y
+                vx = player.pos[1] - cam_x
+                if 0 <= vy < vh and 0 <= vx < vw:
+                    entities.append({
+                        'kind': 'player',
+                        'id': player.id,
+                        'appearance_id': player.appearance_id,
+                        'vy': vy,
+                        'vx': vx,
+                        'sprite': player.sprite_url(),
+                        'under': game_map[player.pos[0]][player.pos[1]],
+                    })
+        for pos, monster in monsters.items():
+            vy = pos[0] - cam_y
+            vx = pos[1] - cam_x
+            if 0 <= vy < vh and 0 <= vx < vw:
+                entities.append({
+                    'kind': 'monster',
+                    'id': monster.id,
+                    'type_id': monster.type_id,
+                    'vy': vy,
+                    'vx': vx,
+                    'sprite': monster.sprite_url(),
+                    'under': game_map[pos[0]][pos[1]],
+                })
+        for pos, npc in npcs.items():
+            vy = pos[0] - cam_y
+            vx = pos[1] - cam_x
+            if 0 <= vy < vh and 0 <= vx < vw:
+                entities.append({
+                    'kind': 'npc',
+                    'id': npc.id,
+                    'vy': vy,
+                    'vx': vx,
+                    'sprite': npc.sprite,
+                    'under': game_map[pos[0]][pos[1]],
+                })
+        return visible_map, fog, entities
+
     def get_game_state(self, current_player_id, follow_player=None):
+        started = time.perf_counter()
         if current_player_id and current_player_id in self.players:
             viewer = self.players[current_player_id]
             level = viewer.dungeon_level
@@ -660,70 +942,20 @@ class GameState:
         entities = []
 
         if not use_fog:
-            # Build viewport only (no full-map deep copy) — keeps hold-to-move snappy.
-            overlay = {}
-            for player in self.players.values():
-                if (player.dungeon_level == level
-                        and getattr(player, 'interior_id', None) == viewer_interior):
-                    overlay[(player.pos[0], player.pos[1])] = '@'
-            for pos in monsters:
-                overlay[pos] = '&'
-            visible_map = []
-            fog = []
-            for vy in range(vh):
-                row_chars = []
-                row_fog = []
-                wy = cam_y + vy
-                for vx in range(vw):
-                    wx = cam_x + vx
-                    if 0 <= wy < map_h and 0 <= wx < map_w:
-                        char = overlay.get((wy, wx), game_map[wy][wx])
-                    else:
-                        char = ' '
-                    row_chars.append(char)
-                    row_fog.append('visible' if 0 <= wy < map_h and 0 <= wx < map_w else 'unexplored')
-                visible_map.append(row_chars)
-                fog.append(row_fog)
-            for player in self.players.values():
-                if (player.dungeon_level == level
-                        and getattr(player, 'interior_id', None) == viewer_interior):
-                    vy = player.pos[0] - cam_y
-                    vx = player.pos[1] - cam_x
-                    if 0 <= vy < vh and 0 <= vx < vw:
-                        entities.append({
-                            'kind': 'player',
-                            'id': player.id,
-                            'appearance_id': player.appearance_id,
-                            'vy': vy,
-                            'vx': vx,
-                            'sprite': player.sprite_url(),
-                            'under': game_map[player.pos[0]][player.pos[1]],
-                        })
-            for pos, monster in monsters.items():
-                vy = pos[0] - cam_y
-                vx = pos[1] - cam_x
-                if 0 <= vy < vh and 0 <= vx < vw:
-                    entities.append({
-                        'kind': 'monster',
-                        'id': monster.id,
-                        'type_id': monster.type_id,
-                        'vy': vy,
-                        'vx': vx,
-                        'sprite': monster.sprite_url(),
-                        'under': game_map[pos[0]][pos[1]],
-                    })
-            for pos, npc in npcs.items():
-                vy = pos[0] - cam_y
-                vx = pos[1] - cam_x
-                if 0 <= vy < vh and 0 <= vx < vw:
-                    entities.append({
-                        'kind': 'npc',
-                        'id': npc.id,
-                        'vy': vy,
-                        'vx': vx,
-                        'sprite': npc.sprite,
-                        'under': game_map[pos[0]][pos[1]],
-                    })
+            cache = getattr(self, '_render_cache', None)
+            render_key = (
+                level, viewer_interior, cam_y, cam_x, vh, vw,
+                getattr(self, 'world_version', 0),
+            )
+            rendered = cache.get(render_key) if cache is not None else None
+            if rendered is None:
+                rendered = self._render_lit_view(
+                    level, viewer_interior, game_map, monsters, npcs,
+                    cam_y, cam_x, vh, vw,
+                )
+                if cache is not None:
+                    cache[render_key] = rendered
+            visible_map, fog, entities = rendered
         else:
             explored = viewer.explored.get(viewer.explored_key(), set())
             los = viewer.visible
@@ -778,10 +1010,12 @@ class GameState:
 
             visible_map = []
             fog = []
+            viewer_key = (viewer.pos[0], viewer.pos[1])
             for vy in range(vh):
                 row_chars = []
                 row_fog = []
                 wy = cam_y + vy
+                glyphs = map_row(game_map, wy) if 0 <= wy < map_h else None
                 for vx in range(vw):
                     wx = cam_x + vx
                     key = (wy, wx)
@@ -791,17 +1025,17 @@ class GameState:
                         char = ' '
                         state = 'unexplored'
                     elif key in los:
-                        char = remembered_terrain(game_map, wy, wx)
+                        char = recall_glyph(glyphs[wx])
                         if key in entity_at:
                             char = entity_at[key]
                         state = 'visible'
                     elif key in explored:
-                        char = remembered_terrain(game_map, wy, wx)
+                        char = recall_glyph(glyphs[wx])
                         state = 'explored'
                     else:
                         char = ' '
                         state = 'unexplored'
-                    if key == (viewer.pos[0], viewer.pos[1]):
+                    if key == viewer_key:
                         char = '@'
                         state = 'visible'
                     row_chars.append(char)
@@ -828,11 +1062,99 @@ class GameState:
         step = (getattr(self, 'stair_steps', None) or {}).get(current_player_id)
         if step:
             payload['stair_step'] = {'y': step[0], 'x': step[1]}
+        GAME_STATE_SECONDS.observe(time.perf_counter() - started, 'yes' if use_fog else 'no')
         return payload
 
-# Create game state and combat system
-game_state = GameState()
-combat_system = CombatSystem(game_state, socketio)
+# The world is built by create_app(), not at import.
+game_state = None
+combat_system = None
+
+
+def create_app():
+    """Build the world (town, level pipeline, combat) and bind Socket.IO to app.
+
+    Importing this module only defines handlers; the server entry point calls
+    this once before serving. Later calls return the same app. With
+    DUNGEON_PERSIST_DIR set the world (and boot id) is recovered from disk.
+    """
+    global game_state, combat_system, SERVER_BOOT_ID
+    if game_state is None:
+        game_state = GameState()
+        store = store_from_env()
+        if store is not None:
+            boot_id = store.recover(game_state)
+            if boot_id:
+                SERVER_BOOT_ID = boot_id
+                for player in game_state.players.values():
+                    game_state.update_interest(player)
+                    game_state.recompute_visibility(player)
+                print(
+                    f"Recovered {len(game_state.players)} players, "
+                    f"{len(game_state.levels)} levels ({store.replayed} log records)."
+                )
+            store.start(game_state, SERVER_BOOT_ID)
+            game_state.persistence = store
+        if LEVEL_PREFETCH_ENABLED:
+            game_state.start_level_pipeline()
+        combat_system = CombatSystem(game_state, socketio)
+        register_world_metrics(game_state, combat_system)
+    if socketio.server is None:
+        socketio.init_app(app)
+    return app
+
+
+def register_world_metrics(world, combat, registry=METRICS):
+    """Scrape-time gauges over the live world (read only on /metrics)."""
+    gauge = registry.gauge
+    gauge('dungeon_active_players', 'Connected players.', lambda: len(world.active_players))
+    gauge('dungeon_players', 'Player characters in the world.', lambda: len(world.players))
+    gauge(
+        'dungeon_levels_resident', 'Dungeon levels held in memory (town included).',
+        lambda: len(world.levels),
+    )
+    gauge(
+        'dungeon_monsters', 'Monsters per resident level.',
+        lambda: {str(n): len(monsters) for n, (_map, monsters) in list(world.levels.items())},
+        labelnames=('level',),
+    )
+    gauge('dungeon_battles', 'Battles in progress.', lambda: len(combat.battles))
+    gauge(
+        'dungeon_combat_timers', 'Live combat timer greenlets (turn, pause).',
+        lambda: getattr(combat, 'live_timers', 0),
+    )
+
+    def cache_stats(attr):
+        def read():
+            cache = getattr(world, attr, None)
+            if cache is None:
+                return {}
+            return {'hits': cache.hits, 'misses': cache.misses, 'entries': len(cache.entries)}
+        return read
+
+    gauge('dungeon_fov_cache', 'Shared FOV cache counters.', lambda: {
+        (k,): v for k, v in cache_stats('fov_cache')().items()
+    }, labelnames=('stat',))
+    gauge('dungeon_flow_cache', 'Monster flow-field cache counters.', lambda: {
+        (k,): v for k, v in cache_stats('flow_fields')().items()
+    }, labelnames=('stat',))
+    gauge(
+        'dungeon_interest_contexts', 'Players per subscribed level/interior.',
+        lambda: {
+            str(key): len(pids)
+            for key, pids in list(getattr(getattr(world, 'interest', None), 'members', {}).items())
+        },
+        labelnames=('context',),
+    )
+    gauge(
+        'dungeon_snapshot_clients', 'Clients with frames kept for delta encoding.',
+        lambda: len(getattr(getattr(world, 'snapshots', None), 'clients', {})),
+    )
+    pipeline = getattr(world, 'level_pipeline', None)
+    if pipeline is not None:
+        registry.stats_gauges('dungeon_level_pipeline', 'Level pipeline', pipeline.stats)
+    store = getattr(world, 'persistence', None)
+    if store is not None:
+        registry.stats_gauges('dungeon_world_store', 'World store', store.stats)
 
 
 class GameStateDisplay:
@@ -846,10 +1168,23 @@ class GameStateDisplay:
             ["Players (Active):", f"{total_players} ({active_players})", "", ""]
         ]
 
+def _emit_state(player_id, full=False):
+    """Send one player their next frame (full or delta) in their room."""
+    event, data = game_state.state_update_for(player_id, full=full)
+    with span('emit', to=player_id, event=event):
+        emit(event, data, room=player_id)
+
+
 @app.route('/')
 def home():
     return render_template('index.html')
 
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus text exposition of metrics.REGISTRY."""
+    return Response(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
 @socketio.on('connect')
 def handle_connect():
     """Resume an existing session if possible; otherwise send spectator map."""
@@ -859,7 +1194,9 @@ def handle_connect():
         game_state.add_player(player_id)
         game_state.bind_socket(player_id, request.sid)
         join_room(player_id)
-        emit('game_state', game_state.get_game_state(player_id))
+        game_state.reset_client_state(player_id)
+        event, data = game_state.state_update_for(player_id)
+        emit(event, data)
         print(f"Player {player_id} resumed on connect (sid={request.sid}).")
         return
     emit('game_state', game_state.get_game_state(None))
@@ -901,6 +1238,7 @@ def handle_select_id(data):
     game_state.add_player(player_id)
     game_state.bind_socket(player_id, request.sid)
     join_room(player_id)
+    game_state.reset_client_state(player_id)
 
     if has_viewport:
         game_state.viewports[player_id] = (vh, vw)
@@ -912,9 +1250,10 @@ def handle_select_id(data):
     print(f"Player {player_id} joined ({kind}, sid={request.sid}).")
 
     # Update all active players (includes rejoiner)
-    for pid in game_state.players:
-        if pid in game_state.active_players:
-            emit('game_state', game_state.get_game_state(pid), room=pid)
+    with game_state.render_tick():
+        for pid in game_state.players:
+            if pid in game_state.active_players:
+                _emit_state(pid)
 
 
 @socketio.on('disconnect')
@@ -933,6 +1272,7 @@ def handle_disconnect():
 
         removed = game_state.remove_player(player_id, sid=request.sid)
         if removed:
+            game_state.reset_client_state(player_id)
             print(f"Player {player_id} disconnected.")
             # If they disconnected on their turn, forfeit immediately (stay in battle offline)
             if was_their_turn:
@@ -942,37 +1282,55 @@ def handle_disconnect():
             print(f"Ignored stale disconnect for {player_id} (newer socket active).")
 
 @socketio.on('move')
-def handle_move(direction):
+@timed_handler('move')
+def handle_move(data):
+    """'move' is a direction, or {dir, trace: {id, t}} when the client traces moves."""
+    trace_meta = None
+    direction = data
+    if isinstance(data, dict):
+        direction = data.get('dir')
+        trace_meta = data.get('trace')
     moving_player_id = session.get('player_id')
+    trace_id, client_sent = parse_trace_meta(trace_meta)
+    with traced(trace_id, moving_player_id, client_sent=client_sent) as trace:
+        _move(moving_player_id, direction)
+    if trace is not None and moving_player_id:
+        emit('move_trace', echo_payload(trace.record), room=moving_player_id)
+
+
+def _move(moving_player_id, direction):
     if moving_player_id and moving_player_id in game_state.players:
         player = game_state.players[moving_player_id]
         # Check if player is in combat
         if player.in_combat or moving_player_id in game_state.active_combats:
             return  # Ignore movement commands during combat
         
-        if game_state.move_player(moving_player_id, direction):
+        before = context_key(player)
+        with span('move_player'):
+            moved = game_state.move_player(moving_player_id, direction)
+        if moved:
             # Ack the mover first so walk animation is not blocked by AI / others.
-            emit(
-                'game_state',
-                game_state.get_game_state(moving_player_id),
-                room=moving_player_id,
-            )
+            _emit_state(moving_player_id)
             pending = (getattr(game_state, 'pending_inspect', None) or {}).pop(
                 moving_player_id, None
             )
             if pending:
                 emit('inspect_result', pending, room=moving_player_id)
             game_state.stair_steps.pop(moving_player_id, None)
+            game_state.record_move(player)
 
             round_fired = False
             if not getattr(player, 'interior_id', None):
-                round_fired = register_player_turn_action(
-                    game_state, moving_player_id, combat_system, socketio
-                )
-            for pid in list(game_state.active_players.keys()):
-                if pid == moving_player_id and not round_fired:
-                    continue
-                emit('game_state', game_state.get_game_state(pid), room=pid)
+                with span('register_player_turn_action'):
+                    round_fired = register_player_turn_action(
+                        game_state, moving_player_id, combat_system, socketio
+                    )
+            # Only the map(s) the mover left / entered can see the change.
+            with game_state.render_tick():
+                for pid in game_state.observers([before, context_key(player)]):
+                    if pid == moving_player_id and not round_fired:
+                        continue
+                    _emit_state(pid)
 
 
 @socketio.on('inspect_map')
@@ -990,6 +1348,7 @@ def handle_inspect_map(data):
 
 
 @socketio.on('set_viewport')
+@timed_handler('set_viewport')
 def handle_set_viewport(data):
     """Client reports how many tiles fit the map pane at the current zoom.
 
@@ -1024,9 +1383,10 @@ def handle_set_viewport(data):
             game_state.cameras[player_id] = (cam_y, cam_x)
             game_state.manual_pan[player_id] = True
 
-    emit('game_state', game_state.get_game_state(player_id), room=player_id)
+    _emit_state(player_id)
 
 @socketio.on('pan_camera')
+@timed_handler('pan_camera')
 def handle_pan_camera(data):
     """Client drag-pan: shift viewport by tile deltas (player stays on-screen)."""
     player_id = session.get('player_id')
@@ -1053,9 +1413,31 @@ def handle_pan_camera(data):
     )
     game_state.cameras[player_id] = (cam_y, cam_x)
     game_state.manual_pan[player_id] = True
-    emit('game_state', game_state.get_game_state(player_id), room=player_id)
+    _emit_state(player_id)
+
+@socketio.on('state_ack')
+def handle_state_ack(data):
+    """Client applied a frame; later deltas may be diffed against it."""
+    player_id = session.get('player_id')
+    if not player_id or not isinstance(data, dict):
+        return
+    snapshots = getattr(game_state, 'snapshots', None)
+    if snapshots is not None:
+        snapshots.ack(player_id, data.get('version'))
+
+
+@socketio.on('state_resync')
+def handle_state_resync(data=None):
+    """Client lost a delta base (or is unsure of its state): send a full frame."""
+    player_id = session.get('player_id')
+    if not player_id or player_id not in game_state.players:
+        return
+    game_state.reset_client_state(player_id)
+    _emit_state(player_id, full=True)
+
 
 @socketio.on('combat_action')
+@timed_handler('combat_action')
 def handle_combat_action(data):
     player_id = session.get('player_id')
     action = data['action']
@@ -1064,6 +1446,7 @@ def handle_combat_action(data):
 
 
 @socketio.on('inventory_action')
+@timed_handler('inventory_action')
 def handle_inventory_action(data):
     """Server-authoritative pack actions (use, discard, later equip/give/drop)."""
     player_id = session.get('player_id')
@@ -1091,14 +1474,16 @@ def handle_inventory_action(data):
             )
             if result.get('ok') and result.get('message'):
                 game_state.add_player_message(player_id, result['message'])
-            emit('game_state', game_state.get_game_state(player_id), room=player_id)
+            _emit_state(player_id)
     elif action == 'discard':
         result = discard_item(player, instance_id)
         if result.get('ok') and result.get('message'):
             game_state.add_player_message(player_id, result['message'])
-        emit('game_state', game_state.get_game_state(player_id), room=player_id)
+        _emit_state(player_id)
     else:
         result['message'] = f'Cannot {action or "do that"} yet.'
+    if result.get('ok') and not in_combat:
+        game_state.record_player(player)
 
     emit('item_action_result', {
         'ok': bool(result.get('ok')),
@@ -1128,11 +1513,33 @@ def handle_reorder_inventory(data):
     data = data or {}
     moved = player.inventory.move(data.get('from_slot'), data.get('to_slot'))
     if moved:
-        emit('game_state', game_state.get_game_state(player_id), room=player_id)
+        game_state.record_player(player)
+        _emit_state(player_id)
 
 
-if __name__ == '__main__':
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if '--profile-startup' in argv:
+        from startup_profile import main as profile_main
+
+        return profile_main([a for a in argv if a != '--profile-startup'])
+    import ssl
+
+    print(ssl.OPENSSL_VERSION)
+    create_app()
     port = int(os.environ.get('PORT', 5000))
+    socketio.start_background_task(
+        refine_spawn_ratings, socketio.sleep, game_state.hosts_monster
+    )
+    if game_state.persistence is not None:
+        socketio.start_background_task(
+            persist_world, game_state.persistence, game_state, socketio.sleep
+        )
+    watchdog = watchdog_from_env()
+    if watchdog is not None:
+        watchdog.start(socketio)
+        METRICS.stats_gauges('dungeon_hub_watchdog', 'Hub watchdog', watchdog.stats)
+        atexit.register(lambda: print(watchdog.report()))
     if os.environ.get('RENDER'):  # Check if we're on Render
         socketio.run(app, 
                     host='0.0.0.0',
@@ -1147,5 +1554,8 @@ if __name__ == '__main__':
                     port=port,
                     debug=True,
                     use_reloader=False)
+    return 0
+
 
-print(ssl.OPENSSL_VERSION) 
\ No newline at end of file
+if __name__ == '__main__':
+    sys.exit(main())
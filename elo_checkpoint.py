@@ -0,0 +1,209 @@
+"""Crash-safe progress for long monster Elo tournaments.
+
+    py monster_elo.py --seed 1 --passes 5          # logs next to the output
+    py monster_elo.py --resume                     # pick up after a crash
+
+The tournament appends one JSON line per event to a log (by default
+monster_elo_ratings.log.jsonl):
+
+    start     run settings and the combatant pool, written once
+    pass      a pass began; its shuffled pairing order
+    pairing   one pairing's fight results [[score_a, rounds], ...]
+    snapshot  every record's Elo / W / L / D / rounds plus the RNG state
+    resume    a resumed run continued from the snapshot before it
+    done      the tournament finished
+
+Lines are flushed as written, snapshots fsynced. --resume restores the last
+snapshot (ratings, RNG state, position in the pass) and carries on from
+there, so the finished ratings equal an uninterrupted run's; pairings logged
+after that snapshot are simulated again. Snapshots are taken every
+CHECKPOINT_EVERY_PAIRINGS pairings or CHECKPOINT_EVERY_SECONDS, and at the
+end of each pass (the only point for the numpy and --workers engines).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+
+CHECKPOINT_EVERY_PAIRINGS = 500
+CHECKPOINT_EVERY_SECONDS = 30.0
+# Minimum seconds between progress lines.
+PROGRESS_SECONDS = 2.0
+
+
+def default_log_path(output_path):
+    """monster_elo_ratings.json -> monster_elo_ratings.log.jsonl"""
+    path = Path(output_path)
+    return path.with_name(path.stem + '.log.jsonl')
+
+
+def _rng_state(rng):
+    version, internal, gauss_next = rng.getstate()
+    return [version, list(internal), gauss_next]
+
+
+def _set_rng_state(rng, state):
+    version, internal, gauss_next = state
+    rng.setstate((version, tuple(internal), gauss_next))
+
+
+class TournamentLog:
+    """Append-only JSONL writer for one tournament run."""
+
+    def __init__(self, path, resume=False):
+        self.path = Path(path)
+        self.file = self.path.open('a' if resume else 'w', encoding='utf-8')
+        self.last_snapshot_at = time.monotonic()
+        self.since_snapshot = 0
+
+    def _write(self, entry, sync=False):
+        self.file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self.file.flush()
+        if sync:
+            os.fsync(self.file.fileno())
+
+    def start(self, config, records):
+        self._write({
+            'type': 'start',
+            'config': config,
+            'pool': [[rec.type_id, rec.level] for rec in records],
+        }, sync=True)
+
+    def begin_pass(self, pass_num, pairings):
+        self._write({'type': 'pass', 'pass': pass_num, 'order': pairings})
+
+    def pairing(self, pass_num, done, i, j, results):
+        self._write({
+            'type': 'pairing', 'pass': pass_num, 'done': done,
+            'i': i, 'j': j, 'results': results,
+        })
+        self.since_snapshot += 1
+
+    def snapshot_due(self):
+        return (
+            self.since_snapshot >= CHECKPOINT_EVERY_PAIRINGS
+            or time.monotonic() - self.last_snapshot_at >= CHECKPOINT_EVERY_SECONDS
+        )
+
+    def snapshot(self, pass_num, done, records, rng):
+        """Everything needed to continue after `done` pairings of pass_num."""
+        self._write({
+            'type': 'snapshot', 'pass': pass_num, 'done': done,
+            'records': [
+                [rec.elo, rec.wins, rec.losses, rec.draws, rec.total_rounds]
+                for rec in records
+            ],
+            'rng': _rng_state(rng),
+        }, sync=True)
+        self.since_snapshot = 0
+        self.last_snapshot_at = time.monotonic()
+
+    def resumed(self, pass_num, done):
+        self._write({'type': 'resume', 'pass': pass_num, 'done': done}, sync=True)
+
+    def finish(self):
+        self._write({'type': 'done'}, sync=True)
+
+    def close(self):
+        self.file.close()
+
+
+def read_tournament_log(path):
+    """
+    {'config', 'pool', 'orders' {pass: pairings}, 'snapshot' (last, or None),
+    'done' (bool)} from a log; a torn last line (crash mid-write) is ignored.
+    """
+    state = {'config': None, 'pool': None, 'orders': {}, 'snapshot': None, 'done': False}
+    with Path(path).open(encoding='utf-8') as fh:
+        for line in fh:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            kind = entry.get('type')
+            if kind == 'start':
+                state['config'] = entry['config']
+                state['pool'] = entry['pool']
+            elif kind == 'pass':
+                state['orders'][entry['pass']] = [tuple(p) for p in entry['order']]
+            elif kind == 'snapshot':
+                state['snapshot'] = entry
+            elif kind == 'done':
+                state['done'] = True
+    if state['config'] is None:
+        raise ValueError(f'{path} is not a tournament log (no start line)')
+    return state
+
+
+def restore_snapshot(snapshot, records, rng):
+    """Put a snapshot's ratings and counters back on records and rewind rng."""
+    if len(snapshot['records']) != len(records):
+        raise ValueError('checkpoint does not match the combatant pool')
+    for rec, (elo, wins, losses, draws, total_rounds) in zip(records, snapshot['records']):
+        rec.elo = float(elo)
+        rec.wins, rec.losses, rec.draws = int(wins), int(losses), int(draws)
+        rec.total_rounds = int(total_rounds)
+    _set_rng_state(rng, snapshot['rng'])
+
+
+class ProgressMeter:
+    """Pairings-per-second and ETA readout, printed at most every PROGRESS_SECONDS."""
+
+    def __init__(self, total, out=print, every=PROGRESS_SECONDS, clock=time.monotonic):
+        self.total = total  # pairings in the whole run
+        self.out = out
+        self.every = every
+        self.clock = clock
+        self.started = clock()
+        self.last_print = None
+        self.done = 0  # pairings finished in this process
+        self.skipped = 0  # pairings restored from a checkpoint
+        self.pass_num = None
+        self.pass_done = 0
+
+    def skip(self, count):
+        self.skipped += count
+
+    def start_pass(self, pass_num, already_done=0):
+        """pass_num begins (already_done pairings of it restored, not rerun)."""
+        self.pass_num = pass_num
+        self.pass_done = already_done
+
+    def update(self, pass_num, pass_done, pass_total):
+        """pass_done pairings of pass_num are finished; print if it is time."""
+        if pass_num != self.pass_num:
+            self.start_pass(pass_num)
+        self.done += max(0, pass_done - self.pass_done)
+        self.pass_done = pass_done
+        now = self.clock()
+        if (
+            pass_done < pass_total
+            and self.last_print is not None
+            and now - self.last_print < self.every
+        ):
+            return
+        self.last_print = now
+        self.out(self.line(pass_num, pass_done, pass_total, now))
+
+    def rate(self, now=None):
+        elapsed = (now if now is not None else self.clock()) - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def line(self, pass_num, pass_done, pass_total, now):
+        rate = self.rate(now)
+        remaining = self.total - self.skipped - self.done
+        eta = _clock_text(remaining / rate) if rate > 0 else '?'
+        return (
+            f'Pass {pass_num}: {pass_done:,} / {pass_total:,} pairings  '
+            f'{rate:,.1f}/s  ETA {eta}'
+        )
+
+
+def _clock_text(seconds):
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f'{hours}:{minutes:02d}:{secs:02d}'
@@ -0,0 +1,161 @@
+"""Distance fields ("Dijkstra maps") for monsters chasing a target.
+
+One breadth-first search from the target's tile over walkable terrain gives
+every nearby tile its step distance to the target; any monster on the field
+then moves by picking the neighbour with the smallest distance, which follows
+corridors instead of pressing against the nearest wall like a straight-line
+greedy step does. Steps follow the monster movement rules (8 directions, no
+cutting a blocked corner), so a field distance is a real path length.
+
+Fields depend only on the target tile and the terrain, so FlowFieldCache
+shares one per (level, target, terrain token) between every monster chasing
+that player, and a field is rebuilt only when the target moves or walls
+change. Monsters are not obstacles in the field; the step picker skips tiles
+they occupy.
+"""
+
+from collections import OrderedDict, deque
+
+from visibility import IMPASSABLE_TERRAIN
+
+# BFS stops this many steps from the target; monsters further away fall back
+# to greedy Chebyshev steps.
+FLOW_MAX_STEPS = 48
+# Fields kept across all levels (one per chased player per terrain version).
+FLOW_CACHE_SIZE = 64
+# Distance byte for tiles the search did not reach.
+UNREACHED = 255
+
+_STEPS = (
+    (-1, -1), (-1, 0), (-1, 1),
+    (0, -1), (0, 1),
+    (1, -1), (1, 0), (1, 1),
+)
+
+
+def passability_bitmap(game_map):
+    """(h, w, bytes) with 1 where a tile can be walked on, indexed y * w + x."""
+    h = len(game_map)
+    w = len(game_map[0]) if h else 0
+    passability = getattr(game_map, 'passability', None)
+    if passability is not None:  # TileGrid keeps this per level
+        return h, w, passability()
+    return h, w, bytes(
+        0 if cell in IMPASSABLE_TERRAIN else 1 for row in game_map for cell in row
+    )
+
+
+class FlowField:
+    """Step distances to one target tile, one byte per map tile."""
+
+    __slots__ = ('target', 'token', 'height', 'width', 'dist')
+
+    def __init__(self, target, height, width):
+        self.target = (int(target[0]), int(target[1]))
+        # Terrain token of the TileGrid it was built on (None for list maps)
+        self.token = None
+        self.height = height
+        self.width = width
+        self.dist = bytearray([UNREACHED]) * (height * width)
+
+    def distance(self, y, x):
+        """Steps from (y, x) to the target, or None if not reached."""
+        if not (0 <= y < self.height and 0 <= x < self.width):
+            return None
+        d = self.dist[y * self.width + x]
+        return None if d == UNREACHED else d
+
+    def best_steps(self, tiles):
+        """The (y, x) in tiles with the smallest known distance ([] if none)."""
+        best_d = UNREACHED
+        best = []
+        for t in tiles:
+            d = self.distance(t[0], t[1])
+            if d is None:
+                continue
+            if d < best_d:
+                best_d = d
+                best = [t]
+            elif d == best_d:
+                best.append(t)
+        return best
+
+    def __repr__(self):
+        return f"FlowField(target={self.target}, {self.height}x{self.width})"
+
+
+def build_flow_field(game_map, target, max_steps=FLOW_MAX_STEPS):
+    """
+    BFS from target over walkable tiles, at most max_steps (< 255) away.
+
+    The target tile itself is always distance 0, even if a player stands on
+    terrain monsters could not enter.
+    """
+    h, w, passable = passability_bitmap(game_map)
+    field = FlowField(target, h, w)
+    terrain_token = getattr(game_map, 'terrain_token', None)
+    if terrain_token is not None:
+        field.token = terrain_token()
+    ty, tx = field.target
+    if not (0 <= ty < h and 0 <= tx < w):
+        return field
+    max_steps = max(0, min(int(max_steps), UNREACHED - 1))
+    dist = field.dist
+    dist[ty * w + tx] = 0
+    queue = deque([(ty, tx)])
+    while queue:
+        y, x = queue.popleft()
+        nd = dist[y * w + x] + 1
+        if nd > max_steps:
+            continue
+        for dy, dx in _STEPS:
+            ny, nx = y + dy, x + dx
+            if not (0 <= ny < h and 0 <= nx < w):
+                continue
+            i = ny * w + nx
+            if dist[i] != UNREACHED or not passable[i]:
+                continue
+            # Same corner rule as can_monster_step (it is symmetric).
+            if dy and dx and not (passable[ny * w + x] and passable[y * w + nx]):
+                continue
+            dist[i] = nd
+            queue.append((ny, nx))
+    return field
+
+
+class FlowFieldCache:
+    """(scope, target, terrain token) -> FlowField, least recently used first out."""
+
+    def __init__(self, max_entries=FLOW_CACHE_SIZE):
+        self.max_entries = max(1, int(max_entries))
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def field_for(self, scope, game_map, target):
+        """
+        Shared field toward target. Maps without a terrain token (plain
+        lists) are rebuilt on every call.
+        """
+        terrain_token = getattr(game_map, 'terrain_token', None)
+        if terrain_token is None:
+            return build_flow_field(game_map, target)
+        key = (scope, int(target[0]), int(target[1]), terrain_token())
+        field = self.entries.get(key)
+        if field is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return field
+        self.misses += 1
+        field = build_flow_field(game_map, target)
+        self.entries[key] = field
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return field
+
+
+def get_flow_fields(game_state):
+    """Lazy-create and return the FlowFieldCache stored on game_state."""
+    if not hasattr(game_state, 'flow_fields') or game_state.flow_fields is None:
+        game_state.flow_fields = FlowFieldCache()
+    return game_state.flow_fields
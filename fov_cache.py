@@ -0,0 +1,74 @@
+"""LRU cache of field-of-view results shared by everyone on a level.
+
+FOV depends only on where you stand, how far you see and what blocks sight.
+TileGrid levels expose that last part as a terrain token that changes only
+when a write flips a tile's opacity, so the same (level, origin, radius) can
+reuse one result until the walls change. Plain list maps (tests,
+interiors) are not cached.
+"""
+
+from collections import OrderedDict
+
+from visibility import compute_fov, update_explored
+
+# Results kept across all levels (a player FOV is a few hundred tiles).
+FOV_CACHE_SIZE = 1024
+# FOV keys each player remembers as already merged (most recent kept).
+MERGED_FOV_KEYS = 64
+
+
+class FovCache:
+    """(scope, origin, radius, terrain token) -> FovMask of visible tiles."""
+
+    def __init__(self, max_entries=FOV_CACHE_SIZE):
+        self.max_entries = max(1, int(max_entries))
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def visible_from(self, scope, game_map, origin, radius):
+        """
+        Return (fov_key, visible). fov_key is None when the map can't be
+        cached; visible is then a fresh compute_fov result.
+        """
+        token = getattr(game_map, 'terrain_token', None)
+        if token is None:
+            return None, compute_fov(game_map, origin, radius)
+        key = (scope, int(origin[0]), int(origin[1]), int(radius), token())
+        visible = self.entries.get(key)
+        if visible is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return key, visible
+        self.misses += 1
+        visible = compute_fov(game_map, origin, radius)
+        self.entries[key] = visible
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return key, visible
+
+
+def merge_explored(player, explored, fov_key, visible):
+    """
+    Union visible into explored, skipping FOVs already merged into this set.
+
+    Explored only grows, so once a cached FOV has been folded in, standing on
+    that tile again (back and forth down a corridor) adds nothing new. Only
+    the last MERGED_FOV_KEYS keys are remembered; an older one is merged
+    again, which is harmless.
+    """
+    if fov_key is None:
+        update_explored(explored, visible)
+        return
+    merged = getattr(player, 'merged_fov', None)
+    if merged is None or merged[0] is not explored:
+        merged = (explored, OrderedDict())
+        player.merged_fov = merged
+    keys = merged[1]
+    if fov_key in keys:
+        keys.move_to_end(fov_key)
+        return
+    update_explored(explored, visible)
+    keys[fov_key] = None
+    if len(keys) > MERGED_FOV_KEYS:
+        keys.popitem(last=False)
@@ -0,0 +1,255 @@
+"""Detect code that holds the eventlet hub without yielding.
+
+Every handler, monster round and background task shares one OS thread, so a
+slow call (ensure_level generating a map, a large broadcast, Elo
+calibration) stalls every player. A green heartbeat stamps the time every
+HEARTBEAT_SECONDS; a native monitor thread watches the stamp. When it is
+older than the threshold the hub is stuck: the monitor grabs that thread's
+current stack with sys._current_frames() (the greenlet that is running),
+names the Socket.IO handler (from the metrics.timed_handler frame, else the
+outermost project function) and the player id (a player_id-like local on
+the stack), and files the stall once the heartbeat comes back.
+
+Stalls are printed, kept in a bounded recent list, aggregated per
+(handler, blocking site), observed in the dungeon_hub_stall_seconds
+histogram, and appended to $HUB_WATCHDOG_LOG as JSON lines when set.
+
+    HUB_WATCHDOG_MS=100 py dungeon_crawler.py    # threshold (0 = off)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+import traceback
+from collections import deque
+
+from metrics import REGISTRY, timed_handler
+
+WATCHDOG_MS_ENV = 'HUB_WATCHDOG_MS'
+WATCHDOG_LOG_ENV = 'HUB_WATCHDOG_LOG'
+DEFAULT_THRESHOLD_MS = 150
+HEARTBEAT_SECONDS = 0.02
+RECENT_STALLS = 50
+STACK_DEPTH = 12
+# Locals that name the acting player in handlers and combat code.
+PLAYER_ID_LOCALS = ('player_id', 'moving_player_id', 'attacker_id', 'pid')
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+HUB_STALL_SECONDS = REGISTRY.histogram(
+    'dungeon_hub_stall_seconds', 'Time the eventlet hub went without yielding.',
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0), labelnames=('handler',),
+)
+_HANDLER_CODE = timed_handler('')(lambda: None).__code__
+
+
+def _in_project(filename):
+    path = os.path.abspath(filename)
+    return path.startswith(PROJECT_ROOT) and os.sep + 'site-packages' + os.sep not in path
+
+
+def _short_path(filename):
+    marker = os.sep + 'site-packages' + os.sep
+    return filename.split(marker, 1)[1] if marker in filename else os.path.basename(filename)
+
+
+def describe_stack(frame):
+    """
+    {'handler', 'player_id', 'site', 'stack'} for the stack ending at frame.
+    site is the innermost project frame ('file.py:123 in fn'), else the
+    innermost frame; handler is '(hub)' when no project code is running.
+    """
+    handler = None
+    player_id = None
+    site = None
+    outermost = None
+    walk = frame
+    while walk is not None:
+        code = walk.f_code
+        if code is _HANDLER_CODE and handler is None:
+            handler = walk.f_locals.get('name')
+        elif _in_project(code.co_filename):
+            if site is None:
+                site = f'{os.path.relpath(code.co_filename, PROJECT_ROOT)}:{walk.f_lineno} in {code.co_name}'
+            outermost = code.co_name
+            if player_id is None:
+                for local in PLAYER_ID_LOCALS:
+                    value = walk.f_locals.get(local)
+                    if isinstance(value, str):
+                        player_id = value
+                        break
+        walk = walk.f_back
+    if site is None and frame is not None:
+        # Stuck outside our code (serializing an emit, socket writes).
+        code = frame.f_code
+        site = f'{_short_path(code.co_filename)}:{frame.f_lineno} in {code.co_name}'
+    stack = traceback.format_stack(frame, limit=STACK_DEPTH) if frame is not None else []
+    return {
+        'handler': handler or outermost or '(hub)',
+        'player_id': player_id,
+        'site': site or '?',
+        'stack': ''.join(stack),
+    }
+
+
+def _hub_idle(frame):
+    """True when frame is the hub waiting for I/O (eventlet/hubs/*.py wait)."""
+    if frame is None:
+        return False
+    path = frame.f_code.co_filename
+    return (os.sep + 'eventlet' + os.sep + 'hubs' + os.sep) in path and frame.f_code.co_name in (
+        'do_poll', 'wait', 'sleep',
+    )
+
+
+class HubWatchdog:
+    """Heartbeat (green) + monitor (native thread) pair; see module doc."""
+
+    def __init__(self, threshold_ms=DEFAULT_THRESHOLD_MS, log_path=None, clock=time.monotonic,
+                 frames=sys._current_frames, echo=print):
+        self.threshold = threshold_ms / 1000.0
+        self.log_path = log_path
+        self.clock = clock
+        self.frames = frames
+        self.echo = echo
+        self.hub_thread = None
+        self.last_beat = clock()
+        self.stall = None  # describe_stack() of the open stall, plus 'since'
+        self.recent = deque(maxlen=RECENT_STALLS)
+        self.sites = {}  # (handler, site) -> {'count', 'total_ms', 'max_ms', 'player_ids'}
+        self.stalls = 0
+        self.starved = 0  # late heartbeats while the hub sat idle in poll
+        self.running = False
+
+    # -- heartbeat (runs on the hub) -------------------------------------------
+
+    def beat(self):
+        self.last_beat = self.clock()
+
+    def run_heartbeat(self, sleep, interval=HEARTBEAT_SECONDS):
+        """Background task: stamp the heartbeat every interval until stop()."""
+        while self.running:
+            self.beat()
+            sleep(interval)
+
+    # -- monitor (runs on a native thread) -------------------------------------
+
+    def check(self):
+        """One monitor pass: open a stall past threshold, close it on a new beat."""
+        now = self.clock()
+        beat = self.last_beat
+        if self.stall is not None:
+            if beat != self.stall['since']:
+                self._close(beat)
+            return
+        if now - beat > self.threshold:
+            frame = self.frames().get(self.hub_thread)
+            if _hub_idle(frame):
+                # Waiting in epoll, not running code: the process was starved
+                # of CPU, nothing on the hub is to blame.
+                self.stall = {'since': beat, 'idle': True}
+                return
+            self.stall = dict(describe_stack(frame), since=beat)
+
+    def _close(self, resumed_at):
+        stall, self.stall = self.stall, None
+        if stall.get('idle'):
+            self.starved += 1
+            return None
+        seconds = max(0.0, resumed_at - stall['since'])
+        event = {
+            'at': time.time(),
+            'ms': round(seconds * 1000, 1),
+            'handler': stall['handler'],
+            'player_id': stall['player_id'],
+            'site': stall['site'],
+            'stack': stall['stack'],
+        }
+        self.stalls += 1
+        self.recent.append(event)
+        agg = self.sites.setdefault(
+            (event['handler'], event['site']),
+            {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'player_ids': []},
+        )
+        agg['count'] += 1
+        agg['total_ms'] += event['ms']
+        agg['max_ms'] = max(agg['max_ms'], event['ms'])
+        if event['player_id'] and event['player_id'] not in agg['player_ids'][:5]:
+            agg['player_ids'] = ([event['player_id']] + agg['player_ids'])[:5]
+        HUB_STALL_SECONDS.observe(seconds, event['handler'])
+        who = f" (player {event['player_id']})" if event['player_id'] else ''
+        self.echo(f"Hub blocked {event['ms']:.0f} ms in {event['handler']}{who} at {event['site']}")
+        if self.log_path:
+            try:
+                with open(self.log_path, 'a', encoding='utf-8') as fh:
+                    fh.write(json.dumps(event) + '\n')
+            except OSError as exc:
+                self.echo(f'Hub watchdog log failed: {exc}')
+        return event
+
+    def run_monitor(self, sleep=time.sleep):
+        while self.running:
+            self.check()
+            sleep(self.threshold / 4)
+
+    def start(self, socketio):
+        """Heartbeat on the hub, monitor on a native thread. Returns self."""
+        threading = _native('threading')
+        self.hub_thread = threading.get_ident()
+        self.running = True
+        self.last_beat = self.clock()
+        socketio.start_background_task(self.run_heartbeat, socketio.sleep)
+        monitor = threading.Thread(
+            target=self.run_monitor, args=(_native('time').sleep,),
+            name='hub-watchdog', daemon=True,
+        )
+        monitor.start()
+        return self
+
+    def stop(self):
+        self.running = False
+
+    def report(self, top=10):
+        """Slowest blocking sites by total stalled time, as text."""
+        rows = sorted(self.sites.items(), key=lambda kv: kv[1]['total_ms'], reverse=True)[:top]
+        lines = [f'{self.stalls} hub stalls over {self.threshold * 1000:.0f} ms']
+        for (handler, site), agg in rows:
+            lines.append(
+                f"  {agg['total_ms']:9.0f} ms total  {agg['count']:5d}x  max {agg['max_ms']:7.0f} ms  "
+                f"{handler} @ {site}"
+            )
+        return '\n'.join(lines)
+
+    def stats(self):
+        """Counters for monitoring."""
+        return {
+            'stalls': self.stalls,
+            'starved': self.starved,
+            'threshold_ms': self.threshold * 1000,
+            'stalled_now': 1 if self.stall is not None and not self.stall.get('idle') else 0,
+        }
+
+
+def _native(module):
+    """The unpatched stdlib module (a real OS thread / sleep) when serving."""
+    try:
+        from eventlet import patcher
+    except ImportError:
+        return __import__(module)
+    if patcher.is_monkey_patched('thread'):
+        return patcher.original(module)
+    return __import__(module)
+
+
+def watchdog_from_env(environ=None):
+    """HubWatchdog configured from $HUB_WATCHDOG_MS / $HUB_WATCHDOG_LOG, or None if 0."""
+    env = environ if environ is not None else os.environ
+    try:
+        threshold = float(env.get(WATCHDOG_MS_ENV, DEFAULT_THRESHOLD_MS))
+    except ValueError:
+        threshold = DEFAULT_THRESHOLD_MS
+    if threshold <= 0:
+        return None
+    return HubWatchdog(threshold, log_path=env.get(WATCHDOG_LOG_ENV) or None)
@@ -0,0 +1,161 @@
+"""Who can observe what: players indexed by the map they are on.
+
+A context is (dungeon_level, interior_id) — interior_id is None on the open
+level. Broadcasts for a move, a monster round or a fight only need to reach
+players subscribed to the affected context(s), so their cost follows that
+map's population rather than everyone online.
+
+The same index files each body under its tile, so "who stands on (y, x)"
+is a dict lookup instead of a scan over every player.
+"""
+
+
+def context_key(player):
+    """(dungeon_level, interior_id) for the map this player is looking at."""
+    return (
+        getattr(player, 'dungeon_level', 0),
+        getattr(player, 'interior_id', None) or None,
+    )
+
+
+def tile_key(player):
+    """(y, x) a player currently stands on."""
+    return (player.pos[0], player.pos[1])
+
+
+class InterestIndex:
+    """
+    player_id <-> context subscriptions and tiles, kept current on moves.
+
+    Indexed players notify the index themselves (Player.on_move) when their
+    pos, dungeon_level or interior_id is assigned, so code that moves a body
+    directly does not leave it filed under its old map or tile.
+    """
+
+    def __init__(self):
+        self.contexts = {}  # player_id -> context key
+        self.members = {}  # context key -> set(player_id)
+        self.spots = {}  # player_id -> (context key, (y, x))
+        self.tiles = {}  # (context key, (y, x)) -> set(player_id)
+
+    def update(self, player_id, player):
+        """(Re)file player_id under the context and tile its player is on."""
+        if getattr(player, 'on_move', None) != self.moved:
+            try:
+                player.on_move = self.moved
+            except AttributeError:
+                pass  # a stand-in body without the hook
+        key = context_key(player)
+        old = self.contexts.get(player_id)
+        if old != key:
+            if old is not None:
+                self._leave(player_id, old)
+            self.contexts[player_id] = key
+            self.members.setdefault(key, set()).add(player_id)
+        spot = (key, tile_key(player))
+        old_spot = self.spots.get(player_id)
+        if old_spot != spot:
+            if old_spot is not None:
+                self._vacate(player_id, old_spot)
+            self.spots[player_id] = spot
+            self.tiles.setdefault(spot, set()).add(player_id)
+
+    def moved(self, player):
+        """Player.on_move hook: re-file a body this index already tracks."""
+        player_id = getattr(player, 'id', None)
+        if player_id in self.contexts and player_id is not None:
+            self.update(player_id, player)
+
+    def discard(self, player_id):
+        old = self.contexts.pop(player_id, None)
+        if old is not None:
+            self._leave(player_id, old)
+        old_spot = self.spots.pop(player_id, None)
+        if old_spot is not None:
+            self._vacate(player_id, old_spot)
+
+    def _leave(self, player_id, key):
+        members = self.members.get(key)
+        if members is None:
+            return
+        members.discard(player_id)
+        if not members:
+            del self.members[key]
+
+    def _vacate(self, player_id, spot):
+        here = self.tiles.get(spot)
+        if here is None:
+            return
+        here.discard(player_id)
+        if not here:
+            del self.tiles[spot]
+
+    def rebuild(self, players):
+        self.contexts = {}
+        self.members = {}
+        self.spots = {}
+        self.tiles = {}
+        for pid, player in players.items():
+            self.update(pid, player)
+
+    def sync(self, players):
+        """
+        Make sure every body is indexed. Bodies are added and removed in a
+        few places (join, death, tests seeding state); a count mismatch is
+        cheap to detect and a rebuild is O(players).
+        """
+        if len(self.contexts) != len(players):
+            self.rebuild(players)
+
+    def subscribers(self, key, players):
+        """player_ids whose player is really in ``key`` (stale entries re-filed)."""
+        found = []
+        for pid in list(self.members.get(key, ())):
+            player = players.get(pid)
+            if player is None:
+                self.discard(pid)
+                continue
+            if context_key(player) != key:
+                self.update(pid, player)
+                continue
+            found.append(pid)
+        return found
+
+    def occupant(self, key, y, x, players, exclude=None):
+        """
+        (player_id, player) standing on (y, x) in context ``key``, or
+        (None, None). Entries whose body has since left are re-filed.
+        """
+        spot = (key, (y, x))
+        for pid in list(self.tiles.get(spot, ())):
+            player = players.get(pid)
+            if player is None:
+                self.discard(pid)
+                continue
+            if context_key(player) != key or tile_key(player) != (y, x):
+                self.update(pid, player)
+                continue
+            if pid != exclude:
+                return pid, player
+        return None, None
+
+
+class ContextPlayers(dict):
+    """
+    player_id -> Player for one context, with O(1) tile lookups.
+
+    A plain dict to every existing caller; occupancy checks use ``at``.
+    """
+
+    def __init__(self, members, index, key, everyone):
+        super().__init__(members)
+        self._index = index
+        self._key = key
+        self._everyone = everyone
+
+    def at(self, y, x, exclude=None):
+        """(player_id, player) on (y, x), or (None, None)."""
+        pid, player = self._index.occupant(self._key, y, x, self._everyone, exclude)
+        if pid is not None and pid not in self:
+            return None, None
+        return pid, player
@@ -10,6 +10,7 @@ from pathlib import Path
 
 from item_types.base import ItemTypeDef
 from item_types.registry import register_item_type
+from sheet_cache import cached_sheet_rows
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 DEFAULT_XLSX_PATH = PROJECT_ROOT / 'item_types.xlsx'
@@ -142,14 +143,19 @@ def typedefs_from_rows(rows):
     return types
 
 
-def load_item_sheet(path, register=True):
-    """Load item types from a .xlsx workbook. Returns the ItemTypeDef list."""
+def load_item_sheet(path, register=True, use_cache=True):
+    """Load item types from a .xlsx workbook. Returns the ItemTypeDef list.
+
+    Rows come from the sheet_cache JSON beside the workbook while it is
+    unchanged; openpyxl is only imported to re-read an edited workbook.
+    """
     path = Path(path)
     if not path.is_file():
         raise FileNotFoundError(path)
     if path.suffix.lower() != '.xlsx':
         raise ValueError(f'Item sheet must be .xlsx, got: {path.suffix}')
-    types = typedefs_from_rows(iter_xlsx_rows(path))
+    rows = cached_sheet_rows(path, iter_xlsx_rows) if use_cache else iter_xlsx_rows(path)
+    types = typedefs_from_rows(rows)
     if register:
         for type_def in types:
             register_item_type(type_def)
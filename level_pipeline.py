@@ -0,0 +1,190 @@
+"""Generate dungeon levels ahead of the players, off the request path.
+
+Carving a level (up to MAX_GEN_ATTEMPTS tries) takes long enough to stall
+the whole eventlet hub when it happens inside a 'move' handler. The
+pipeline starts building level N+1 (and a little further) as soon as anyone
+reaches level N, in a native thread via eventlet.tpool, so the stair step
+that needs it usually finds it ready.
+
+A level's up stairs sit under the previous level's down stairs, so each job
+needs the level above it to exist (or be ready) first; jobs run one at a
+time and chain downward. Finished levels wait in ``ready`` until
+GameState.ensure_level adopts them.
+"""
+
+import time
+from collections import deque
+
+from map_generator import MapGenerator
+from metrics import LEVEL_GEN_SECONDS
+from monster_elo import refine_spawn_ratings  # noqa: F401 — re-exported for the server entry point
+from tile_grid import TileGrid
+
+# Levels kept generated below the deepest level anyone has reached.
+LEVEL_PREFETCH_DEPTH = 2
+# Set False to always generate on demand (inside the request).
+LEVEL_PREFETCH_ENABLED = True
+# Recent generation times kept for stats.
+GEN_TIME_SAMPLES = 50
+
+
+class _Done:
+    """Handle for a job that already ran (synchronous runner)."""
+
+    def __init__(self, result):
+        self.result = result
+
+    def wait(self):
+        return self.result
+
+
+def run_inline(job, on_done):
+    """Runner that generates immediately in the caller (tests, no eventlet)."""
+    result = job()
+    on_done(result)
+    return _Done(result)
+
+
+def run_in_thread(job, on_done):
+    """Run job in eventlet's native thread pool; on_done fires in the hub."""
+    import eventlet
+    from eventlet import tpool
+
+    thread = eventlet.spawn(tpool.execute, job)
+    thread.link(lambda gt: on_done(gt.wait()))
+    return thread
+
+
+class LevelPipeline:
+    """Background builder of (TileGrid, monsters) levels for one GameState."""
+
+    def __init__(self, levels, find_tile, make_generator=MapGenerator,
+                 depth=LEVEL_PREFETCH_DEPTH, runner=run_in_thread):
+        self.levels = levels  # GameState.levels (read only here)
+        self.find_tile = find_tile  # (game_map, glyph) -> [y, x] or None
+        self.make_generator = make_generator
+        self.depth = max(0, int(depth))
+        self.runner = runner
+        self.ready = {}  # level -> (TileGrid, monsters)
+        self.pending = {}  # level -> job handle with wait()
+        self.horizon = 0  # deepest level worth having generated
+        self.paused = False  # True while take() generates in the caller
+        self.gen_seconds = deque(maxlen=GEN_TIME_SAMPLES)
+        self.generated = 0
+        self.hits = 0  # ensure_level found the level ready
+        self.misses = 0  # ensure_level had to generate it itself
+        self.failures = 0
+
+    def _known(self, level_number):
+        return level_number in self.levels or level_number in self.ready
+
+    def _stairs_down(self, level_number):
+        """Down-stair tile of an existing or ready level, or None."""
+        entry = self.levels.get(level_number) or self.ready.get(level_number)
+        if entry is None:
+            return None
+        return self.find_tile(entry[0], '↓')
+
+    def reached(self, level_number):
+        """Someone is on level_number: keep the next few levels coming."""
+        self.horizon = max(self.horizon, int(level_number) + self.depth)
+        self._schedule_next()
+
+    def _schedule_next(self):
+        if self.pending or self.paused:
+            return  # one job at a time; completion schedules the next
+        level = 1
+        while level <= self.horizon:
+            if not self._known(level):
+                stairs = self._stairs_down(level - 1)
+                if stairs is None:
+                    return  # the level above isn't there yet
+                self._start(level, stairs)
+                return
+            level += 1
+
+    def _start(self, level_number, stairs_up_pos):
+        def job():
+            return self._generate(level_number, stairs_up_pos)
+
+        def on_done(result):
+            self._finish(level_number, result)
+
+        self.pending[level_number] = None
+        handle = self.runner(job, on_done)
+        if level_number in self.pending:
+            self.pending[level_number] = handle
+
+    def _generate(self, level_number, stairs_up_pos):
+        """Build one level (worker side). Returns (level, seconds) or None."""
+        start = time.perf_counter()
+        try:
+            game_map, monsters = self.make_generator().generate_level(
+                stairs_up_pos=stairs_up_pos
+            )
+        except Exception as exc:  # keep the hub alive; ensure_level retries inline
+            print(f"[level_pipeline] level {level_number} failed: {exc!r}")
+            return None
+        return (TileGrid.from_rows(game_map), monsters), time.perf_counter() - start
+
+    def _finish(self, level_number, result):
+        if level_number not in self.pending:
+            return  # already collected by take()
+        del self.pending[level_number]
+        if result is None:
+            self.failures += 1
+            return
+        level, seconds = result
+        self.gen_seconds.append(seconds)
+        LEVEL_GEN_SECONDS.observe(seconds, 'prefetch')
+        self.generated += 1
+        if level_number not in self.levels:
+            self.ready[level_number] = level
+        self._schedule_next()
+
+    def take(self, level_number, stairs_up_pos=None):
+        """
+        (TileGrid, monsters) for a level nobody has entered yet: the ready
+        one if prefetched, else generated now (after any running job, so
+        generation never runs twice at once).
+        """
+        handle = self.pending.get(level_number)
+        if handle is not None:
+            self._finish(level_number, handle.wait())
+        level = self.ready.pop(level_number, None)
+        if level is not None:
+            self.hits += 1
+            return level
+        self.misses += 1
+        self.paused = True
+        try:
+            for other, handle in list(self.pending.items()):
+                if handle is not None:
+                    self._finish(other, handle.wait())
+            result = self._generate(level_number, stairs_up_pos)
+            if result is None:
+                game_map, monsters = self.make_generator().generate_level(
+                    stairs_up_pos=stairs_up_pos
+                )
+                return TileGrid.from_rows(game_map), monsters
+            level, seconds = result
+            self.gen_seconds.append(seconds)
+            LEVEL_GEN_SECONDS.observe(seconds, 'request')
+            self.generated += 1
+            return level
+        finally:
+            self.paused = False
+
+    def stats(self):
+        """Counters and recent generation times (seconds) for monitoring."""
+        samples = list(self.gen_seconds)
+        return {
+            'generated': self.generated,
+            'ready': sorted(self.ready),
+            'pending': sorted(self.pending),
+            'hits': self.hits,
+            'misses': self.misses,
+            'failures': self.failures,
+            'last_gen_seconds': samples[-1] if samples else None,
+            'avg_gen_seconds': sum(samples) / len(samples) if samples else None,
+        }
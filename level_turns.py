@@ -4,6 +4,8 @@ No real-world time: player actions accumulate until active-player threshold,
 then one monster/world round runs on that level only.
 """
 
+from tracing import span
+
 ACTIVE_PLAYER_ROUND_WINDOW = 3
 LEVEL_TURNS_DEBUG = False
 
@@ -132,10 +134,11 @@ def register_player_turn_action(game_state, player_id, combat_system=None, socke
             if is_player_active_on_level(turn_state, pid, p, level_number)
         }
 
-        run_monster_round_for_level(
-            game_state, level_number, combat_system, socketio,
-            broadcast=False,
-        )
+        with span('monster_round', level=level_number):
+            run_monster_round_for_level(
+                game_state, level_number, combat_system, socketio,
+                broadcast=False,
+            )
         turn_state.completed_round += 1
         rounds_fired += 1
         _debug(
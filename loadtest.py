@@ -0,0 +1,567 @@
+"""Headless Socket.IO load generator for dungeon_crawler.py.
+
+    py loadtest.py --scenario town --bots 50 --duration 30
+    py loadtest.py --scenario all --bots 40 --json
+    py loadtest.py --scenario town --url http://127.0.0.1:5000   # running server
+
+Each bot is a thread speaking Engine.IO 4 / Socket.IO 5 over one websocket
+(simple-websocket, already installed with Flask-SocketIO). Bots behave like
+the browser client: they wait for server_hello, send select_id with a
+viewport, ack every frame so the server sends deltas, and hold a direction
+to send 'move' every MOVE_MS. They steer round walls using the map they are
+sent, now and then resize (set_viewport) or pan (pan_camera), and attack
+when a combat_update says it is their turn.
+
+Scenarios (the harness starts its own server on --port):
+
+    town     everyone joins in town (a fresh world)
+    spread   bots start spread over dungeon levels 1-10
+    combat   each bot starts next to a monster and walks into any it sees
+
+spread and combat seed the world with persistence.WorldStore and boot the
+server from it (DUNGEON_PERSIST_DIR), so their numbers include WAL writes.
+
+Reported: move -> own game_state latency (p50/p95/p99; a move counts as
+answered when a frame shows the bot's position changed), moves with no
+answer within MOVE_TIMEOUT, server emits per second by event, and payload
+bytes per player.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+from visibility import IMPASSABLE_TERRAIN, OPEN_GROUND
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+SCENARIOS = ('town', 'spread', 'combat')
+# Hold-to-move cadence of the browser client (PlayerPresentation.MOVE_MS).
+MOVE_MS = 250
+# A move with no position change after this long is counted as unanswered.
+MOVE_TIMEOUT = 1.0
+SPREAD_LEVELS = 10
+VIEWPORTS = ((15, 25), (19, 31), (21, 35), (25, 41))
+DIRECTIONS = {
+    'n': (-1, 0), 'ne': (-1, 1), 'e': (0, 1), 'se': (1, 1),
+    's': (1, 0), 'sw': (1, -1), 'west': (0, -1), 'nw': (-1, -1),
+}
+# Glyphs a bot walks onto. Stairs and doors are left alone so bots stay
+# where the scenario put them.
+WALKABLE = OPEN_GROUND | {','}
+PAN_CHANCE = 0.03
+RESIZE_CHANCE = 0.01
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of values (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.4999)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class BotStats:
+    """Counters one bot fills in; merged after the run."""
+
+    def __init__(self):
+        self.latencies = []  # seconds, move sent -> frame showing the step
+        self.moves_sent = 0
+        self.unanswered = 0
+        self.events = {}  # event name -> count
+        self.bytes = 0
+        self.attacks = 0
+        self.deaths = 0
+        self.errors = []
+        self.joined = False
+
+
+class Bot:
+    """One headless client."""
+
+    def __init__(self, name, ws_url, rng, stop_at, plan=None, clock=time.monotonic):
+        self.name = name
+        self.ws_url = ws_url
+        self.rng = rng
+        self.stop_at = stop_at
+        self.plan = plan or {}
+        self.clock = clock
+        self.stats = BotStats()
+        self.ws = None
+        self.viewport = rng.choice(VIEWPORTS)
+        self.joined = False
+        self.dead = False
+        self.in_combat = False
+        self.attack_at = None
+        self.pos = None
+        self.context = None
+        self.camera = (0, 0)
+        self.map = []
+        self.frame_pos = {}  # version -> (pos, context) for delta bases
+        self.pending = []  # (sent_at, target pos, context) of unanswered moves
+        self.heading = None
+        self.heading_left = 0
+        self.next_move_at = 0.0
+
+    # -- wire ----------------------------------------------------------------
+
+    def _send(self, text):
+        self.ws.send(text)
+
+    def emit(self, event, data=None):
+        payload = [event] if data is None else [event, data]
+        self._send('42' + json.dumps(payload, separators=(',', ':')))
+
+    def connect(self):
+        import simple_websocket
+
+        self.ws = simple_websocket.Client.connect(self.ws_url)
+        # Connect the namespace straight away: simple-websocket leaves an
+        # open packet that shares a read with the handshake response in its
+        # buffer until more data arrives, and the reply to '40' flushes it.
+        self._send('40')
+
+    def close(self):
+        if self.ws is None:
+            return
+        try:
+            self._send('41')
+            self.ws.close()
+        except Exception:
+            pass
+
+    def run(self):
+        try:
+            self.connect()
+            self.loop()
+            self.expire_moves(self.clock())
+        except Exception as exc:
+            self.stats.errors.append(repr(exc))
+        finally:
+            self.close()
+
+    def loop(self):
+        while not self.dead:
+            now = self.clock()
+            if now >= self.stop_at:
+                return
+            wake = self.stop_at
+            if self.joined:
+                wake = min(wake, self.next_move_at)
+                if self.attack_at is not None:
+                    wake = min(wake, self.attack_at)
+            message = self.ws.receive(timeout=max(0.0, wake - now))
+            if message is not None:
+                self.handle(message)
+            if self.joined:
+                self.act(self.clock())
+
+    def handle(self, message):
+        if isinstance(message, bytes):
+            return
+        if message == '2':  # Engine.IO ping
+            self._send('3')
+            return
+        if not message.startswith('42'):
+            return
+        self.stats.bytes += len(message)
+        event, *rest = json.loads(message[2:])
+        data = rest[0] if rest else None
+        self.stats.events[event] = self.stats.events.get(event, 0) + 1
+        if event == 'server_hello':
+            h, w = self.viewport
+            self.emit('select_id', {'id': self.name, 'boot_id': data['boot_id'], 'h': h, 'w': w})
+        elif event == 'game_state':
+            self.on_frame(data, full=True)
+        elif event == 'game_state_delta':
+            self.on_frame(data, full=False)
+        elif event == 'combat_update':
+            self.on_combat(data or {})
+        elif event == 'player_died':
+            self.stats.deaths += 1
+            self.dead = True
+        elif event in ('id_taken', 'world_reset'):
+            self.stats.errors.append(event)
+            self.dead = True
+
+    # -- frames --------------------------------------------------------------
+
+    def on_frame(self, data, full):
+        if not data:
+            return
+        version = data.get('version')
+        if full:
+            player = data.get('player')
+            if not player:
+                return  # spectator frame before select_id is handled
+            camera = data.get('camera') or {}
+            self.camera = (camera.get('y', 0), camera.get('x', 0))
+            self.map = [list(row) for row in data.get('map') or []]
+            pos = player.get('pos')
+            context = (player.get('dungeon_level'), player.get('interior_id'))
+            self.frame_pos = {}
+        else:
+            base = self.frame_pos.get(data.get('base'))
+            if base is None or not self.map:
+                self.emit('state_resync', {})
+                return
+            for vy, vx, char, _fog in data.get('tiles') or []:
+                if 0 <= vy < len(self.map) and 0 <= vx < len(self.map[vy]):
+                    self.map[vy][vx] = char
+            changed = data.get('player') or {}
+            pos = changed.get('pos', base[0])
+            context = base[1]
+        if not self.joined:
+            self.joined = self.stats.joined = True
+            self.next_move_at = self.clock() + self.rng.random() * MOVE_MS / 1000.0
+        self.frame_pos[version] = (pos, context)
+        for old in [v for v in self.frame_pos if v is not None and version is not None and v < version - 16]:
+            del self.frame_pos[old]
+        if pos is not None and (pos != self.pos or context != self.context):
+            self.on_moved(pos, context)
+        if version is not None:
+            self.emit('state_ack', {'version': version})
+
+    def expire_moves(self, now):
+        while self.pending and now - self.pending[0][0] > MOVE_TIMEOUT:
+            self.pending.pop(0)
+            self.stats.unanswered += 1
+
+    def on_moved(self, pos, context):
+        now = self.clock()
+        self.expire_moves(now)
+        # Blocked moves never get a frame: answer the move that leads here
+        # and count the ones queued before it as unanswered.
+        for index, (sent_at, target, sent_context) in enumerate(self.pending):
+            if target == list(pos) and sent_context == context:
+                self.stats.latencies.append(now - sent_at)
+                self.stats.unanswered += index
+                del self.pending[:index + 1]
+                break
+        else:
+            if self.pending:  # stairs, doors: the step went somewhere else
+                sent_at, _target, _context = self.pending.pop(0)
+                self.stats.latencies.append(now - sent_at)
+        self.pos = list(pos)
+        self.context = context
+
+    def on_combat(self, data):
+        kind = data.get('type')
+        if kind == 'combat_start':
+            self.in_combat = True
+            self.pending.clear()  # the bump started a fight instead of a step
+        if kind == 'combat_end':
+            self.in_combat = False
+            self.attack_at = None
+            return
+        if data.get('your_turn'):
+            self.in_combat = True
+            self.attack_at = self.clock() + self.rng.uniform(0.15, 0.4)
+
+    # -- behaviour -----------------------------------------------------------
+
+    def glyph_at(self, y, x):
+        vy, vx = y - self.camera[0], x - self.camera[1]
+        if 0 <= vy < len(self.map) and 0 <= vx < len(self.map[vy]):
+            return self.map[vy][vx]
+        return None
+
+    def can_step(self, dy, dx, goal=WALKABLE):
+        """Mirror GameState.is_valid_move: diagonals may not cut a corner."""
+        y, x = self.pos
+        if self.glyph_at(y + dy, x + dx) not in goal:
+            return False
+        if dy and dx:
+            for corner in (self.glyph_at(y + dy, x), self.glyph_at(y, x + dx)):
+                if corner in (None, ' ') or corner in IMPASSABLE_TERRAIN:
+                    return False
+        return True
+
+    def pick_direction(self):
+        if self.plan.get('hunt'):
+            for name, (dy, dx) in DIRECTIONS.items():
+                if self.can_step(dy, dx, goal='&'):
+                    return name
+        if self.heading and self.heading_left > 0 and self.can_step(*DIRECTIONS[self.heading]):
+            self.heading_left -= 1
+            return self.heading
+        options = [name for name, delta in DIRECTIONS.items() if self.can_step(*delta)]
+        if not options:
+            return None
+        self.heading = self.rng.choice(options)
+        self.heading_left = self.rng.randint(3, 10)
+        return self.heading
+
+    def act(self, now):
+        if self.attack_at is not None and now >= self.attack_at:
+            self.attack_at = None
+            self.emit('combat_action', {'action': 'attack'})
+            self.stats.attacks += 1
+        if now < self.next_move_at:
+            return
+        self.expire_moves(now)
+        self.next_move_at = now + MOVE_MS / 1000.0
+        if self.in_combat or self.pos is None:
+            return
+        roll = self.rng.random()
+        if roll < RESIZE_CHANCE:
+            self.viewport = self.rng.choice(VIEWPORTS)
+            h, w = self.viewport
+            self.emit('set_viewport', {'h': h, 'w': w})
+            return
+        if roll < RESIZE_CHANCE + PAN_CHANCE:
+            self.emit('pan_camera', {'dy': self.rng.randint(-3, 3), 'dx': self.rng.randint(-3, 3)})
+            return
+        direction = self.pick_direction()
+        if direction is None:
+            return
+        dy, dx = DIRECTIONS[direction]
+        self.pending.append((now, [self.pos[0] + dy, self.pos[1] + dx], self.context))
+        self.emit('move', direction)
+        self.stats.moves_sent += 1
+
+
+# -- worlds and servers --------------------------------------------------------
+
+
+def bot_names(count):
+    return [f'bot{n:03d}' for n in range(count)]
+
+
+def _adjacent_free(game, level, target):
+    game_map, monsters = game.ensure_level(level)
+    players = game.players_on_level(level)
+    for dy, dx in DIRECTIONS.values():
+        y, x = target[0] - dy, target[1] - dx
+        if game._is_arrival_tile_free(y, x, game_map, monsters, players) and game_map[y][x] in WALKABLE:
+            return [y, x]
+    return None
+
+
+def seed_world(directory, scenario, names, seed):
+    """
+    Build a world with the bots' bodies placed for scenario and save it as a
+    persistence snapshot in directory. Returns {name: plan} ({'hunt': True} for combat).
+    """
+    from dungeon_crawler import GameState
+    from persistence import WorldStore
+
+    random.seed(seed)
+    game = GameState()
+    plans = {}
+    targets = []
+    for index, name in enumerate(names):
+        game.add_player(name)
+        player = game.players[name]
+        level = 1 + index % SPREAD_LEVELS if scenario == 'spread' else 1
+        placed = None
+        if scenario == 'combat':
+            while placed is None:
+                if not targets:
+                    level_number = 1 + len([n for n in game.levels if n > 0])
+                    _grid, monsters = game.ensure_level(level_number)
+                    targets = [(level_number, list(pos)) for pos in monsters]
+                    random.shuffle(targets)
+                    if not targets:
+                        continue
+                level, target = targets[-1]
+                placed = _adjacent_free(game, level, target)
+                if placed is None:
+                    targets.pop()
+                else:
+                    plans[name] = {'hunt': True}
+        else:
+            placed = game.find_random_start(level)
+        player.dungeon_level = level
+        player.pos = placed
+        game.update_interest(player)
+        game.recompute_visibility(player)
+    game.active_players.clear()
+    store = WorldStore(directory)
+    store.start(game, f'loadtest-{seed}')
+    store.close()
+    return plans
+
+
+def wait_for_server(base_url, timeout=30.0, proc=None):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f'server exited with {proc.returncode}')
+        try:
+            with urllib.request.urlopen(base_url + '/', timeout=1) as resp:
+                if resp.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f'{base_url} did not come up in {timeout:.0f}s')
+
+
+def start_server(port, persist_dir=None, log_path=None):
+    env = dict(os.environ, PORT=str(port), RENDER='1')
+    env.pop('DUNGEON_PERSIST_DIR', None)
+    if persist_dir:
+        env['DUNGEON_PERSIST_DIR'] = str(persist_dir)
+    log = open(log_path, 'w') if log_path else subprocess.DEVNULL
+    return subprocess.Popen(
+        [sys.executable, 'dungeon_crawler.py'], cwd=PROJECT_ROOT, env=env,
+        stdout=log, stderr=subprocess.STDOUT,
+    )
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+# -- runs ----------------------------------------------------------------------
+
+
+def run_bots(base_url, names, duration, seed, plans=None, ramp=2.0):
+    """Run one bot per name for duration seconds; returns merged results."""
+    ws_url = base_url.replace('http', 'ws', 1) + '/socket.io/?EIO=4&transport=websocket'
+    started = time.monotonic()
+    stop_at = started + ramp + duration
+    bots = [
+        Bot(name, ws_url, random.Random(f'{seed}:{name}'), stop_at, (plans or {}).get(name))
+        for name in names
+    ]
+    threads = []
+    for i, bot in enumerate(bots):
+        thread = threading.Thread(target=bot.run, name=bot.name, daemon=True)
+        threads.append(thread)
+        # Spread connects over the ramp so joins do not all land at once.
+        delay = started + ramp * i / max(1, len(bots)) - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=max(1.0, stop_at - time.monotonic() + 15))
+    return summarize([bot.stats for bot in bots], time.monotonic() - started)
+
+
+def summarize(stats, elapsed):
+    latencies = [s for bot in stats for s in bot.latencies]
+    events = {}
+    for bot in stats:
+        for event, count in bot.events.items():
+            events[event] = events.get(event, 0) + count
+    emits = sum(events.values())
+    total_bytes = sum(bot.bytes for bot in stats)
+    joined = sum(1 for bot in stats if bot.joined)
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 2)
+
+    return {
+        'bots': len(stats),
+        'joined': joined,
+        'seconds': round(elapsed, 2),
+        'moves_sent': sum(bot.moves_sent for bot in stats),
+        'moves_answered': len(latencies),
+        'moves_unanswered': sum(bot.unanswered for bot in stats),
+        'latency_ms': {
+            'p50': ms(percentile(latencies, 50)),
+            'p95': ms(percentile(latencies, 95)),
+            'p99': ms(percentile(latencies, 99)),
+            'max': ms(max(latencies) if latencies else None),
+        },
+        'emits': emits,
+        'emits_per_second': round(emits / elapsed, 1) if elapsed else None,
+        'events': dict(sorted(events.items())),
+        'bytes_per_player_per_second': round(total_bytes / max(1, joined) / elapsed, 1) if elapsed else None,
+        'avg_emit_bytes': round(total_bytes / emits, 1) if emits else None,
+        'attacks': sum(bot.attacks for bot in stats),
+        'deaths': sum(bot.deaths for bot in stats),
+        'errors': [err for bot in stats for err in bot.errors][:10],
+    }
+
+
+def run_scenario(scenario, bots, duration, seed=1, port=5099, url=None, keep_logs=None):
+    names = bot_names(bots)
+    if url:
+        if scenario != 'town':
+            raise SystemExit('--url only drives the town scenario; spread/combat seed their own server')
+        result = run_bots(url.rstrip('/'), names, duration, seed)
+        result['scenario'] = scenario
+        return result
+    with tempfile.TemporaryDirectory(prefix='loadtest-') as tmp:
+        persist_dir = None
+        plans = None
+        if scenario != 'town':
+            persist_dir = Path(tmp) / 'world'
+            plans = seed_world(persist_dir, scenario, names, seed)
+        log_path = Path(keep_logs or tmp) / f'server-{scenario}.log'
+        proc = start_server(port, persist_dir, log_path)
+        base_url = f'http://127.0.0.1:{port}'
+        try:
+            wait_for_server(base_url, proc=proc)
+            result = run_bots(base_url, names, duration, seed, plans)
+        finally:
+            stop_server(proc)
+    result['scenario'] = scenario
+    return result
+
+
+def format_result(result):
+    lat = result['latency_ms']
+    lines = [
+        f"scenario {result['scenario']}: {result['joined']}/{result['bots']} bots joined, "
+        f"{result['seconds']:.1f} s",
+        f"  moves     {result['moves_sent']:,} sent, {result['moves_answered']:,} answered, "
+        f"{result['moves_unanswered']:,} unanswered",
+        f"  move -> game_state  p50 {lat['p50']} ms  p95 {lat['p95']} ms  "
+        f"p99 {lat['p99']} ms  max {lat['max']} ms",
+        f"  emits     {result['emits']:,} ({result['emits_per_second']}/s)  "
+        + '  '.join(f'{k} {v:,}' for k, v in result['events'].items()),
+        f"  payload   {result['bytes_per_player_per_second']} B/s per player, "
+        f"{result['avg_emit_bytes']} B per emit",
+    ]
+    if result['attacks'] or result['deaths']:
+        lines.append(f"  combat    {result['attacks']:,} attacks, {result['deaths']} deaths")
+    if result['errors']:
+        lines.append(f"  errors    {result['errors']}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Socket.IO load test for dungeon_crawler.py.')
+    parser.add_argument('--scenario', choices=SCENARIOS + ('all',), default='town')
+    parser.add_argument('--bots', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds after the join ramp')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--port', type=int, default=5099, help='port for the spawned server')
+    parser.add_argument('--url', type=str, default=None, help='drive an already running server (town only)')
+    parser.add_argument('--logs', type=str, default=None, help='keep server logs in this directory')
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args(argv)
+    scenarios = SCENARIOS if args.scenario == 'all' else (args.scenario,)
+    results = []
+    for scenario in scenarios:
+        result = run_scenario(
+            scenario, args.bots, args.duration, args.seed, args.port, args.url, args.logs,
+        )
+        results.append(result)
+        if not args.json:
+            print(format_result(result))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
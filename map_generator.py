@@ -4,7 +4,7 @@ from collections import deque
 from monster import Monster
 from monster_types.registry import get_monster_type, pick_spawn_type_id
 from monster_types.leveling import assign_monster_level
-from monster_elo import calibrate_instance_elo
+from monster_elo import assign_spawn_elo
 from interiors.items_shop import ITEMS_SHOP_ID, stamp_items_shop
 from visibility import GRASS, IMPASSABLE_TERRAIN, MOUNTAIN, OPEN_GROUND, TREE
 
@@ -504,11 +504,13 @@ class MapGenerator:
                     monster = Monster.from_type(
                         type_id, [i, j], monster_id=monster_id, level=level,
                     )
-                    calibrate_instance_elo(monster)
+                    assign_spawn_elo(monster)  # fights run later, off the request path
                     self.monsters[(i, j)] = monster
                     self.game_map[i][j] = '&'
 
     def find_tile(self, game_map, symbol):
+        if hasattr(game_map, 'find'):  # TileGrid
+            return game_map.find(symbol)
         for y, row in enumerate(game_map):
             for x, cell in enumerate(row):
                 if cell == symbol:
@@ -541,11 +543,12 @@ class MapGenerator:
         h, w = len(check_map), len(check_map[0])
         if not (0 <= y < h and 0 <= x < w):
             return False
-        return (
-            check_map[y][x] in OPEN_GROUND
-            and not any(p.pos == [y, x] for p in players.values())
-            and (y, x) not in existing_monsters
-        )
+        if check_map[y][x] not in OPEN_GROUND or (y, x) in existing_monsters:
+            return False
+        at = getattr(players, 'at', None)
+        if at is not None:
+            return at(y, x)[0] is None
+        return not any(p.pos == [y, x] for p in players.values())
 
     def _dims(self, game_map=None):
         m = game_map if game_map is not None else self.game_map
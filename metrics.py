@@ -0,0 +1,249 @@
+"""In-process metrics served as Prometheus text on /metrics.
+
+Histograms are fixed-bucket counters (a bisect and three adds per
+observation), gauges are callbacks read only when /metrics is scraped, so
+collection stays on under load. No prometheus_client dependency.
+
+    from metrics import HANDLER_SECONDS, timed_handler
+
+    @socketio.on('move')
+    @timed_handler('move')
+    def handle_move(direction): ...
+
+    REGISTRY.gauge('dungeon_active_players', 'Connected players.',
+                   lambda: len(game_state.active_players))
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import time
+from bisect import bisect_left
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Seconds: 100 us .. 5 s, enough resolution around the 250 ms move budget.
+TIME_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+GEN_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTE_BUCKETS = (256, 1024, 4096, 8192, 16384, 32768, 65536, 131072, 262144)
+# Serializing a frame just to size it costs about as much as building it:
+# size one frame in this many.
+FRAME_SIZE_SAMPLE_EVERY = 16
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs.extend(f'{n}="{_escape(v)}"' for n, v in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets=TIME_BUCKETS, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self.series = {}  # label values -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value, *labels):
+        row = self.series.get(labels)
+        if row is None:
+            row = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        row[bisect_left(self.buckets, value)] += 1
+        row[-1] += value
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def snapshot(self, *labels):
+        """{'count', 'sum', 'buckets': [(le, cumulative)]} for one series."""
+        row = self.series.get(labels)
+        if row is None:
+            return {'count': 0, 'sum': 0.0, 'buckets': []}
+        cumulative = []
+        running = 0
+        for le, count in zip(self.buckets + (float('inf'),), row[:-1]):
+            running += count
+            cumulative.append((le, running))
+        return {'count': running, 'sum': row[-1], 'buckets': cumulative}
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for labels in sorted(self.series, key=lambda k: tuple(map(str, k))):
+            snap = self.snapshot(*labels)
+            for le, count in snap['buckets']:
+                lines.append(
+                    f'{self.name}_bucket'
+                    f'{_labels(self.labelnames, labels, [("le", _number(float(le)))])} {count}'
+                )
+            tag = _labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{tag} {_number(snap["sum"])}')
+            lines.append(f'{self.name}_count{tag} {snap["count"]}')
+        return lines
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'started')
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+        return False
+
+
+class Gauge:
+    """
+    Value read at scrape time from fn(): a number, or {label value(s): number}
+    when labelnames are given. Errors and None are skipped, not raised.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, fn, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+
+    def render(self):
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} gauge']
+        if not self.labelnames:
+            if value is None:
+                return []
+            lines.append(f'{self.name} {_number(value)}')
+            return lines
+        for key, number in sorted((value or {}).items(), key=lambda kv: str(kv[0])):
+            if number is None:
+                continue
+            key = key if isinstance(key, tuple) else (key,)
+            lines.append(f'{self.name}{_labels(self.labelnames, key)} {_number(number)}')
+        return lines
+
+
+class Registry:
+    """Named metrics rendered together; re-registering a name replaces it."""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def histogram(self, name, help_text, buckets=TIME_BUCKETS, labelnames=()):
+        existing = self.metrics.get(name)
+        if isinstance(existing, Histogram):
+            return existing
+        metric = self.metrics[name] = Histogram(name, help_text, buckets, labelnames)
+        return metric
+
+    def gauge(self, name, help_text, fn, labelnames=()):
+        metric = self.metrics[name] = Gauge(name, help_text, fn, labelnames)
+        return metric
+
+    def stats_gauges(self, prefix, help_text, stats_fn):
+        """
+        One gauge per numeric field of a stats() dict (LevelPipeline,
+        WorldStore...), named prefix_field. Fields are read at scrape time.
+        """
+        def field(key):
+            def read():
+                value = (stats_fn() or {}).get(key)
+                return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+            return read
+
+        try:
+            sample = stats_fn() or {}
+        except Exception:
+            sample = {}
+        for key, value in sample.items():
+            if isinstance(value, (int, float, type(None))) and not isinstance(value, bool):
+                self.gauge(f'{prefix}_{key}', f'{help_text} ({key}).', field(key))
+
+    def render(self):
+        lines = []
+        for name in sorted(self.metrics):
+            lines.extend(self.metrics[name].render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+HANDLER_SECONDS = REGISTRY.histogram(
+    'dungeon_handler_seconds', 'Wall time of Socket.IO handlers.', labelnames=('handler',),
+)
+GAME_STATE_SECONDS = REGISTRY.histogram(
+    'dungeon_get_game_state_seconds', 'Time building one game_state payload.',
+    labelnames=('fog',),
+)
+MONSTER_ROUND_SECONDS = REGISTRY.histogram(
+    'dungeon_monster_round_seconds', 'Time of one monster round.', labelnames=('level',),
+)
+LEVEL_GEN_SECONDS = REGISTRY.histogram(
+    'dungeon_level_generation_seconds', 'Time generating one dungeon level.',
+    buckets=GEN_BUCKETS, labelnames=('where',),
+)
+FRAME_BYTES = REGISTRY.histogram(
+    'dungeon_game_state_bytes',
+    f'Serialized size of sampled frames (1 in {FRAME_SIZE_SAMPLE_EVERY}).',
+    buckets=BYTE_BUCKETS, labelnames=('event',),
+)
+
+_frames_seen = 0
+
+
+def timed_handler(name):
+    """Decorator: observe the handler's wall time in HANDLER_SECONDS."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                HANDLER_SECONDS.observe(time.perf_counter() - started, name)
+        return wrapper
+    return decorate
+
+
+def observe_frame(event, data):
+    """Size every FRAME_SIZE_SAMPLE_EVERY-th frame as Socket.IO would send it."""
+    global _frames_seen
+    _frames_seen += 1
+    if _frames_seen % FRAME_SIZE_SAMPLE_EVERY:
+        return
+    try:
+        size = len(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+    except (TypeError, ValueError):
+        return
+    FRAME_BYTES.observe(size, event)
+
+
+def render_metrics(registry=None):
+    return (registry or REGISTRY).render()
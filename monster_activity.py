@@ -0,0 +1,179 @@
+"""Which monsters on a level need a movement opportunity this round.
+
+A monster with nothing on its mind (no remembered player) and no player
+within its sight range can only wander, and nobody is there to see it. Such
+monsters are kept in a per-level dormant set, filed in square spatial
+buckets, and skipped by monster rounds. At the start of each round, dormant
+monsters near a player on the level are woken; awake monsters that end their
+opportunity idle and alone go back to sleep. A small round-robin budget of
+dormant monsters still gets a turn each round, so levels don't freeze.
+"""
+
+from collections import OrderedDict
+from itertools import islice
+
+# Side of the square buckets dormant monsters are filed under.
+ACTIVITY_BUCKET = 16
+# Dormant monsters given an idle-wander opportunity per round (0 = none).
+IDLE_WANDER_BUDGET = 4
+
+
+def _chebyshev(a, b):
+    return max(abs(a[0] - b[0]), abs(a[1] - b[1]))
+
+
+def _bucket(pos):
+    return (pos[0] // ACTIVITY_BUCKET, pos[1] // ACTIVITY_BUCKET)
+
+
+def _resident(monsters, monster):
+    """True while monster is still on this level at the tile it claims."""
+    return monsters.get((monster.pos[0], monster.pos[1])) is monster
+
+
+class LevelActivity:
+    """Awake and dormant monsters on one dungeon level."""
+
+    __slots__ = ('awake', 'dormant', 'buckets', 'spots', 'max_sight', 'wander', 'roster', 'version')
+
+    def __init__(self):
+        self.awake = {}  # monster id -> Monster
+        self.dormant = {}  # monster id -> Monster
+        self.buckets = {}  # (by, bx) -> set(monster id), dormant only
+        self.spots = {}  # monster id -> bucket it is filed under
+        self.max_sight = 0  # largest sight_range ever filed as dormant
+        self.wander = OrderedDict()  # dormant ids, round-robin order for wander turns
+        self.roster = None  # monsters dict and roster version of the last sync
+        self.version = None
+
+    def sync(self, monsters, version=None):
+        """
+        Track every monster on the level. Departed monsters are dropped and
+        new ones start awake. version is GameState.roster_version(level),
+        bumped whenever a monster leaves the level; with it the scan only runs
+        when that or the level's monsters dict changed. Without it every call
+        rescans.
+        """
+        if version is not None and monsters is self.roster and version == self.version:
+            return
+        for mid, monster in list(self.awake.items()):
+            if not _resident(monsters, monster):
+                del self.awake[mid]
+        for mid, monster in list(self.dormant.items()):
+            if not _resident(monsters, monster):
+                self.forget(mid)
+        for monster in monsters.values():
+            if monster.id not in self.awake and monster.id not in self.dormant:
+                self.awake[monster.id] = monster
+        self.roster = monsters
+        self.version = version
+
+    def sleep(self, monster):
+        self.awake.pop(monster.id, None)
+        self.dormant[monster.id] = monster
+        self._file(monster)
+        self.max_sight = max(self.max_sight, int(monster.sight_range or 0))
+        self.wander[monster.id] = None
+
+    def wake(self, monster):
+        self._unfile(monster.id)
+        self.dormant.pop(monster.id, None)
+        self.wander.pop(monster.id, None)
+        self.awake[monster.id] = monster
+
+    def forget(self, monster_id):
+        self._unfile(monster_id)
+        self.dormant.pop(monster_id, None)
+        self.wander.pop(monster_id, None)
+        self.awake.pop(monster_id, None)
+
+    def _file(self, monster):
+        key = _bucket(monster.pos)
+        old = self.spots.get(monster.id)
+        if old == key:
+            return
+        if old is not None:
+            self._unfile(monster.id)
+        self.spots[monster.id] = key
+        self.buckets.setdefault(key, set()).add(monster.id)
+
+    def _unfile(self, monster_id):
+        key = self.spots.pop(monster_id, None)
+        if key is None:
+            return
+        ids = self.buckets.get(key)
+        if ids is not None:
+            ids.discard(monster_id)
+            if not ids:
+                del self.buckets[key]
+
+    def wake_near(self, players, monsters):
+        """Wake dormant monsters with a player inside their sight range."""
+        reach = self.max_sight
+        b = ACTIVITY_BUCKET
+        woken = []
+        for player in players.values():
+            y, x = player.pos[0], player.pos[1]
+            for by in range((y - reach) // b, (y + reach) // b + 1):
+                for bx in range((x - reach) // b, (x + reach) // b + 1):
+                    for mid in list(self.buckets.get((by, bx), ())):
+                        monster = self.dormant[mid]
+                        if not _resident(monsters, monster):
+                            self.forget(mid)
+                        elif _chebyshev(monster.pos, player.pos) <= monster.sight_range:
+                            self.wake(monster)
+                            woken.append(monster)
+        return woken
+
+    def schedule(self, monsters, budget=IDLE_WANDER_BUDGET):
+        """
+        (awake monsters, dormant wanderers) to give an opportunity this round.
+        Monsters no longer on the level are dropped.
+        """
+        awake = []
+        for mid, monster in list(self.awake.items()):
+            if _resident(monsters, monster):
+                awake.append(monster)
+            else:
+                del self.awake[mid]
+        wanderers = []
+        for mid in list(islice(self.wander, max(0, budget))):
+            monster = self.dormant[mid]
+            if not _resident(monsters, monster):
+                self.forget(mid)
+                continue
+            self.wander.move_to_end(mid)
+            wanderers.append(monster)
+        return awake, wanderers
+
+    def settle(self, monster, players):
+        """After an opportunity: sleep if idle and alone, else stay awake."""
+        if is_idle(monster, players):
+            if monster.id in self.dormant:
+                self._file(monster)  # a wanderer may have changed bucket
+            else:
+                self.sleep(monster)
+        elif monster.id in self.dormant:
+            self.wake(monster)
+
+
+def is_idle(monster, players):
+    """No remembered target, not fighting, and no player within sight range."""
+    if monster.memory_player_id is not None or monster.in_combat:
+        return False
+    sight = int(monster.sight_range or 0)
+    for player in players.values():
+        if _chebyshev(monster.pos, player.pos) <= sight:
+            return False
+    return True
+
+
+def get_level_activity(game_state, level_number):
+    """Lazy-create and return LevelActivity for a dungeon level."""
+    if not hasattr(game_state, 'monster_activity') or game_state.monster_activity is None:
+        game_state.monster_activity = {}
+    activity = game_state.monster_activity.get(level_number)
+    if activity is None:
+        activity = LevelActivity()
+        game_state.monster_activity[level_number] = activity
+    return activity
@@ -11,8 +11,12 @@ import random
 import time
 from enum import Enum
 
+from flow_field import get_flow_fields
+from metrics import MONSTER_ROUND_SECONDS
 from monster import EIGHT_DIRECTIONS
+from monster_activity import IDLE_WANDER_BUDGET, get_level_activity
 from visibility import IMPASSABLE_TERRAIN, compute_fov
+from tile_grid import TileGrid
 
 # --- Config (centralized balancing) -----------------------------------------
 
@@ -96,6 +100,8 @@ def _in_bounds(game_map, y, x):
 
 def is_terrain_passable(game_map, y, x):
     """Walkable terrain (not wall/boulder/desk, in bounds)."""
+    if isinstance(game_map, TileGrid):
+        return game_map.in_bounds(y, x) and game_map.get(y, x) not in IMPASSABLE_TERRAIN
     if not _in_bounds(game_map, y, x):
         return False
     return game_map[y][x] not in IMPASSABLE_TERRAIN
@@ -131,6 +137,9 @@ def can_monster_step(game_map, from_pos, to_pos, monsters, ignore_monster_id=Non
 
 
 def player_at_tile(players_on_level, y, x):
+    at = getattr(players_on_level, 'at', None)
+    if at is not None:  # GameState.players_on_level: indexed by tile
+        return at(y, x)
     for pid, player in players_on_level.items():
         if player.pos[0] == y and player.pos[1] == x:
             return pid, player
@@ -163,12 +172,22 @@ def select_random_direction_tile(game_map, pos, monsters, monster_id, rng=None):
     return None
 
 
-def select_toward_tile(game_map, pos, focus, monsters, monster_id, rng=None):
-    """Pick valid adjacent tile minimizing Chebyshev distance to focus."""
+def select_toward_tile(game_map, pos, focus, monsters, monster_id, rng=None, flow=None):
+    """
+    Pick valid adjacent tile closest to focus.
+
+    With a FlowField toward focus, closest means fewest steps along walkable
+    terrain; otherwise (or when the field doesn't reach here) it is plain
+    Chebyshev distance.
+    """
     rng = rng or random
     tiles = valid_adjacent_tiles(game_map, pos, monsters, monster_id)
     if not tiles:
         return None
+    if flow is not None:
+        best = flow.best_steps(tiles)
+        if best:
+            return rng.choice(best)
     best_d = None
     best = []
     for t in tiles:
@@ -233,6 +252,90 @@ def visible_players(game_map, monster, players_on_level):
     return seen
 
 
+# Side of the square buckets players are filed under for range queries.
+PERCEPTION_BUCKET = 16
+
+
+class PerceptionSnapshot:
+    """
+    Player positions and sight for one monster round on one level.
+
+    Built once per round instead of once per monster. "Can monster M see
+    player P" is answered from P's current FOV when it covers M (sight lines
+    are treated as symmetric), so one player FOV serves every monster near
+    them; a monster only casts its own FOV when some candidate is outside
+    the range of that player's FOV or their FOV is stale.
+    """
+
+    def __init__(self, game_map, players_on_level):
+        self.game_map = game_map
+        self.players = players_on_level
+        # (y, x) target -> FlowField used by monsters chasing it this round
+        self.flows = {}
+        terrain_token = getattr(game_map, 'terrain_token', None)
+        self.token = terrain_token() if terrain_token is not None else None
+        self.buckets = {}  # (by, bx) -> [(order, pid, player)]
+        for order, (pid, player) in enumerate(players_on_level.items()):
+            key = (player.pos[0] // PERCEPTION_BUCKET, player.pos[1] // PERCEPTION_BUCKET)
+            self.buckets.setdefault(key, []).append((order, pid, player))
+        self.monster_fovs = 0  # shadowcasts that could not be shared
+
+    def players_near(self, pos, radius):
+        """(order, pid, player) within Chebyshev radius of pos, in players order."""
+        y, x = pos[0], pos[1]
+        b = PERCEPTION_BUCKET
+        found = []
+        for by in range((y - radius) // b, (y + radius) // b + 1):
+            for bx in range((x - radius) // b, (x + radius) // b + 1):
+                for entry in self.buckets.get((by, bx), ()):
+                    if chebyshev(pos, entry[2].pos) <= radius:
+                        found.append(entry)
+        found.sort(key=lambda entry: entry[0])
+        return found
+
+    def _player_fov(self, player):
+        """The player's FOV if it was cast from where they stand on this terrain."""
+        fov = getattr(player, 'visible', None)
+        if self.token is None or getattr(fov, 'token', None) != self.token:
+            return None
+        if fov.origin != (player.pos[0], player.pos[1]):
+            return None
+        return fov
+
+    def visible_players(self, monster):
+        """Same answer shape as visible_players(), sharing player FOVs."""
+        sight = max(0, int(getattr(monster, 'sight_range', 0) or 0))
+        candidates = self.players_near(monster.pos, sight)
+        if not candidates:
+            return []
+        my, mx = monster.pos[0], monster.pos[1]
+        sight2 = sight * sight
+        seen = []
+        unresolved = []
+        for _order, pid, player in candidates:
+            dy = player.pos[0] - my
+            dx = player.pos[1] - mx
+            d2 = dy * dy + dx * dx
+            if d2 > sight2:
+                continue  # outside the monster's circular radius
+            fov = self._player_fov(player)
+            if fov is not None and d2 <= fov.radius * fov.radius:
+                if (my, mx) in fov:
+                    seen.append((pid, player))
+                continue
+            unresolved.append((pid, player))
+        if unresolved:
+            self.monster_fovs += 1
+            fov = compute_fov(self.game_map, monster.pos, sight)
+            seen.extend(
+                (pid, player) for pid, player in unresolved
+                if (player.pos[0], player.pos[1]) in fov
+            )
+            order = {pid: i for i, pid in enumerate(self.players)}
+            seen.sort(key=lambda item: order[item[0]])
+        return seen
+
+
 def choose_closest_player(monster, visible, rng=None):
     rng = rng or random
     if not visible:
@@ -275,12 +378,29 @@ def update_memory(monster, visible_pid, visible_player, players_on_level=None):
     return None, False
 
 
+def pursuit_field(game_state, level_number, game_map, focus, perception=None):
+    """FlowField toward focus, shared by everyone chasing it this round."""
+    target = (focus[0], focus[1])
+    if perception is not None:
+        field = perception.flows.get(target)
+        if field is not None:
+            return field
+    field = get_flow_fields(game_state).field_for(level_number, game_map, target)
+    if perception is not None:
+        perception.flows[target] = field
+    return field
+
+
 # --- One movement opportunity -----------------------------------------------
 
-def process_monster_opportunity(game_state, level_number, monster, combat_system, now=None, rng=None):
+def process_monster_opportunity(
+    game_state, level_number, monster, combat_system, now=None, rng=None, perception=None
+):
     """
     Run one AI movement opportunity for monster.
     Returns True if map/combat state changed (caller should broadcast).
+
+    perception: optional PerceptionSnapshot shared across a round.
     """
     rng = rng or random
     now = now if now is not None else time.monotonic()
@@ -299,10 +419,14 @@ def process_monster_opportunity(game_state, level_number, monster, combat_system
         return False
 
     game_map, monsters = game_state.ensure_level(level_number)
-    players = game_state.players_on_level(level_number)
 
     # Detect
-    visible = visible_players(game_map, monster, players)
+    if perception is not None:
+        players = perception.players
+        visible = perception.visible_players(monster)
+    else:
+        players = game_state.players_on_level(level_number)
+        visible = visible_players(game_map, monster, players)
     pid, player = choose_closest_player(monster, visible, rng)
     focus, currently_visible = update_memory(monster, pid, player, players)
 
@@ -327,8 +451,9 @@ def process_monster_opportunity(game_state, level_number, monster, combat_system
             _debug_log(monster, focus, currently_visible, now)
             return False
     elif intention == Intention.TOWARD_TARGET:
+        flow = pursuit_field(game_state, level_number, game_map, focus, perception)
         dest = select_toward_tile(
-            game_map, monster.pos, focus, monsters, monster.id, rng
+            game_map, monster.pos, focus, monsters, monster.id, rng, flow
         )
         if dest is None:
             monster.last_fail_reason = 'no_toward_tile'
@@ -381,26 +506,47 @@ def _debug_log(monster, focus, currently_visible, now):
 
 
 def run_monster_round_for_level(
-    game_state, level_number, combat_system, socketio, now=None, broadcast=True
+    game_state, level_number, combat_system, socketio, now=None, broadcast=True,
+    wander_budget=IDLE_WANDER_BUDGET,
 ):
     """
     One discrete monster/world round on a single dungeon level.
 
-    Every non-combat monster gets one process_monster_opportunity.
+    Every awake non-combat monster gets one process_monster_opportunity;
+    dormant ones (idle, no player in sight range) only get a turn from the
+    wander_budget round-robin. See monster_activity.
     Set broadcast=False when the caller will emit game_state once afterward.
     """
+    started = time.perf_counter()
     now = now if now is not None else time.monotonic()
     game_map, monsters = game_state.ensure_level(level_number)
+    players = game_state.players_on_level(level_number)
+    activity = get_level_activity(game_state, level_number)
+    roster_version = getattr(game_state, 'roster_version', None)
+    activity.sync(monsters, roster_version(level_number) if roster_version else None)
+    activity.wake_near(players, monsters)
+    awake, wanderers = activity.schedule(monsters, wander_budget)
     changed = False
-    for monster in list(monsters.values()):
+    perception = None
+    for monster in awake + wanderers:
         if monster.in_combat:
             continue
         if monster.speed <= 0:
             continue
+        if perception is None:
+            # Players don't move during a round: snapshot them once.
+            perception = PerceptionSnapshot(game_map, players)
         if process_monster_opportunity(
-            game_state, level_number, monster, combat_system, now=now
+            game_state, level_number, monster, combat_system, now=now,
+            perception=perception,
         ):
             changed = True
+        activity.settle(monster, players)
+    MONSTER_ROUND_SECONDS.observe(time.perf_counter() - started, str(level_number))
     if broadcast and socketio is not None:
-        game_state.broadcast_active_players(socketio)
+        broadcast_level = getattr(game_state, 'broadcast_level', None)
+        if broadcast_level is not None:
+            broadcast_level(socketio, level_number)
+        else:
+            game_state.broadcast_active_players(socketio)
     return changed
@@ -6,6 +6,8 @@ Run from the project root:
     py monster_elo.py
     py monster_elo.py --seed 12345
     py monster_elo.py --seed 1 --fights 4 --passes 1
+    py monster_elo.py --seed 1 --workers 32
+    py monster_elo.py --resume          # after a crash or Ctrl-C
 
 Uses real Monster leveling and combat_damage.damage_between.
 Does not touch the map, UI, XP, loot, or game sessions.
@@ -14,14 +16,29 @@ Does not touch the map, UI, XP, loot, or game sessions.
 from __future__ import annotations
 
 import argparse
+import copy
 import json
+import multiprocessing
+import os
 import random
+import weakref
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 
 from character_stats import ATTRIBUTE_KEYS
 from combat_damage import resolve_attack
+from duel_table import duel_stats, load_duel_table
+from elo_checkpoint import (
+    ProgressMeter,
+    default_log_path,
+    TournamentLog,
+    read_tournament_log,
+    restore_snapshot,
+)
 from monster import Monster
 from monster_types.registry import MONSTER_TYPES
 
@@ -33,15 +50,33 @@ K_FACTOR = 32
 FIGHTS_PER_PAIRING = 20
 TOURNAMENT_PASSES = 3
 MAX_COMBAT_ROUNDS = 1000
+# 'python' (scalar, no extra deps) or 'numpy' (monster_elo_numpy batch engine).
+ENGINES = ('python', 'numpy')
+# Pairings per worker job with --workers. Fixed (not derived from the worker
+# count) so a seed gives the same ratings however many processes run it.
+PARALLEL_CHUNK_PAIRINGS = 64
 
 # Spawn-time instance rating (read-only ladder from JSON).
 SPAWN_ELO_FIGHTS = 100
 SPAWN_ELO_RANK_WINDOW = 5
+# Calibrated ratings remembered per (type, level, stat roll) for the loaded ladder.
+CALIBRATION_MEMO_SIZE = 4096
+# Monsters waiting for calibration; past this the oldest keep their provisional Elo.
+CALIBRATION_QUEUE_SIZE = 4096
+# Idle poll of the spawn Elo refinement loop (provisional ratings queue).
+CALIBRATION_IDLE_SECONDS = 1.0
 
 _ladder_cache = None
 _ladder_cache_path = None
 _ladder_load_warned = False
 
+# calibration_key -> calibrated Elo, valid for _calibration_memo_ladder only.
+_calibration_memo = OrderedDict()
+_calibration_memo_ladder = None
+# (weakref to monster, provisional elo) spawned without fights, refined by
+# drain_calibration_queue. Weak so killed or unloaded monsters are not kept alive.
+_calibration_queue = deque(maxlen=CALIBRATION_QUEUE_SIZE)
+
 
 @dataclass
 class LadderFighter:
@@ -67,6 +102,23 @@ class LadderFighter:
         return self.hp <= 0
 
 
+class EloLadder(list):
+    """
+    Frozen ascending-Elo list of LadderFighter with lookup indexes built once:
+    elos (parallel floats, for bisect), stats (parallel duel_stats tuples)
+    and by_type ((type_id, level) -> fighter). Plain lists still work
+    everywhere a ladder is accepted, through slower linear scans.
+    """
+
+    def __init__(self, fighters=()):
+        super().__init__(fighters)
+        self.elos = [float(f.elo) for f in self]
+        self.stats = [duel_stats(f) for f in self]
+        self.by_type = {}
+        for fighter in self:
+            self.by_type.setdefault((fighter.type_id, fighter.level), fighter)
+
+
 def _parse_ladder_from_payload(payload):
     """Build ascending-Elo list of LadderFighter from saved ratings JSON."""
     ratings = (payload or {}).get('ratings') or {}
@@ -118,7 +170,7 @@ def _parse_ladder_from_payload(payload):
                 mhp=mhp,
             ))
     fighters.sort(key=lambda f: (f.elo, f.type_id, f.level))
-    return fighters
+    return EloLadder(fighters)
 
 
 def load_elo_ladder(path=None, force=False):
@@ -140,7 +192,7 @@ def load_elo_ladder(path=None, force=False):
         if not _ladder_load_warned:
             print(f'[monster_elo] ratings file missing: {path}; spawn Elo stays at {INITIAL_ELO}')
             _ladder_load_warned = True
-        _ladder_cache = []
+        _ladder_cache = EloLadder()
         _ladder_cache_path = path
         return _ladder_cache
 
@@ -151,7 +203,7 @@ def load_elo_ladder(path=None, force=False):
         if not _ladder_load_warned:
             print(f'[monster_elo] failed to load {path}: {exc}; spawn Elo stays at {INITIAL_ELO}')
             _ladder_load_warned = True
-        ladder = []
+        ladder = EloLadder()
 
     _ladder_cache = ladder
     _ladder_cache_path = path
@@ -168,9 +220,18 @@ def reload_elo_ladder(path=None):
 
 
 def closest_ladder_index(ladder, rating):
-    """Index of the ladder entry whose Elo is closest to rating."""
+    """Index of the ladder entry whose Elo is closest to rating (lowest on ties)."""
     if not ladder:
         return None
+    elos = getattr(ladder, 'elos', None)
+    if elos is not None:
+        pos = bisect_left(elos, rating)
+        if pos == 0:
+            return 0
+        if pos < len(elos) and elos[pos] - rating < rating - elos[pos - 1]:
+            return pos
+        # Entry below wins (ties too); report its first occurrence.
+        return bisect_left(elos, elos[pos - 1])
     best_i = 0
     best_dist = abs(ladder[0].elo - rating)
     for i in range(1, len(ladder)):
@@ -190,13 +251,19 @@ def pick_ladder_opponent(
     """
     Find closest Elo on the ladder, then pick uniformly in ±window ranks.
     """
+    index = pick_ladder_index(ladder, rating, rng=rng, window=window)
+    return None if index is None else ladder[index]
+
+
+def pick_ladder_index(ladder, rating, rng=None, window=SPAWN_ELO_RANK_WINDOW):
+    """pick_ladder_opponent, returning the ladder index (None if empty)."""
     rng = rng or random
     if not ladder:
         return None
     center = closest_ladder_index(ladder, rating)
     lo = max(0, center - window)
     hi = min(len(ladder) - 1, center + window)
-    return ladder[rng.randint(lo, hi)]
+    return rng.randint(lo, hi)
 
 
 def ladder_midpoint_elo(ladder, fallback=INITIAL_ELO):
@@ -225,7 +292,11 @@ def elo_percentile(rating, ladder=None, path=None):
         value = float(rating)
     except (TypeError, ValueError):
         return None
-    below = sum(1 for fighter in ladder if float(fighter.elo) < value)
+    elos = getattr(ladder, 'elos', None)
+    if elos is not None:
+        below = bisect_left(elos, value)
+    else:
+        below = sum(1 for fighter in ladder if float(fighter.elo) < value)
     return round(100.0 * below / len(ladder), 1)
 
 
@@ -254,6 +325,7 @@ def calibrate_instance_elo(
     path=None,
     ladder=None,
     window=SPAWN_ELO_RANK_WINDOW,
+    table=None,
 ):
     """
     Rate a spawned monster with N headless fights against the frozen ladder.
@@ -261,10 +333,15 @@ def calibrate_instance_elo(
     Starts at the ladder midpoint Elo (middle rank), then updates with
     standard Elo math. Does not mutate the JSON or ladder entries' Elo.
     Restores monster HP afterward. Returns the final elo.
+
+    Matchups found in the duel table (default: monster_duel_table.json if
+    built) use its exact expected score instead of a simulated fight.
     """
     rng = rng or random
     if ladder is None:
         ladder = load_elo_ladder(path=path)
+    if table is None:
+        table = load_duel_table()
 
     if not ladder or fights <= 0:
         rating = ladder_midpoint_elo(ladder, fallback=INITIAL_ELO)
@@ -273,15 +350,26 @@ def calibrate_instance_elo(
         return monster.elo
 
     rating = ladder_midpoint_elo(ladder, fallback=INITIAL_ELO)
+    stats = duel_stats(monster) if len(table) else None
+    ladder_stats = getattr(ladder, 'stats', None)
 
     for fight_idx in range(int(fights)):
-        opponent = pick_ladder_opponent(ladder, rating, rng=rng, window=window)
-        if opponent is None:
+        index = pick_ladder_index(ladder, rating, rng=rng, window=window)
+        if index is None:
             break
-        # Fresh HP for ladder fighter each bout (shared cache instances).
-        opponent.hp = opponent.mhp
-        opponent.in_combat = False
+        opponent = ladder[index]
         first_is_a = (fight_idx % 2 == 0)
+        if stats is not None:
+            score_a = table.expected_score(
+                stats,
+                ladder_stats[index] if ladder_stats is not None else duel_stats(opponent),
+                first_is_a,
+                MAX_COMBAT_ROUNDS,
+            )
+            if score_a is not None:
+                rating, _ignored = update_elo(rating, opponent.elo, score_a, k=k_factor)
+                continue
+        # simulate_monster_fight restores both sides' HP (shared ladder fighters).
         score_a, _rounds = simulate_monster_fight(
             monster,
             opponent,
@@ -295,6 +383,128 @@ def calibrate_instance_elo(
     return monster.elo
 
 
+def calibration_key(monster):
+    """Everything a headless duel depends on: species, level and stat roll."""
+    return (
+        getattr(monster, 'type_id', None),
+        int(getattr(monster, 'level', 1)),
+        tuple(int(getattr(monster, key, 1)) for key in ATTRIBUTE_KEYS),
+        int(getattr(monster, 'mhp', 1)),
+        int(getattr(monster, 'armour', 1)),
+    )
+
+
+def _memo_for(ladder):
+    """The calibration memo, emptied when the ladder it was built on changes."""
+    global _calibration_memo_ladder
+    if ladder is not _calibration_memo_ladder:
+        _calibration_memo.clear()
+        _calibration_memo_ladder = ladder
+    return _calibration_memo
+
+
+def _remember(ladder, key, rating):
+    memo = _memo_for(ladder)
+    memo[key] = float(rating)
+    memo.move_to_end(key)
+    if len(memo) > CALIBRATION_MEMO_SIZE:
+        memo.popitem(last=False)
+
+
+def provisional_elo(monster, ladder):
+    """Best rating without fights: the ladder's own entry for this type+level, else midpoint."""
+    type_id = getattr(monster, 'type_id', None)
+    level = int(getattr(monster, 'level', 1))
+    by_type = getattr(ladder, 'by_type', None)
+    if by_type is not None:
+        fighter = by_type.get((type_id, level))
+        if fighter is not None:
+            return float(fighter.elo)
+        return ladder_midpoint_elo(ladder, fallback=INITIAL_ELO)
+    for fighter in ladder or ():
+        if fighter.type_id == type_id and fighter.level == level:
+            return float(fighter.elo)
+    return ladder_midpoint_elo(ladder, fallback=INITIAL_ELO)
+
+
+def assign_spawn_elo(monster, path=None, ladder=None, queue=True):
+    """
+    Rate a freshly spawned monster without simulating fights now.
+
+    A stat roll already calibrated against this ladder reuses that rating.
+    Otherwise the monster gets provisional_elo() and (if queue) waits for
+    drain_calibration_queue to refine it. Returns True if the rating is final.
+    """
+    if ladder is None:
+        ladder = load_elo_ladder(path=path)
+    rating = _memo_for(ladder).get(calibration_key(monster))
+    if rating is not None:
+        monster.elo = rating
+        return True
+    monster.elo = provisional_elo(monster, ladder)
+    if queue and ladder:
+        _calibration_queue.append((weakref.ref(monster), monster.elo))
+    return not ladder
+
+
+def pending_calibrations():
+    """Queued provisional ratings (some may belong to monsters gone since)."""
+    return len(_calibration_queue)
+
+
+def drain_calibration_queue(
+    max_items=None,
+    fights=SPAWN_ELO_FIGHTS,
+    rng=None,
+    path=None,
+    ladder=None,
+    is_resident=None,
+):
+    """
+    Replace queued provisional ratings with calibrated ones.
+
+    Fights run on a copy, so monsters already in play keep their HP. Elo
+    they gained or lost in live combat since spawning is kept on top of the
+    refined rating. Monsters that died, were collected, or fail
+    is_resident(monster) are dropped without fighting. Returns how many
+    monsters were refined.
+    """
+    if ladder is None:
+        ladder = load_elo_ladder(path=path)
+    done = 0
+    while _calibration_queue and (max_items is None or done < max_items):
+        ref, provisional = _calibration_queue.popleft()
+        monster = ref()
+        if monster is None or getattr(monster, 'hp', 1) <= 0:
+            continue
+        if is_resident is not None and not is_resident(monster):
+            continue
+        key = calibration_key(monster)
+        rating = _memo_for(ladder).get(key)
+        if rating is None:
+            rating = calibrate_instance_elo(
+                copy.copy(monster), fights=fights, rng=rng, ladder=ladder
+            )
+            _remember(ladder, key, rating)
+        monster.elo = float(rating) + (float(monster.elo) - float(provisional))
+        done += 1
+    return done
+
+
+def refine_spawn_ratings(sleep, is_resident=None):
+    """
+    Background loop: replace provisional spawn Elo ratings one monster at a
+    time, yielding to the hub (sleep) between monsters.
+    """
+    while True:
+        try:
+            refined = drain_calibration_queue(max_items=1, is_resident=is_resident)
+        except Exception as exc:
+            print(f"[monster_elo] calibration failed: {exc!r}")
+            refined = 0
+        sleep(0 if refined else CALIBRATION_IDLE_SECONDS)
+
+
 @dataclass
 class CombatantRecord:
     """One frozen type+level combatant and its tournament stats."""
@@ -453,30 +663,51 @@ def run_pairing(
     rng=None,
     k_factor: float = K_FACTOR,
     max_rounds: int = MAX_COMBAT_ROUNDS,
+    table=None,
 ):
-    """Run fights between two records; update Elo after each fight."""
+    """
+    Run fights between two records; update Elo after each fight.
+
+    With a DuelTable, fights whose matchup it holds are drawn from the
+    tabulated odds instead of simulated. Returns [[score_a, rounds], ...].
+    """
     rng = rng or random
+    if table is not None:
+        stats_a, stats_b = duel_stats(rec_a.monster), duel_stats(rec_b.monster)
+    results = []
     for fight_idx in range(fights):
         first_is_a = (fight_idx % 2 == 0)
-        score_a, rounds = simulate_monster_fight(
-            rec_a.monster,
-            rec_b.monster,
-            first_is_a=first_is_a,
-            rng=rng,
-            max_rounds=max_rounds,
-        )
-        rec_a.elo, rec_b.elo = update_elo(rec_a.elo, rec_b.elo, score_a, k=k_factor)
-        rec_a.total_rounds += rounds
-        rec_b.total_rounds += rounds
-        if score_a >= 1.0:
-            rec_a.wins += 1
-            rec_b.losses += 1
-        elif score_a <= 0.0:
-            rec_a.losses += 1
-            rec_b.wins += 1
-        else:
-            rec_a.draws += 1
-            rec_b.draws += 1
+        result = None
+        if table is not None:
+            result = table.sample_fight(stats_a, stats_b, first_is_a, rng, max_rounds)
+        if result is None:
+            result = simulate_monster_fight(
+                rec_a.monster,
+                rec_b.monster,
+                first_is_a=first_is_a,
+                rng=rng,
+                max_rounds=max_rounds,
+            )
+        score_a, rounds = result
+        record_fight(rec_a, rec_b, score_a, rounds, k_factor=k_factor)
+        results.append([score_a, rounds])
+    return results
+
+
+def record_fight(rec_a, rec_b, score_a, rounds, k_factor: float = K_FACTOR):
+    """Apply one fight result: Elo update plus W/L/D and round counters."""
+    rec_a.elo, rec_b.elo = update_elo(rec_a.elo, rec_b.elo, score_a, k=k_factor)
+    rec_a.total_rounds += rounds
+    rec_b.total_rounds += rounds
+    if score_a >= 1.0:
+        rec_a.wins += 1
+        rec_b.losses += 1
+    elif score_a <= 0.0:
+        rec_a.losses += 1
+        rec_b.wins += 1
+    else:
+        rec_a.draws += 1
+        rec_b.draws += 1
 
 
 def print_elo_rankings(records, file=None):
@@ -546,6 +777,118 @@ def save_elo_results(
     return path
 
 
+# Worker-process copy of the tournament pool (set by _init_fight_worker).
+_worker_monsters = None
+
+
+def _init_fight_worker(monsters):
+    global _worker_monsters
+    _worker_monsters = monsters
+
+
+def simulate_pairing_chunk(chunk, fights, seed, max_rounds, engine='python', monsters=None):
+    """
+    Worker side of --workers: (score_a, rounds) for every fight of every
+    (i, j) pairing in chunk, in run_pairing order, from an RNG seeded by seed.
+    monsters defaults to the worker's pool copy.
+    """
+    if monsters is None:
+        monsters = _worker_monsters
+    if engine == 'numpy':
+        import numpy as np
+        from monster_elo_numpy import duel_results
+
+        score, rounds = duel_results(
+            monsters, chunk, fights, np.random.default_rng(seed), max_rounds,
+        )
+        return list(zip(score.tolist(), rounds.tolist()))
+    rng = random.Random(seed)
+    results = []
+    for i, j in chunk:
+        for fight_idx in range(fights):
+            results.append(simulate_monster_fight(
+                monsters[i],
+                monsters[j],
+                first_is_a=(fight_idx % 2 == 0),
+                rng=rng,
+                max_rounds=max_rounds,
+            ))
+    return results
+
+
+def _hub_patched():
+    """True once eventlet.monkey_patch() has run in this process (e.g. inside the server)."""
+    try:
+        from eventlet import patcher
+    except ImportError:
+        return False
+    return patcher.is_monkey_patched('thread')
+
+
+def start_fight_pool(records, workers):
+    """
+    Process pool whose workers each hold a copy of the pool's monsters, or
+    None when this process is eventlet-patched: the executor's management
+    thread and queues would run on green threads and results never arrive.
+    run_pass_parallel then runs the same seeded chunks inline.
+    """
+    if _hub_patched():
+        return None
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_fight_worker,
+        initargs=([rec.monster for rec in records],),
+    )
+
+
+def run_pass_parallel(
+    records,
+    pairings,
+    executor,
+    fights: int = FIGHTS_PER_PAIRING,
+    rng=None,
+    k_factor: float = K_FACTOR,
+    max_rounds: int = MAX_COMBAT_ROUNDS,
+    engine: str = 'python',
+    progress=None,
+):
+    """
+    One pass with fights simulated in worker processes. Chunk seeds are
+    drawn from rng up front; results are merged and Elo applied in pairing
+    order, exactly as a serial pass would. progress(done) after each chunk.
+    executor=None simulates the chunks in this process (same results).
+    """
+    rng = rng or random
+    chunks = [
+        pairings[start:start + PARALLEL_CHUNK_PAIRINGS]
+        for start in range(0, len(pairings), PARALLEL_CHUNK_PAIRINGS)
+    ]
+    seeds = [rng.getrandbits(64) for _ in chunks]
+    if executor is None:
+        monsters = [rec.monster for rec in records]
+        outcomes = (
+            simulate_pairing_chunk(chunk, fights, chunk_seed, max_rounds, engine, monsters)
+            for chunk, chunk_seed in zip(chunks, seeds)
+        )
+    else:
+        futures = [
+            executor.submit(simulate_pairing_chunk, chunk, fights, chunk_seed, max_rounds, engine)
+            for chunk, chunk_seed in zip(chunks, seeds)
+        ]
+        outcomes = (future.result() for future in futures)
+    done = 0
+    for chunk, chunk_results in zip(chunks, outcomes):
+        results = iter(chunk_results)
+        for i, j in chunk:
+            for _ in range(fights):
+                score_a, rounds = next(results)
+                record_fight(records[i], records[j], score_a, rounds, k_factor=k_factor)
+        done += len(chunk)
+        if progress is not None:
+            progress(done)
+
+
 def run_elo_tournament(
     seed=None,
     initial_elo: float = INITIAL_ELO,
@@ -556,15 +899,41 @@ def run_elo_tournament(
     output_path=None,
     include_type_ids=None,
     spawn_weight_only: bool = True,
-    progress_every: int = 100,
     quiet: bool = False,
+    engine: str = 'python',
+    workers: int = 1,
+    duel_table=None,
+    checkpoint_path=None,
+    resume: bool = False,
 ):
     """
     Build the pool, run multi-pass round-robin, print rankings, save JSON.
 
     Same seed reproduces pool generation, pairing order, and fight rolls
-    as closely as the current random architecture allows.
+    as closely as the current random architecture allows. engine='numpy'
+    simulates each pass's fights in one batch (statistically equivalent,
+    different rolls; needs numpy). workers > 1 spreads each pass over that
+    many processes in fixed, separately seeded chunks, so any count >= 2
+    gives the same ratings for a seed. workers=1 is the plain serial loop,
+    which draws its rolls differently and so gives different ratings.
+    duel_table (a DuelTable; serial python engine only) replaces simulation
+    for the matchups it holds.
+
+    checkpoint_path: append progress to this JSONL log (elo_checkpoint).
+    resume=True continues the run recorded there; the settings must match
+    the ones it was started with (see tournament_settings_from_log).
     """
+    if engine not in ENGINES:
+        raise ValueError(f'Unknown engine {engine!r}; choose from {ENGINES}')
+    if duel_table is not None and (engine != 'python' or workers > 1):
+        raise ValueError('duel_table works with the serial python engine only')
+    if resume and checkpoint_path is None:
+        raise ValueError('resume needs the checkpoint_path to resume from')
+    if engine == 'numpy':
+        import monster_elo_numpy
+        monster_elo_numpy.require_numpy()
+    if seed is None and checkpoint_path is not None:
+        seed = random.randrange(2 ** 63)  # a resumable run must be replayable
     rng = random.Random(seed) if seed is not None else random.Random()
     records = build_test_monster_pool(
         rng=rng,
@@ -578,6 +947,46 @@ def run_elo_tournament(
 
     pairings = list(iter_unique_pairings(n))
     pairing_count = len(pairings)
+    parallel = workers > 1
+
+    log = None
+    start_pass, start_done = 1, 0
+    if checkpoint_path is not None:
+        settings = {
+            'seed': seed,
+            'initial_elo': initial_elo,
+            'k_factor': k_factor,
+            'fights_per_pairing': fights_per_pairing,
+            'tournament_passes': tournament_passes,
+            'max_combat_rounds': max_combat_rounds,
+            'include_type_ids': sorted(include_type_ids) if include_type_ids else None,
+            'spawn_weight_only': spawn_weight_only,
+            'engine': engine,
+            'parallel': parallel,
+            'duel_table': duel_table is not None,
+        }
+        pool_ids = [[rec.type_id, rec.level] for rec in records]
+        if resume:
+            state = read_tournament_log(checkpoint_path)
+            if state['config'] != json.loads(json.dumps(settings)):
+                raise ValueError(
+                    f'{checkpoint_path} was started with different settings: {state["config"]}'
+                )
+            if state['pool'] != pool_ids:
+                raise ValueError(f'{checkpoint_path} does not match the combatant pool')
+            snapshot = state['snapshot']
+            if snapshot is not None:
+                restore_snapshot(snapshot, records, rng)
+                if snapshot['done'] >= pairing_count:
+                    start_pass = snapshot['pass'] + 1
+                else:
+                    start_pass, start_done = snapshot['pass'], snapshot['done']
+                    pairings = list(state['orders'][start_pass])
+            log = TournamentLog(checkpoint_path, resume=True)
+            log.resumed(start_pass, start_done)
+        else:
+            log = TournamentLog(checkpoint_path)
+            log.start(settings, records)
 
     if not quiet:
         print('Elo Tournament')
@@ -585,25 +994,87 @@ def run_elo_tournament(
         print(f'Pairings: {pairing_count:,}')
         print(f'Fights per pairing: {fights_per_pairing}')
         print(f'Tournament passes: {tournament_passes}')
+        if workers > 1:
+            print(f'Workers: {workers}')
+        if log is not None:
+            print(f'Checkpoint log: {checkpoint_path}')
+        if resume:
+            print(f'Resuming at pass {start_pass}, pairing {start_done:,}')
         print()
 
-    for pass_num in range(1, tournament_passes + 1):
-        rng.shuffle(pairings)
-        if not quiet:
-            print(f'Pass {pass_num}/{tournament_passes}')
-        for idx, (i, j) in enumerate(pairings, 1):
-            run_pairing(
-                records[i],
-                records[j],
-                fights=fights_per_pairing,
-                rng=rng,
-                k_factor=k_factor,
-                max_rounds=max_combat_rounds,
-            )
-            if not quiet and (idx % progress_every == 0 or idx == pairing_count):
-                print(f'Progress: {idx:,} / {pairing_count:,} pairings')
-        if not quiet:
-            print()
+    meter = None
+    if not quiet:
+        meter = ProgressMeter(pairing_count * tournament_passes)
+        meter.skip((start_pass - 1) * pairing_count + start_done)
+
+    pool = start_fight_pool(records, workers) if parallel else None
+    if parallel and pool is None and not quiet:
+        print('eventlet is monkey-patched here; running worker chunks inline.')
+    try:
+        for pass_num in range(start_pass, tournament_passes + 1):
+            first = start_done if pass_num == start_pass else 0
+            if first == 0:
+                rng.shuffle(pairings)
+                if log is not None:
+                    log.begin_pass(pass_num, pairings)
+            if meter is not None:
+                meter.start_pass(pass_num, first)
+
+            def report(done, pass_num=pass_num):
+                if meter is not None:
+                    meter.update(pass_num, done, pairing_count)
+
+            if parallel:
+                run_pass_parallel(
+                    records,
+                    pairings,
+                    pool,
+                    fights=fights_per_pairing,
+                    rng=rng,
+                    k_factor=k_factor,
+                    max_rounds=max_combat_rounds,
+                    engine=engine,
+                    progress=report,
+                )
+            elif engine == 'numpy':
+                monster_elo_numpy.run_pass(
+                    records,
+                    pairings,
+                    fights=fights_per_pairing,
+                    rng=rng,
+                    k_factor=k_factor,
+                    max_rounds=max_combat_rounds,
+                    record_fight=record_fight,
+                )
+                report(pairing_count)
+            else:
+                for idx in range(first, pairing_count):
+                    i, j = pairings[idx]
+                    results = run_pairing(
+                        records[i],
+                        records[j],
+                        fights=fights_per_pairing,
+                        rng=rng,
+                        k_factor=k_factor,
+                        max_rounds=max_combat_rounds,
+                        table=duel_table,
+                    )
+                    if log is not None:
+                        log.pairing(pass_num, idx + 1, i, j, results)
+                        if idx + 1 < pairing_count and log.snapshot_due():
+                            log.snapshot(pass_num, idx + 1, records, rng)
+                    report(idx + 1)
+            if log is not None:
+                log.snapshot(pass_num, pairing_count, records, rng)
+            if not quiet:
+                print()
+        if log is not None:
+            log.finish()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if log is not None:
+            log.close()
 
     elo_shift = shift_ratings_floor_to_zero(records)
     if not quiet and elo_shift:
@@ -632,6 +1103,23 @@ def run_elo_tournament(
     return records, ranked, out
 
 
+def tournament_settings_from_log(path):
+    """run_elo_tournament keyword arguments a checkpoint log was started with."""
+    config = read_tournament_log(path)['config']
+    include = config.get('include_type_ids')
+    return {
+        'seed': config['seed'],
+        'initial_elo': config['initial_elo'],
+        'k_factor': config['k_factor'],
+        'fights_per_pairing': config['fights_per_pairing'],
+        'tournament_passes': config['tournament_passes'],
+        'max_combat_rounds': config['max_combat_rounds'],
+        'include_type_ids': set(include) if include else None,
+        'spawn_weight_only': config['spawn_weight_only'],
+        'engine': config['engine'],
+    }
+
+
 def main(argv=None):
     parser = argparse.ArgumentParser(
         description='Run a headless monster Elo tournament (balancing tool).',
@@ -658,16 +1146,68 @@ def main(argv=None):
         '--include-non-spawn', action='store_true',
         help='Also include types with spawn_weight == 0 (e.g. shopkeeper)',
     )
+    parser.add_argument(
+        '--engine', choices=ENGINES, default='python',
+        help='Fight simulator: python (default) or numpy (batch, needs numpy)',
+    )
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help='Worker processes per pass (default 1; 0 = one per CPU). '
+             'Any count >= 2 gives the same ratings for a seed',
+    )
+    parser.add_argument(
+        '--duel-table', type=str, default=None,
+        help='Draw fights from this duel_table.py JSON where it has the matchup',
+    )
+    parser.add_argument(
+        '--checkpoint', type=str, default=None,
+        help='Progress log (JSONL); default: next to --output as *.log.jsonl',
+    )
+    parser.add_argument(
+        '--no-checkpoint', action='store_true',
+        help='Do not write a progress log',
+    )
+    parser.add_argument(
+        '--resume', action='store_true',
+        help='Continue the run recorded in the progress log (its settings win)',
+    )
     args = parser.parse_args(argv)
-
-    run_elo_tournament(
+    if args.resume and args.no_checkpoint:
+        parser.error('--resume needs the progress log')
+    if args.duel_table and (args.engine != 'python' or args.workers != 1):
+        parser.error('--duel-table works with --engine python --workers 1 only')
+    if args.workers < 0:
+        parser.error('--workers must be >= 0')
+    if args.engine == 'numpy':
+        from monster_elo_numpy import NUMPY_AVAILABLE
+        if not NUMPY_AVAILABLE:
+            parser.error('--engine numpy needs numpy (pip install numpy)')
+
+    checkpoint = None
+    if not args.no_checkpoint:
+        checkpoint = args.checkpoint or str(default_log_path(args.output))
+    settings = dict(
         seed=args.seed,
         k_factor=args.k,
         fights_per_pairing=args.fights,
         tournament_passes=args.passes,
         max_combat_rounds=args.max_rounds,
-        output_path=args.output,
         spawn_weight_only=not args.include_non_spawn,
+        engine=args.engine,
+    )
+    if args.resume:
+        try:
+            settings = tournament_settings_from_log(checkpoint)
+        except (OSError, ValueError) as exc:
+            parser.error(f'cannot resume from {checkpoint}: {exc}')
+
+    run_elo_tournament(
+        output_path=args.output,
+        workers=args.workers or os.cpu_count() or 1,
+        duel_table=load_duel_table(args.duel_table) if args.duel_table else None,
+        checkpoint_path=checkpoint,
+        resume=args.resume,
+        **settings,
     )
 
 
@@ -0,0 +1,157 @@
+"""NumPy batch engine for the monster Elo tournament (optional).
+
+    py monster_elo.py --engine numpy --seed 1
+
+Fight outcomes depend only on the two combatants' stats, never on their
+current Elo, so every fight of a tournament pass can be simulated at once:
+one array slot per duel holding both sides' HP, and each attack round is a
+handful of vector operations over the duels still running. Hit rolls and
+Gaussian damage use the same formulas as combat_damage.calculate_hit_chance
+and calculate_attack_damage (round-half-even, floor of 1, armour divisor).
+Elo is then updated fight by fight in the original order, as the scalar
+engine does. Rolls come from a NumPy generator, so results match the scalar
+engine statistically, not roll for roll.
+
+Requires numpy (pip install numpy); the scalar engine needs nothing extra.
+"""
+
+from __future__ import annotations
+
+try:
+    import numpy as np
+except ImportError:  # optional: only the --engine numpy path needs it
+    np = None
+
+from combat_damage import (
+    DEFAULT_CONSISTENCY_FACTOR,
+    ZERO_BOTH_HIT_CHANCE,
+    _non_negative_stat,
+    _weapon_base_for,
+)
+
+NUMPY_AVAILABLE = np is not None
+
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("the numpy engine needs numpy: pip install numpy")
+
+
+def combatant_arrays(monsters):
+    """Stat columns (mhp, str, acc, dex, armour, weapon base) for a list of combatants."""
+    require_numpy()
+
+    def column(values, dtype):
+        return np.array(list(values), dtype=dtype)
+
+    return {
+        'mhp': column((int(m.mhp) for m in monsters), np.int64),
+        'str': column((_int_stat(m, 'str') for m in monsters), np.float64),
+        'acc': column((_non_negative_stat(getattr(m, 'acc', 1), 0) for m in monsters), np.int64),
+        'dex': column((_non_negative_stat(getattr(m, 'dex', 1), 0) for m in monsters), np.int64),
+        'armour': column((max(1.0, float(getattr(m, 'armour', 1))) for m in monsters), np.float64),
+        'base': column((float(_weapon_base_for(m)) for m in monsters), np.float64),
+    }
+
+
+def _int_stat(monster, key):
+    try:
+        return int(getattr(monster, key, 1))
+    except (TypeError, ValueError):
+        return 1
+
+
+def hit_chances(acc, dex):
+    """Vector calculate_hit_chance: 3a / (3a + d), 0.75 when both are 0."""
+    denom = 3 * acc + dex
+    safe = np.where(denom > 0, denom, 1)
+    return np.where(denom > 0, (3 * acc) / safe, ZERO_BOTH_HIT_CHANCE)
+
+
+def simulate_duels(stats, a_idx, b_idx, first_is_a, gen, max_rounds):
+    """
+    Run len(a_idx) independent duels; combatant a_idx[k] fights b_idx[k].
+
+    stats: combatant_arrays(). first_is_a: bool array, who swings first.
+    gen: numpy Generator. Returns (score_a, rounds) arrays with the same
+    meaning as simulate_monster_fight (1.0 / 0.5 / 0.0; 0.5 on timeout).
+    """
+    require_numpy()
+    a_idx = np.asarray(a_idx)
+    b_idx = np.asarray(b_idx)
+    first_is_a = np.asarray(first_is_a, dtype=bool)
+    n = a_idx.size
+    score = np.full(n, 0.5)
+    rounds = np.full(n, int(max_rounds), dtype=np.int64)
+
+    hp_a = stats['mhp'][a_idx].astype(np.float64)
+    hp_b = stats['mhp'][b_idx].astype(np.float64)
+    # Per duel, per direction: a hits b ("ab") and b hits a ("ba").
+    chance_ab = hit_chances(stats['acc'][a_idx], stats['dex'][b_idx])
+    chance_ba = hit_chances(stats['acc'][b_idx], stats['dex'][a_idx])
+    mean_a = stats['base'][a_idx] + stats['str'][a_idx]
+    mean_b = stats['base'][b_idx] + stats['str'][b_idx]
+    sd_a = np.abs(mean_a) / DEFAULT_CONSISTENCY_FACTOR
+    sd_b = np.abs(mean_b) / DEFAULT_CONSISTENCY_FACTOR
+    armour_a = stats['armour'][a_idx]
+    armour_b = stats['armour'][b_idx]
+
+    active = np.arange(n)
+    for rnd in range(1, int(max_rounds) + 1):
+        if active.size == 0:
+            break
+        # Round 1 is the first striker's; sides alternate after that.
+        a_swings = first_is_a[active] ^ (rnd % 2 == 0)
+        chance = np.where(a_swings, chance_ab[active], chance_ba[active])
+        hit = gen.random(active.size) < chance
+        mean = np.where(a_swings, mean_a[active], mean_b[active])
+        sd = np.where(a_swings, sd_a[active], sd_b[active])
+        armour = np.where(a_swings, armour_b[active], armour_a[active])
+        damage = np.maximum(1.0, np.rint(gen.normal(mean, sd) / armour)) * hit
+
+        hits_b = active[a_swings]
+        hp_b[hits_b] -= damage[a_swings]
+        hits_a = active[~a_swings]
+        hp_a[hits_a] -= damage[~a_swings]
+
+        b_died = a_swings & (hp_b[active] <= 0)
+        a_died = ~a_swings & (hp_a[active] <= 0)
+        score[active[b_died]] = 1.0
+        score[active[a_died]] = 0.0
+        done = b_died | a_died
+        rounds[active[done]] = rnd
+        active = active[~done]
+    return score, rounds
+
+
+def duel_results(monsters, pairings, fights, gen, max_rounds):
+    """
+    (score_a, rounds) arrays for `fights` duels per (i, j) pairing, pairing
+    by pairing, first striker alternating as in run_pairing.
+    """
+    require_numpy()
+    stats = combatant_arrays(monsters)
+    pairs = np.array(pairings, dtype=np.int64).reshape(-1, 2)
+    a_idx = np.repeat(pairs[:, 0], fights)
+    b_idx = np.repeat(pairs[:, 1], fights)
+    first_is_a = np.tile(np.arange(fights) % 2 == 0, len(pairs))
+    return simulate_duels(stats, a_idx, b_idx, first_is_a, gen, max_rounds)
+
+
+def run_pass(records, pairings, fights, rng, k_factor, max_rounds, record_fight):
+    """
+    One tournament pass with the batch engine: same pairing order, fight
+    order and bookkeeping (record_fight) as looping run_pairing over pairings.
+    """
+    require_numpy()
+    if not pairings or fights <= 0:
+        return
+    gen = np.random.default_rng(rng.getrandbits(64))
+    score, rounds = duel_results(
+        [rec.monster for rec in records], pairings, fights, gen, max_rounds,
+    )
+    results = zip(score.tolist(), rounds.tolist())
+    for i, j in pairings:
+        for _ in range(fights):
+            score_a, fight_rounds = next(results)
+            record_fight(records[i], records[j], score_a, fight_rounds, k_factor=k_factor)
@@ -12,6 +12,7 @@ from character_stats import ATTRIBUTE_KEYS
 from monster_types.base import MonsterTypeDef
 from monster_types.leveling import DEFAULT_LEVEL_SCALING, DEFAULT_MAX_LEVEL
 from monster_types.registry import register_monster_type
+from sheet_cache import cached_sheet_rows
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 DEFAULT_XLSX_PATH = PROJECT_ROOT / 'monster_types.xlsx'
@@ -199,14 +200,19 @@ def typedefs_from_rows(rows):
     return types
 
 
-def load_monster_sheet(path, register=True):
-    """Load species from a .xlsx workbook. Returns the MonsterTypeDef list."""
+def load_monster_sheet(path, register=True, use_cache=True):
+    """Load species from a .xlsx workbook. Returns the MonsterTypeDef list.
+
+    Rows come from the sheet_cache JSON beside the workbook while it is
+    unchanged; openpyxl is only imported to re-read an edited workbook.
+    """
     path = Path(path)
     if not path.is_file():
         raise FileNotFoundError(path)
     if path.suffix.lower() != '.xlsx':
         raise ValueError(f'Monster sheet must be .xlsx, got: {path.suffix}')
-    types = typedefs_from_rows(iter_xlsx_rows(path))
+    rows = cached_sheet_rows(path, iter_xlsx_rows) if use_cache else iter_xlsx_rows(path)
+    types = typedefs_from_rows(rows)
     if register:
         for type_def in types:
             register_monster_type(type_def)
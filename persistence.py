@@ -0,0 +1,400 @@
+"""Keep the world across restarts: periodic snapshots plus a write-ahead log.
+
+    DUNGEON_PERSIST_DIR=/var/data/world python dungeon_crawler.py
+
+Without DUNGEON_PERSIST_DIR nothing is written and every boot is a new
+world, as before. With it the directory holds:
+
+    world.snap          zlib-compressed pickle of the world (levels, town,
+                        interiors, players, messages, boot id)
+    wal-00000007.log    records since that snapshot began, one segment per
+                        snapshot: [u32 length][u32 crc32][pickled record]
+
+Records hold the state after the change, not the change, so replaying one
+the snapshot already contains is harmless:
+
+    move         player id, pos, dungeon_level, interior_id
+    player       the whole Player (joins, inventory, combat outcomes)
+    player_gone  a body left the world (death)
+    level        a newly generated (TileGrid, monsters) level
+    monster_gone a monster / NPC removed from a level or interior
+
+A snapshot first starts a new WAL segment, then pickles one level or a few
+players at a time and yields to the hub in between; compressing and writing
+run in a native thread. Anything that changes while it is being taken is in
+the new segment, which recovery replays on top of it. Only then are older
+segments deleted. Writes are flushed per record and fsynced every
+WAL_SYNC_SECONDS, so a killed process loses nothing logged; a lost machine
+loses at most that window. Monster wandering, fog exploration and battles
+in progress are not logged: they come back as of the last snapshot (battles
+not at all).
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import struct
+import time
+import zlib
+from pathlib import Path
+
+PERSIST_DIR_ENV = 'DUNGEON_PERSIST_DIR'
+SNAPSHOT_EVERY_SECONDS = 60.0
+WAL_SYNC_SECONDS = 1.0
+# Objects pickled between hub yields while a snapshot is taken.
+SNAPSHOT_BATCH = 8
+SNAPSHOT_NAME = 'world.snap'
+SNAPSHOT_MAGIC = b'DCWORLD1'
+_FRAME = struct.Struct('<II')
+_PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+
+def _hub_patched():
+    try:
+        from eventlet import patcher
+    except ImportError:
+        return False
+    return patcher.is_monkey_patched('thread')
+
+
+def run_blocking(fn, *args):
+    """fn(*args) in eventlet's native thread pool when serving, else inline."""
+    if _hub_patched():
+        from eventlet import tpool
+
+        return tpool.execute(fn, *args)
+    return fn(*args)
+
+
+def _no_yield(_seconds):
+    return None
+
+
+def encode_record(record):
+    payload = pickle.dumps(record, protocol=_PICKLE_PROTOCOL)
+    return _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_wal(path):
+    """Records in one WAL segment; stops at a torn or corrupt tail."""
+    records = []
+    data = Path(path).read_bytes()
+    offset = 0
+    while offset + _FRAME.size <= len(data):
+        length, crc = _FRAME.unpack_from(data, offset)
+        start = offset + _FRAME.size
+        payload = data[start:start + length]
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            break
+        try:
+            records.append(pickle.loads(payload))
+        except Exception:
+            break
+        offset = start + length
+    return records
+
+
+def write_snapshot_file(path, payload):
+    """Compress and atomically replace path (runs off the hub)."""
+    path = Path(path)
+    blob = SNAPSHOT_MAGIC + zlib.compress(pickle.dumps(payload, protocol=_PICKLE_PROTOCOL), 6)
+    tmp = path.with_name(path.name + '.tmp')
+    with tmp.open('wb') as fh:
+        fh.write(blob)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+    return len(blob)
+
+
+def read_snapshot_file(path):
+    data = Path(path).read_bytes()
+    if not data.startswith(SNAPSHOT_MAGIC):
+        raise ValueError(f'{path} is not a world snapshot')
+    return pickle.loads(zlib.decompress(data[len(SNAPSHOT_MAGIC):]))
+
+
+def capture_world(game_state, boot_id, wal_from, sleep=_no_yield):
+    """
+    Snapshot payload for game_state, pickled a few objects at a time with
+    sleep(0) in between so the hub keeps serving.
+    """
+    payload = {
+        'boot_id': boot_id,
+        'wal_from': wal_from,
+        'created': time.time(),
+        'world_version': getattr(game_state, 'world_version', 0),
+        'town_doors': dict(getattr(game_state, 'town_doors', None) or {}),
+        'town_exits': dict(getattr(game_state, 'town_exits', None) or {}),
+        'interiors': pickle.dumps(getattr(game_state, 'interiors', None) or {}, _PICKLE_PROTOCOL),
+        'player_messages': {
+            pid: list(msgs) for pid, msgs in (getattr(game_state, 'player_messages', None) or {}).items()
+        },
+        'levels': {},
+        'players': {},
+    }
+    pending = 0
+    for number in list(game_state.levels):
+        level = game_state.levels.get(number)
+        if level is not None:
+            payload['levels'][number] = pickle.dumps(level, _PICKLE_PROTOCOL)
+        pending += 1
+        if pending >= SNAPSHOT_BATCH:
+            pending = 0
+            sleep(0)
+    for player_id in list(game_state.players):
+        player = game_state.players.get(player_id)
+        if player is not None:
+            payload['players'][player_id] = pickle.dumps(player, _PICKLE_PROTOCOL)
+        pending += 1
+        if pending >= SNAPSHOT_BATCH:
+            pending = 0
+            sleep(0)
+    return payload
+
+
+def _settle_player(player):
+    """Drop per-session state a restored body must not carry."""
+    player.in_combat = False
+    player.visible = set()
+    player.merged_fov = None
+
+
+def restore_snapshot(game_state, payload):
+    """Replace game_state's world with a snapshot payload (dicts updated in place)."""
+    levels = {n: pickle.loads(blob) for n, blob in payload['levels'].items()}
+    game_state.levels.clear()
+    game_state.levels.update(levels)
+    if 0 in levels:
+        game_state.game_map, game_state.monsters = levels[0]
+    game_state.interiors = pickle.loads(payload['interiors'])
+    game_state.town_doors = dict(payload['town_doors'])
+    game_state.town_exits = dict(payload['town_exits'])
+    game_state.players.clear()
+    for player_id, blob in payload['players'].items():
+        game_state.players[player_id] = pickle.loads(blob)
+    game_state.player_messages.clear()
+    game_state.player_messages.update(payload['player_messages'])
+    game_state.world_version = payload.get('world_version', 0)
+
+
+def apply_record(game_state, record):
+    """Redo one WAL record on game_state."""
+    kind = record[0]
+    if kind == 'move':
+        _kind, player_id, pos, dungeon_level, interior_id = record
+        player = game_state.players.get(player_id)
+        if player is not None:
+            player.pos = list(pos)
+            player.dungeon_level = dungeon_level
+            player.interior_id = interior_id
+    elif kind == 'player':
+        player = pickle.loads(record[2])
+        game_state.players[record[1]] = player
+        game_state.player_messages.setdefault(record[1], [])
+    elif kind == 'player_gone':
+        game_state.players.pop(record[1], None)
+    elif kind == 'level':
+        level = pickle.loads(record[2])
+        game_state.levels[record[1]] = level
+        if record[1] == 0:
+            game_state.game_map, game_state.monsters = level
+    elif kind == 'monster_gone':
+        _kind, number, interior_id, position = record
+        position = tuple(position)
+        if interior_id is not None:
+            interior = (getattr(game_state, 'interiors', None) or {}).get(interior_id)
+            if interior is not None:
+                interior[1].pop(position, None)
+            return
+        level = game_state.levels.get(number)
+        if level is not None and level[1].pop(position, None) is not None:
+            game_map = level[0]
+            if game_map[position[0]][position[1]] == '&':
+                game_map[position[0]][position[1]] = '.'
+
+
+class WorldStore:
+    """Snapshot + WAL files in one directory for one GameState."""
+
+    def __init__(self, directory, blocking=run_blocking):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.blocking = blocking
+        self.boot_id = None
+        self.segment = 0
+        self.wal = None
+        self.unsynced = False
+        self.last_sync = time.monotonic()
+        self.snapshotting = False
+        self.records = 0
+        self.snapshots = 0
+        self.last_snapshot_seconds = None
+        self.last_snapshot_bytes = None
+        self.replayed = 0
+
+    @property
+    def snapshot_path(self):
+        return self.directory / SNAPSHOT_NAME
+
+    def _segment_path(self, segment):
+        return self.directory / f'wal-{segment:08d}.log'
+
+    def _segments(self):
+        found = []
+        for path in self.directory.glob('wal-*.log'):
+            try:
+                found.append(int(path.stem.split('-', 1)[1]))
+            except ValueError:
+                continue
+        return sorted(found)
+
+    # -- boot --------------------------------------------------------------
+
+    def recover(self, game_state):
+        """
+        Load the last snapshot into game_state and replay the WAL after it.
+        Returns the stored boot id, or None when there is nothing to recover.
+        """
+        if not self.snapshot_path.is_file():
+            return None
+        payload = read_snapshot_file(self.snapshot_path)
+        restore_snapshot(game_state, payload)
+        self.boot_id = payload['boot_id']
+        replayed = 0
+        segments = [s for s in self._segments() if s >= payload['wal_from']]
+        for segment in segments:
+            for record in read_wal(self._segment_path(segment)):
+                apply_record(game_state, record)
+                replayed += 1
+        self.segment = max(segments + [payload['wal_from']])
+        self.replayed = replayed
+        for player in game_state.players.values():
+            _settle_player(player)
+        for _game_map, monsters in game_state.levels.values():
+            for monster in monsters.values():
+                monster.in_combat = False
+        return self.boot_id
+
+    def start(self, game_state, boot_id):
+        """Begin logging: a base snapshot so the WAL always has one under it."""
+        self.boot_id = boot_id
+        self.segment = max([self.segment] + self._segments())
+        self.snapshot(game_state)
+
+    # -- WAL ---------------------------------------------------------------
+
+    def _open_segment(self, segment):
+        # Switch first: records logged while the old file syncs go to the new one.
+        old = self.wal
+        self.segment = segment
+        self.wal = self._segment_path(segment).open('ab')
+        if old is not None:
+            old.flush()
+            self.blocking(os.fsync, old.fileno())
+            old.close()
+
+    def append(self, record):
+        if self.wal is None:
+            return
+        self.wal.write(encode_record(record))
+        self.wal.flush()
+        self.unsynced = True
+        self.records += 1
+
+    def sync(self, force=False):
+        """fsync the WAL if records are pending and WAL_SYNC_SECONDS passed."""
+        if self.wal is None or not self.unsynced:
+            return False
+        if not force and time.monotonic() - self.last_sync < WAL_SYNC_SECONDS:
+            return False
+        self.blocking(os.fsync, self.wal.fileno())
+        self.unsynced = False
+        self.last_sync = time.monotonic()
+        return True
+
+    def player_moved(self, player):
+        self.append((
+            'move', player.id, list(player.pos), player.dungeon_level,
+            getattr(player, 'interior_id', None),
+        ))
+
+    def player_changed(self, player):
+        self.append(('player', player.id, pickle.dumps(player, _PICKLE_PROTOCOL)))
+
+    def player_gone(self, player_id):
+        self.append(('player_gone', player_id))
+
+    def level_added(self, number, level):
+        self.append(('level', number, pickle.dumps(level, _PICKLE_PROTOCOL)))
+
+    def monster_gone(self, number, interior_id, position):
+        self.append(('monster_gone', number, interior_id, tuple(position)))
+
+    # -- snapshots ---------------------------------------------------------
+
+    def snapshot(self, game_state, sleep=_no_yield):
+        """
+        Write world.snap for game_state. New records go to a fresh segment
+        from the start, so the snapshot plus that segment is always complete.
+        """
+        if self.snapshotting:
+            return False
+        self.snapshotting = True
+        started = time.perf_counter()
+        try:
+            wal_from = self.segment + 1
+            self._open_segment(wal_from)
+            payload = capture_world(game_state, self.boot_id, wal_from, sleep)
+            self.last_snapshot_bytes = self.blocking(
+                write_snapshot_file, self.snapshot_path, payload
+            )
+            for segment in self._segments():
+                if segment < wal_from:
+                    self._segment_path(segment).unlink(missing_ok=True)
+            self.snapshots += 1
+        finally:
+            self.snapshotting = False
+        self.last_snapshot_seconds = time.perf_counter() - started
+        return True
+
+    def close(self):
+        if self.wal is not None:
+            self.wal.flush()
+            os.fsync(self.wal.fileno())
+            self.wal.close()
+            self.wal = None
+
+    def stats(self):
+        """Counters for monitoring."""
+        return {
+            'segment': self.segment,
+            'records': self.records,
+            'replayed': self.replayed,
+            'snapshots': self.snapshots,
+            'last_snapshot_seconds': self.last_snapshot_seconds,
+            'last_snapshot_bytes': self.last_snapshot_bytes,
+        }
+
+
+def store_from_env(environ=None):
+    """WorldStore in $DUNGEON_PERSIST_DIR, or None when persistence is off."""
+    directory = (environ if environ is not None else os.environ).get(PERSIST_DIR_ENV)
+    if not directory:
+        return None
+    return WorldStore(directory)
+
+
+def persist_world(store, game_state, sleep, every=SNAPSHOT_EVERY_SECONDS):
+    """Background loop: fsync the WAL about once a second, snapshot every `every` s."""
+    last_snapshot = time.monotonic()
+    while True:
+        sleep(WAL_SYNC_SECONDS)
+        try:
+            store.sync()
+            if time.monotonic() - last_snapshot >= every:
+                store.snapshot(game_state, sleep)
+                last_snapshot = time.monotonic()
+        except Exception as exc:  # keep the hub alive; retry next tick
+            print(f"[persistence] {exc!r}")
@@ -29,6 +29,10 @@ INTERIOR_SIGHT_RANGE = 8
 
 
 class Player:
+    # on_move(player) runs after pos, dungeon_level or interior_id is set; the
+    # interest index hooks it so direct assignments keep it current. Not pickled.
+    on_move = None
+
     def __init__(self, player_id, position):
         self.id = player_id
         self.pos = position
@@ -57,9 +61,52 @@ class Player:
         self.sight_range = 8
         self.explored = {}  # dungeon_level -> set of (y, x)
         self.visible = set()  # current LOS tiles (y, x)
+        self.merged_fov = None  # (explored set, recent FOV cache keys already unioned in)
         self.appearance_id = 'peasant'
         self.inventory = Inventory()
 
+    @property
+    def pos(self):
+        return self._pos
+
+    @pos.setter
+    def pos(self, value):
+        self._pos = value
+        if self.on_move is not None:
+            self.on_move(self)
+
+    @property
+    def dungeon_level(self):
+        return self._dungeon_level
+
+    @dungeon_level.setter
+    def dungeon_level(self, value):
+        self._dungeon_level = value
+        if self.on_move is not None:
+            self.on_move(self)
+
+    @property
+    def interior_id(self):
+        return self._interior_id
+
+    @interior_id.setter
+    def interior_id(self, value):
+        self._interior_id = value
+        if self.on_move is not None:
+            self.on_move(self)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop('on_move', None)
+        return state
+
+    def __setstate__(self, state):
+        # Snapshots written before pos/level/interior became properties.
+        for name in ('pos', 'dungeon_level', 'interior_id'):
+            if name in state:
+                state['_' + name] = state.pop(name)
+        self.__dict__.update(state)
+
     def explored_key(self):
         """Fog memory key: dungeon level int, or ('interior', id)."""
         if self.interior_id:
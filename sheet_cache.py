@@ -0,0 +1,159 @@
+"""Compiled row caches for the species / item workbooks.
+
+    py sheet_cache.py            # prebuild both caches (Render build step)
+    py sheet_cache.py --check    # report which caches are stale
+
+Parsing monster_types.xlsx and item_types.xlsx means importing openpyxl and
+unzipping each workbook on every server start and test process. The rows
+are cached as compact JSON next to the workbook (monster_types.sheet.json)
+together with the workbook's size, mtime and SHA-256:
+
+    size + mtime match       cache used as-is, workbook not even read
+    content hash matches     cache used, stamp refreshed (fresh checkout)
+    anything else            rows re-read through openpyxl, cache rewritten
+
+Only the raw column->value rows are stored, so row_to_typedef stays the one
+place that interprets a sheet. A cache that cannot be written (read-only
+deploy) just means the next start parses the workbook again.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+CACHE_FORMAT = 1
+CACHE_SUFFIX = '.sheet.json'
+
+
+def cache_path_for(xlsx_path):
+    """monster_types.xlsx -> monster_types.sheet.json"""
+    path = Path(xlsx_path)
+    return path.with_name(path.stem + CACHE_SUFFIX)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with Path(path).open('rb') as fh:
+        for block in iter(lambda: fh.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _stamp(path):
+    st = Path(path).stat()
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _read_cache(cache_path):
+    try:
+        with Path(cache_path).open(encoding='utf-8') as fh:
+            payload = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(payload, dict) or payload.get('format') != CACHE_FORMAT:
+        return None
+    if not isinstance(payload.get('rows'), list):
+        return None
+    return payload
+
+
+def _write_cache(cache_path, payload):
+    cache_path = Path(cache_path)
+    tmp = cache_path.with_name(cache_path.name + '.tmp')
+    try:
+        with tmp.open('w', encoding='utf-8') as fh:
+            json.dump(payload, fh, separators=(',', ':'), default=str)
+        os.replace(tmp, cache_path)
+    except OSError as exc:
+        print(f'[sheet_cache] could not write {cache_path}: {exc}')
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def cache_status(xlsx_path):
+    """'fresh', 'rehash' (same content, new mtime), 'stale' or 'missing'."""
+    payload = _read_cache(cache_path_for(xlsx_path))
+    if payload is None:
+        return 'missing'
+    if payload.get('stamp') == _stamp(xlsx_path):
+        return 'fresh'
+    if payload.get('sha256') == file_sha256(xlsx_path):
+        return 'rehash'
+    return 'stale'
+
+
+def build_sheet_cache(xlsx_path, read_rows):
+    """Read every row through read_rows(xlsx_path) and write the cache. Returns rows."""
+    stamp = _stamp(xlsx_path)
+    sha256 = file_sha256(xlsx_path)
+    rows = list(read_rows(xlsx_path))
+    _write_cache(cache_path_for(xlsx_path), {
+        'format': CACHE_FORMAT,
+        'source': Path(xlsx_path).name,
+        'stamp': stamp,
+        'sha256': sha256,
+        'rows': rows,
+    })
+    return rows
+
+
+def cached_sheet_rows(xlsx_path, read_rows):
+    """
+    Rows of xlsx_path from its cache when the workbook is unchanged, else from
+    read_rows(xlsx_path) (the openpyxl reader), refreshing the cache.
+    """
+    cache_path = cache_path_for(xlsx_path)
+    payload = _read_cache(cache_path)
+    if payload is not None:
+        stamp = _stamp(xlsx_path)
+        if payload.get('stamp') == stamp:
+            return payload['rows']
+        if payload.get('sha256') == file_sha256(xlsx_path):
+            payload['stamp'] = stamp
+            _write_cache(cache_path, payload)
+            return payload['rows']
+    return build_sheet_cache(xlsx_path, read_rows)
+
+
+def _default_sheets():
+    from item_types import sheet as item_sheet
+    from monster_types import sheet as monster_sheet
+
+    return [
+        (monster_sheet.DEFAULT_XLSX_PATH, monster_sheet.iter_xlsx_rows),
+        (item_sheet.DEFAULT_XLSX_PATH, item_sheet.iter_xlsx_rows),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Prebuild the workbook row caches.')
+    parser.add_argument(
+        '--check', action='store_true',
+        help='only report each cache status; exit 1 if any would be rebuilt',
+    )
+    args = parser.parse_args(argv)
+    stale = False
+    for xlsx_path, read_rows in _default_sheets():
+        if not Path(xlsx_path).is_file():
+            print(f'{xlsx_path.name}: missing workbook, skipped')
+            continue
+        status = cache_status(xlsx_path)
+        if args.check:
+            stale = stale or status in ('stale', 'missing')
+            print(f'{xlsx_path.name}: {status}')
+            continue
+        rows = build_sheet_cache(xlsx_path, read_rows)
+        print(f'{xlsx_path.name}: {len(rows)} rows -> {cache_path_for(xlsx_path).name}')
+    return 1 if stale else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
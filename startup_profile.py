@@ -0,0 +1,148 @@
+"""Cold-start profile of the game server.
+
+    py dungeon_crawler.py --profile-startup
+    py startup_profile.py --top 15 --budget 5
+
+Starts a fresh interpreter with -X importtime that does what the server
+does before it can answer a health check: monkey-patch eventlet, import
+dungeon_crawler, call create_app(). Prints each phase's wall time, the
+slowest top-level packages (summed self import time) and the slowest
+modules (cumulative), then exits 1 if the total is over --budget seconds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+# Cold start must fit inside the host's health-check window.
+DEFAULT_BUDGET_SECONDS = float(os.environ.get('STARTUP_BUDGET_SECONDS', 5.0))
+DEFAULT_TOP = 12
+_PHASES_MARKER = 'startup-phases:'
+
+_CHILD = f"""
+import json, os, time
+os.environ.setdefault('EVENTLET_NO_GREENDNS', 'yes')  # as dungeon_crawler.py
+t0 = time.perf_counter()
+import eventlet
+eventlet.monkey_patch()
+t1 = time.perf_counter()
+import dungeon_crawler
+t2 = time.perf_counter()
+dungeon_crawler.create_app()
+t3 = time.perf_counter()
+print({_PHASES_MARKER!r} + json.dumps([
+    ['eventlet.monkey_patch', t1 - t0],
+    ['import dungeon_crawler', t2 - t1],
+    ['create_app()', t3 - t2],
+]), flush=True)
+os._exit(0)  # skip joining the level pipeline thread
+"""
+
+
+def parse_importtime(text):
+    """[(module, self_s, cumulative_s, depth)] from -X importtime stderr."""
+    entries = []
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cum_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # the header line
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        entries.append((name.strip(), self_us / 1e6, cum_us / 1e6, depth))
+    return entries
+
+
+def package_totals(entries):
+    """{top-level package: summed self import seconds}, slowest first."""
+    totals = {}
+    for name, self_s, _cum_s, _depth in entries:
+        root = name.split('.', 1)[0]
+        totals[root] = totals.get(root, 0.0) + self_s
+    return dict(sorted(totals.items(), key=lambda kv: kv[1], reverse=True))
+
+
+def run_profile(python=None):
+    """{'phases': [[name, s], ...], 'imports': parse_importtime entries}."""
+    proc = subprocess.run(
+        [python or sys.executable, '-X', 'importtime', '-c', _CHILD],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+    )
+    phases = None
+    for line in proc.stdout.splitlines():
+        if line.startswith(_PHASES_MARKER):
+            phases = json.loads(line[len(_PHASES_MARKER):])
+    if proc.returncode != 0 or phases is None:
+        raise RuntimeError(
+            f'startup child failed (exit {proc.returncode}):\n{proc.stderr[-2000:]}'
+        )
+    return {'phases': phases, 'imports': parse_importtime(proc.stderr)}
+
+
+def _is_project_module(name):
+    root = name.split('.', 1)[0]
+    return (PROJECT_ROOT / f'{root}.py').is_file() or (PROJECT_ROOT / root).is_dir()
+
+
+def format_report(profile, top=DEFAULT_TOP, budget=DEFAULT_BUDGET_SECONDS):
+    lines = []
+    total = sum(seconds for _name, seconds in profile['phases'])
+    lines.append('Startup phases')
+    for name, seconds in profile['phases']:
+        lines.append(f'  {name:<26} {seconds * 1000:8.1f} ms')
+    verdict = 'within' if total <= budget else 'OVER'
+    lines.append(f'  {"total":<26} {total * 1000:8.1f} ms  ({verdict} {budget:g} s budget)')
+
+    lines.append('')
+    lines.append('Slowest packages (self import time, summed)')
+    for root, seconds in list(package_totals(profile['imports']).items())[:top]:
+        mark = '  *' if _is_project_module(root) else ''
+        lines.append(f'  {root:<32} {seconds * 1000:8.1f} ms{mark}')
+
+    lines.append('')
+    lines.append('Slowest modules (cumulative import time)')
+    slowest = sorted(profile['imports'], key=lambda e: e[2], reverse=True)[:top]
+    for name, _self_s, cum_s, _depth in slowest:
+        mark = '  *' if _is_project_module(name) else ''
+        lines.append(f'  {name:<32} {cum_s * 1000:8.1f} ms{mark}')
+    lines.append('')
+    lines.append('* = this project')
+    return '\n'.join(lines), total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Profile server cold start.')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP)
+    parser.add_argument(
+        '--budget', type=float, default=DEFAULT_BUDGET_SECONDS,
+        help='seconds; exit 1 if cold start takes longer (STARTUP_BUDGET_SECONDS)',
+    )
+    parser.add_argument('--json', action='store_true', help='print the raw profile')
+    args = parser.parse_args(argv)
+    profile = run_profile()
+    report, total = format_report(profile, top=args.top, budget=args.budget)
+    if args.json:
+        print(json.dumps({
+            'phases': profile['phases'],
+            'total': total,
+            'budget': args.budget,
+            'packages': package_totals(profile['imports']),
+        }, indent=2))
+    else:
+        print(report)
+    return 0 if total <= args.budget else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""Versioned per-client game_state snapshots and delta encoding.
+
+Every frame sent to a player gets a version number. The client acks the
+versions it has applied, and the next frame is diffed against the newest
+acked one and sent as ``game_state_delta``. Camera, viewport, map-size, or
+floor changes fall back to a full ``game_state`` frame, as does a client
+resync. Clients that never ack only ever get full frames.
+"""
+
+# A change in any of these invalidates every viewport cell at once.
+FULL_FRAME_KEYS = ('camera', 'viewport', 'map_size', 'boot_id')
+# Player fields that mean the viewer is looking at a different map.
+CONTEXT_PLAYER_KEYS = ('dungeon_level', 'interior_id')
+# Sections diffed cell-by-cell / entity-by-entity rather than copied.
+STRUCTURED_KEYS = frozenset({'map', 'fog', 'entities', 'player', 'version'})
+# Unacked frames kept per client before falling back to a full frame.
+MAX_PENDING_FRAMES = 8
+# Once this share of viewport cells changed, a full frame is cheaper.
+MAX_DELTA_TILE_RATIO = 0.5
+
+
+def entity_key(entity):
+    """Stable identity of an entity across frames ('monster:goblin-3,4')."""
+    return f"{entity.get('kind')}:{entity.get('id')}"
+
+
+def _diff_tiles(base, frame):
+    base_map = base.get('map') or []
+    base_fog = base.get('fog') or []
+    new_map = frame.get('map') or []
+    new_fog = frame.get('fog') or []
+    if len(base_map) != len(new_map) or len(base_fog) != len(new_fog):
+        return None
+    tiles = []
+    for vy, (row, fog_row) in enumerate(zip(new_map, new_fog)):
+        base_row = base_map[vy]
+        base_fog_row = base_fog[vy]
+        if row == base_row and fog_row == base_fog_row:
+            continue
+        if len(row) != len(base_row) or len(fog_row) != len(base_fog_row):
+            return None
+        for vx, char in enumerate(row):
+            state = fog_row[vx]
+            if char != base_row[vx] or state != base_fog_row[vx]:
+                tiles.append([vy, vx, char, state])
+    return tiles
+
+
+def _diff_entities(base_entities, entities):
+    base_by_key = {entity_key(e): e for e in base_entities}
+    keys = [entity_key(e) for e in entities]
+    new_keys = set(keys)
+    upsert = [
+        e for key, e in zip(keys, entities)
+        if base_by_key.get(key) != e
+    ]
+    remove = [key for key in base_by_key if key not in new_keys]
+
+    # Order the client will rebuild: surviving base entities in place, then
+    # newcomers appended. Only ship the full order if that guess is wrong.
+    base_keys = set(base_by_key)
+    rebuilt = [key for key in base_by_key if key in new_keys]
+    rebuilt.extend(key for key in keys if key not in base_keys)
+    diff = {'upsert': upsert, 'remove': remove}
+    if rebuilt != keys:
+        diff['order'] = keys
+    return diff
+
+
+def diff_frames(base, frame):
+    """
+    Delta turning ``base`` into ``frame``, or None if a full frame is needed.
+
+    Tiles are [vy, vx, char, fog] for changed viewport cells; entities are
+    upserted / removed by entity_key; player and top-level fields are sent
+    only when they changed.
+    """
+    for key in FULL_FRAME_KEYS:
+        if base.get(key) != frame.get(key):
+            return None
+    base_player = base.get('player') or {}
+    player = frame.get('player') or {}
+    if bool(base.get('player')) != bool(frame.get('player')):
+        return None
+    for key in CONTEXT_PLAYER_KEYS:
+        if base_player.get(key) != player.get(key):
+            return None
+
+    tiles = _diff_tiles(base, frame)
+    if tiles is None:
+        return None
+    viewport = frame.get('viewport') or {}
+    cells = int(viewport.get('h', 0) or 0) * int(viewport.get('w', 0) or 0)
+    if cells and len(tiles) > cells * MAX_DELTA_TILE_RATIO:
+        return None
+
+    changed = {}
+    for key, value in frame.items():
+        if key in STRUCTURED_KEYS:
+            continue
+        if key not in base or base[key] != value:
+            changed[key] = value
+    removed = [
+        key for key in base
+        if key not in frame and key not in STRUCTURED_KEYS
+    ]
+
+    return {
+        'tiles': tiles,
+        'entities': _diff_entities(base.get('entities') or [], frame.get('entities') or []),
+        'player': {k: v for k, v in player.items() if base_player.get(k) != v},
+        'set': changed,
+        'unset': removed,
+    }
+
+
+def _snapshot(payload):
+    """Frame copy safe to keep: the live message list is mutated in place."""
+    frame = dict(payload)
+    if isinstance(frame.get('messages'), list):
+        frame['messages'] = list(frame['messages'])
+    return frame
+
+
+class ClientSnapshots:
+    """Frames sent to one client that it may still diff against."""
+
+    __slots__ = ('version', 'acked', 'frames')
+
+    def __init__(self):
+        self.version = 0
+        self.acked = None
+        self.frames = {}  # version -> frame
+
+
+class SnapshotCache:
+    """Per-player versioned frames; turns each payload into a full frame or a delta."""
+
+    def __init__(self, max_pending=MAX_PENDING_FRAMES):
+        self.max_pending = max(1, int(max_pending))
+        self.clients = {}  # player_id -> ClientSnapshots
+
+    def reset(self, player_id):
+        """Forget a client's frames (new socket, resync, or disconnect)."""
+        self.clients.pop(player_id, None)
+
+    def ack(self, player_id, version):
+        """Record that the client applied ``version``. Returns False if unknown."""
+        client = self.clients.get(player_id)
+        if client is None:
+            return False
+        try:
+            version = int(version)
+        except (TypeError, ValueError):
+            return False
+        if version not in client.frames:
+            return False
+        if client.acked is not None and version <= client.acked:
+            return True
+        client.acked = version
+        for old in [v for v in client.frames if v < version]:
+            del client.frames[old]
+        return True
+
+    def encode(self, player_id, payload, full=False):
+        """
+        Number ``payload`` for this client and return (event, data).
+
+        ``game_state_delta`` when an acked base frame exists and the change
+        is small; otherwise the full payload as ``game_state``.
+        """
+        client = self.clients.get(player_id)
+        if client is None:
+            client = ClientSnapshots()
+            self.clients[player_id] = client
+        client.version += 1
+        version = client.version
+        frame = _snapshot(payload)
+        frame['version'] = version
+
+        delta = None
+        base = client.frames.get(client.acked) if client.acked is not None else None
+        if not full and base is not None and len(client.frames) <= self.max_pending:
+            delta = diff_frames(base, frame)
+
+        if delta is None:
+            # New baseline: older frames are gone on the client after this.
+            client.frames = {version: frame}
+            client.acked = None
+            payload['version'] = version
+            return 'game_state', payload
+
+        client.frames[version] = frame
+        delta['version'] = version
+        delta['base'] = client.acked
+        return 'game_state_delta', delta
@@ -14,6 +14,21 @@ const SocketHandler = (function () {
     /** World this tab joined. A new server process has a different id. */
     let knownBootId = null;
 
+    /** Move tracing (?trace=1 or localStorage.dungeonTrace = '1'). */
+    const TRACE_KEEP = 200;
+    const tracing = (function () {
+        try {
+            return /[?&]trace=1\b/.test(window.location.search)
+                || window.localStorage.getItem('dungeonTrace') === '1';
+        } catch (e) {
+            return false;
+        }
+    })();
+    let traceSeq = 0;
+    /** trace id -> {sent, firstFrame} for moves not yet echoed */
+    const pendingTraces = new Map();
+    const traces = [];
+
     function currentViewport() {
         if (typeof MapView !== 'undefined' && MapView.measureViewportNow) {
             return MapView.measureViewportNow();
@@ -72,6 +87,84 @@ const SocketHandler = (function () {
         }, 750);
     }
 
+    function noteFrameForTraces() {
+        if (!pendingTraces.size) {
+            return;
+        }
+        const now = performance.now();
+        pendingTraces.forEach(function (entry) {
+            if (entry.firstFrame == null) {
+                entry.firstFrame = now;
+            }
+        });
+    }
+
+    /** Server timings for a traced move, joined with what the client saw. */
+    function recordTrace(data) {
+        const entry = data && pendingTraces.get(data.id);
+        if (!entry) {
+            return;
+        }
+        pendingTraces.delete(data.id);
+        const now = performance.now();
+        const rtt = now - entry.sent;
+        const trace = {
+            id: data.id,
+            at: Date.now() / 1000,
+            player_id: getJoinedPlayerId(),
+            rtt_ms: rtt,
+            first_frame_ms: entry.firstFrame != null ? entry.firstFrame - entry.sent : null,
+            server_ms: data.server_ms,
+            network_ms: Math.max(0, rtt - (data.server_ms || 0)),
+            spans: data.spans || [],
+        };
+        traces.push(trace);
+        if (traces.length > TRACE_KEEP) {
+            traces.shift();
+        }
+        console.debug('move ' + trace.id + ': ' + rtt.toFixed(1) + ' ms round trip, '
+            + (data.server_ms || 0).toFixed(1) + ' ms on the server', trace.spans);
+    }
+
+    /** Traced moves so far as JSON lines (paste into a file for tracing.py). */
+    function dumpTraces() {
+        return traces.map(function (t) { return JSON.stringify(t); }).join('\n');
+    }
+
+    /** Apply one full frame (sent whole or rebuilt from a delta) and ack it. */
+    function applyFrame(data) {
+        noteFrameForTraces();
+        const boot = data && data.boot_id ? String(data.boot_id) : '';
+        if (boot && knownBootId && boot !== knownBootId) {
+            handleWorldReset(boot);
+            return;
+        }
+        if (boot && !knownBootId) {
+            knownBootId = boot;
+        }
+        // Ignore spectator/level-0 payloads while logged in (reconnect flash)
+        if (getJoinedPlayerId() && (!data || !data.player)) {
+            tryResumeSession();
+            return;
+        }
+        if (data && data.player && data.player.id) {
+            idTakenRetries = 0;
+            if (boot) {
+                knownBootId = boot;
+            }
+        }
+        UI.applyGameState(data);
+        UI.updateMessages(data.messages);
+        UI.updatePlayerProperties(data.player);
+        UI.updateGameInfo(data.game_info);
+        if (typeof InventoryUI !== 'undefined' && InventoryUI.setInventory) {
+            InventoryUI.setInventory(data.player && data.player.inventory);
+        }
+        if (data.version != null) {
+            socket.emit('state_ack', { version: data.version });
+        }
+    }
+
     function setupSocketEvents() {
         socket.on('server_hello', function (data) {
             const boot = data && data.boot_id ? String(data.boot_id) : '';
@@ -113,38 +206,33 @@ const SocketHandler = (function () {
         });
 
         socket.on('game_state', function (data) {
-            const boot = data && data.boot_id ? String(data.boot_id) : '';
-            if (boot && knownBootId && boot !== knownBootId) {
-                handleWorldReset(boot);
-                return;
-            }
-            if (boot && !knownBootId) {
-                knownBootId = boot;
+            if (typeof StateSync !== 'undefined') {
+                StateSync.acceptFull(data);
             }
-            // Ignore spectator/level-0 payloads while logged in (reconnect flash)
-            if (getJoinedPlayerId() && (!data || !data.player)) {
-                tryResumeSession();
-                return;
-            }
-            if (data && data.player && data.player.id) {
-                idTakenRetries = 0;
-                if (boot) {
-                    knownBootId = boot;
+            applyFrame(data);
+        });
+
+        socket.on('game_state_delta', function (delta) {
+            const frame = typeof StateSync !== 'undefined'
+                ? StateSync.applyDelta(delta)
+                : null;
+            if (!frame) {
+                // Base frame missing (reload / dropped packet): ask for a full one
+                if (typeof StateSync !== 'undefined') {
+                    StateSync.reset();
                 }
+                socket.emit('state_resync', {});
+                return;
             }
-            UI.applyGameState(data);
-            UI.updateMessages(data.messages);
-            UI.updatePlayerProperties(data.player);
-            UI.updateGameInfo(data.game_info);
-            if (typeof InventoryUI !== 'undefined' && InventoryUI.setInventory) {
-                InventoryUI.setInventory(data.player && data.player.inventory);
-            }
+            applyFrame(frame);
         });
 
         socket.on('combat_update', function (data) {
             Combat.processCombatUpdate(data);
         });
 
+        socket.on('move_trace', recordTrace);
+
         socket.on('inspect_result', function (data) {
             if (typeof InspectUI !== 'undefined' && InspectUI.show) {
                 InspectUI.show(data);
@@ -191,7 +279,18 @@ const SocketHandler = (function () {
     }
 
     function sendMove(direction) {
-        socket.emit('move', direction);
+        if (!tracing) {
+            socket.emit('move', direction);
+            return;
+        }
+        traceSeq += 1;
+        const id = (getJoinedPlayerId() || 'anon') + '-' + traceSeq;
+        pendingTraces.set(id, { sent: performance.now(), firstFrame: null });
+        if (pendingTraces.size > TRACE_KEEP) {
+            // Echoes lost to a dropped connection never arrive
+            pendingTraces.delete(pendingTraces.keys().next().value);
+        }
+        socket.emit('move', { dir: direction, trace: { id: id, t: Date.now() } });
     }
 
     function setViewport(h, w, camera) {
@@ -225,5 +324,6 @@ const SocketHandler = (function () {
         tryResumeSession,
         getJoinedPlayerId,
         clearJoinedSession,
+        dumpTraces,
     };
 })();
@@ -0,0 +1,114 @@
+// state_sync.js - Rebuild full game_state frames from server deltas
+const StateSync = (function () {
+    /** Frames the server may diff against, by version. */
+    let frames = {};
+
+    function entityKey(entity) {
+        return String(entity.kind) + ':' + String(entity.id);
+    }
+
+    function reset() {
+        frames = {};
+    }
+
+    /** Full frame from the server: it becomes the only base. */
+    function acceptFull(data) {
+        if (!data || data.version == null) {
+            reset();
+            return data;
+        }
+        frames = {};
+        frames[data.version] = data;
+        return data;
+    }
+
+    function applyTiles(base, tiles) {
+        if (!tiles || !tiles.length) {
+            return { map: base.map, fog: base.fog };
+        }
+        // Copy-on-write per touched row: the base frame stays intact.
+        const map = base.map.slice();
+        const fog = base.fog.slice();
+        const copied = {};
+        for (let i = 0; i < tiles.length; i++) {
+            const t = tiles[i];
+            const vy = t[0];
+            if (!copied[vy]) {
+                map[vy] = map[vy].slice();
+                fog[vy] = fog[vy].slice();
+                copied[vy] = true;
+            }
+            map[vy][t[1]] = t[2];
+            fog[vy][t[1]] = t[3];
+        }
+        return { map: map, fog: fog };
+    }
+
+    function applyEntities(baseEntities, diff) {
+        if (!diff) {
+            return baseEntities;
+        }
+        const byKey = {};
+        const order = [];
+        const removed = {};
+        (diff.remove || []).forEach(function (key) {
+            removed[key] = true;
+        });
+        (baseEntities || []).forEach(function (e) {
+            const key = entityKey(e);
+            if (!removed[key]) {
+                byKey[key] = e;
+                order.push(key);
+            }
+        });
+        (diff.upsert || []).forEach(function (e) {
+            const key = entityKey(e);
+            if (!(key in byKey)) {
+                order.push(key);
+            }
+            byKey[key] = e;
+        });
+        return (diff.order || order).map(function (key) {
+            return byKey[key];
+        }).filter(Boolean);
+    }
+
+    /**
+     * Delta from the server → full frame, or null when its base is missing
+     * (caller should request a resync).
+     */
+    function applyDelta(delta) {
+        const base = delta ? frames[delta.base] : null;
+        if (!base) {
+            return null;
+        }
+        const frame = Object.assign({}, base);
+        const grid = applyTiles(base, delta.tiles);
+        frame.map = grid.map;
+        frame.fog = grid.fog;
+        frame.entities = applyEntities(base.entities, delta.entities);
+        if (base.player) {
+            frame.player = Object.assign({}, base.player, delta.player || {});
+        }
+        Object.assign(frame, delta.set || {});
+        (delta.unset || []).forEach(function (key) {
+            delete frame[key];
+        });
+        frame.version = delta.version;
+
+        // Server drops bases older than what we ack; mirror that.
+        Object.keys(frames).forEach(function (v) {
+            if (Number(v) < Number(delta.base)) {
+                delete frames[v];
+            }
+        });
+        frames[delta.version] = frame;
+        return frame;
+    }
+
+    return {
+        acceptFull,
+        applyDelta,
+        reset,
+    };
+})();
@@ -0,0 +1,68 @@
+"""Benchmark suite plumbing: sampling, baseline comparison, CLI exit code."""
+
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from benchmarks.suite import CASES, compare, main, measure
+
+
+class MeasureTests(unittest.TestCase):
+    def test_reset_runs_before_warmup_and_every_sample(self):
+        calls = []
+
+        def setup(seed):
+            return (lambda: calls.append('body')), 4, (lambda: calls.append('reset'))
+
+        result = measure(setup, seed=1, repeat=2)
+        self.assertEqual(calls, ['reset', 'body'] * 3)
+        self.assertEqual((result['ops'], result['samples']), (4, 2))
+        self.assertLessEqual(result['min_us'], result['median_us'])
+
+    def test_skipped_case(self):
+        self.assertIsNone(measure(lambda seed: None, seed=1, repeat=1))
+
+
+class CompareTests(unittest.TestCase):
+    def test_only_slowdowns_past_threshold_are_regressions(self):
+        baseline = {'results': {
+            'a': {'min_us': 10.0, 'median_us': 10.0},
+            'b': {'min_us': 10.0, 'median_us': 10.0},
+        }}
+        document = {'results': {
+            'a': {'min_us': 12.0, 'median_us': 14.0},
+            'b': {'min_us': 13.0, 'median_us': 13.0},
+            'new': {'min_us': 99.0, 'median_us': 99.0},
+        }}
+        self.assertEqual([r[0] for r in compare(document, baseline, 0.25)], ['b'])
+        self.assertEqual(
+            [r[0] for r in compare(document, baseline, 0.25, stat='median_us')], ['a', 'b'],
+        )
+
+
+class CliTests(unittest.TestCase):
+    def test_json_run_against_a_faster_baseline_exits_1(self):
+        self.assertIn('monster_round.500', CASES)
+        self.assertIn('game_state.fog.80x80', CASES)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'baseline.json'
+            path.write_text(json.dumps({'results': {
+                'elo.simulate_monster_fight': {'min_us': 1e-6, 'median_us': 1e-6},
+            }}))
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                code = main([
+                    '--filter', 'simulate_monster_fight', '--repeat', '1',
+                    '--json', '--baseline', str(path),
+                ])
+        document = json.loads(out.getvalue())
+        self.assertEqual(code, 1)
+        self.assertEqual(list(document['results']), ['elo.simulate_monster_fight'])
+        self.assertEqual(document['regressions'][0]['name'], 'elo.simulate_monster_fight')
+
+
+if __name__ == '__main__':
+    unittest.main()
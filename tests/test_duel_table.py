@@ -0,0 +1,117 @@
+"""Precomputed duel odds (DP over HP states) for the Elo tool."""
+
+import random
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest.mock import patch
+
+from combat_damage import calculate_attack_damage
+from duel_table import (
+    DuelTable,
+    build_duel_table,
+    damage_pmf,
+    duel_odds,
+    duel_stats,
+    load_duel_table,
+    save_duel_table,
+)
+from monster_elo import (
+    CombatantRecord,
+    LadderFighter,
+    calibrate_instance_elo,
+    run_pairing,
+    simulate_monster_fight,
+)
+
+
+def _fighter(elo, strength=8, dexterity=2, acc=2, armour=1, mhp=18, type_id='x'):
+    return LadderFighter(
+        type_id=type_id, name=type_id, level=1, elo=float(elo), str=strength,
+        dex=dexterity, acc=acc, armour=armour, mhp=mhp,
+    )
+
+
+class DamagePmfTests(unittest.TestCase):
+    def test_matches_sampled_damage(self):
+        pmf = dict(damage_pmf(9, 2, -2))
+        self.assertAlmostEqual(sum(pmf.values()), 1.0)
+        rng = random.Random(3)
+        n = 40000
+        counts = Counter(calculate_attack_damage(9, 2, -2, rng=rng) for _ in range(n))
+        for damage, prob in pmf.items():
+            self.assertAlmostEqual(counts[damage] / n, prob, delta=0.01)
+
+    def test_zero_spread_is_a_point_mass(self):
+        self.assertEqual(damage_pmf(2, 1, -2), [(1, 1.0)])
+
+
+class DuelOddsTests(unittest.TestCase):
+    def test_win_probability_matches_simulation(self):
+        a = _fighter(0, strength=9, dexterity=1, acc=3, mhp=20)
+        b = _fighter(0, strength=7, dexterity=4, acc=2, armour=2, mhp=26)
+        odds = duel_odds(duel_stats(a), duel_stats(b))
+        rng = random.Random(5)
+        for first_is_a in (True, False):
+            n = 6000
+            results = [simulate_monster_fight(a, b, first_is_a=first_is_a, rng=rng) for _ in range(n)]
+            win_a, win_b, draw, rounds = odds[first_is_a]
+            self.assertAlmostEqual(win_a + win_b + draw, 1.0)
+            self.assertAlmostEqual(sum(s for s, _ in results) / n, win_a, delta=0.025)
+            self.assertAlmostEqual(sum(r for _, r in results) / n / rounds, 1.0, delta=0.05)
+
+    def test_nobody_can_hit_is_a_draw(self):
+        a = _fighter(0, acc=0, dexterity=3)
+        odds = duel_odds(duel_stats(a), duel_stats(a))
+        self.assertEqual(odds[True][2], 1.0)
+
+
+class DuelTableTests(unittest.TestCase):
+    def test_mirrored_lookup_and_round_trip(self):
+        a, b = _fighter(0, strength=9), _fighter(0, strength=6, mhp=30)
+        table = build_duel_table([a, b])
+        sa, sb = duel_stats(a), duel_stats(b)
+        forward = table.lookup(sa, sb, True, 1000)
+        backward = table.lookup(sb, sa, False, 1000)
+        self.assertAlmostEqual(forward[0], backward[1])
+        self.assertAlmostEqual(forward[3], backward[3])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = save_duel_table(table, Path(tmp) / 't.json')
+            loaded = load_duel_table(path, force=True)
+        self.assertEqual(len(loaded), len(table))
+        self.assertAlmostEqual(loaded.lookup(sa, sb, True, 1000)[0], forward[0])
+
+    def test_unknown_or_long_matchups_fall_back(self):
+        a, b = _fighter(0), _fighter(0, mhp=40)
+        table = DuelTable()
+        self.assertIsNone(table.lookup(duel_stats(a), duel_stats(b), True, 1000))
+        table.odds(duel_stats(a), duel_stats(b))
+        self.assertIsNone(table.lookup(duel_stats(a), duel_stats(b), True, 2))
+        self.assertEqual(table.misses, 2)
+
+    def test_calibration_uses_table_instead_of_fighting(self):
+        ladder = [_fighter(elo, strength=4 + i) for i, elo in enumerate((800, 900, 1000, 1100))]
+        monster = _fighter(0, strength=7)
+        table = build_duel_table(ladder + [monster])
+        with patch('monster_elo.simulate_monster_fight') as sim:
+            rating = calibrate_instance_elo(
+                monster, fights=10, rng=random.Random(1), ladder=ladder, table=table,
+            )
+        sim.assert_not_called()
+        self.assertGreater(rating, 800)
+
+    def test_pairing_draws_from_table(self):
+        a, b = _fighter(0, strength=9), _fighter(0, strength=6)
+        rec_a = CombatantRecord(type_id='a', name='A', level=1, monster=a)
+        rec_b = CombatantRecord(type_id='b', name='B', level=1, monster=b)
+        table = build_duel_table([a, b])
+        with patch('monster_elo.simulate_monster_fight') as sim:
+            run_pairing(rec_a, rec_b, fights=8, rng=random.Random(2), table=table)
+        sim.assert_not_called()
+        self.assertEqual(rec_a.wins + rec_a.losses + rec_a.draws, 8)
+        self.assertGreater(rec_a.total_rounds, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
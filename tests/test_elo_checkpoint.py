@@ -0,0 +1,121 @@
+"""Checkpoint log, resume and progress readout for Elo tournaments."""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import monster_elo
+from elo_checkpoint import ProgressMeter, read_tournament_log
+from monster_elo import run_elo_tournament, tournament_settings_from_log
+from monster_types.base import MonsterTypeDef
+from monster_types.registry import MONSTER_TYPES, register_monster_type
+
+
+def _register_tiny_pool():
+    register_monster_type(MonsterTypeDef(
+        type_id='alpha', name='Alpha', max_level=2, base_mhp=15,
+        base_attributes={'str': 6, 'int': 1, 'wis': 1, 'chr': 1, 'dex': 2, 'agi': 2},
+        level_scaling=4, spawn_weight=1,
+    ))
+    register_monster_type(MonsterTypeDef(
+        type_id='beta', name='Beta', max_level=2, base_mhp=12,
+        base_attributes={'str': 9, 'int': 1, 'wis': 1, 'chr': 1, 'dex': 1, 'agi': 1},
+        level_scaling=4, spawn_weight=1,
+    ))
+
+
+def _ratings(records):
+    return {(r.type_id, r.level): (round(r.elo, 6), r.wins, r.losses, r.draws) for r in records}
+
+
+class CheckpointResumeTests(unittest.TestCase):
+    def setUp(self):
+        self.previous = dict(MONSTER_TYPES)
+        MONSTER_TYPES.clear()
+        _register_tiny_pool()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        MONSTER_TYPES.clear()
+        MONSTER_TYPES.update(self.previous)
+
+    def _run(self, log_name, **kwargs):
+        return run_elo_tournament(
+            seed=11, fights_per_pairing=3, tournament_passes=2, quiet=True,
+            output_path=self.dir / f'{log_name}.json',
+            checkpoint_path=self.dir / f'{log_name}.log.jsonl', **kwargs,
+        )[0]
+
+    def test_interrupted_run_resumes_to_same_ratings(self):
+        expected = _ratings(self._run('whole'))
+
+        real_pairing = monster_elo.run_pairing
+        calls = []
+
+        def crash_after_ten(*args, **kwargs):
+            calls.append(1)
+            if len(calls) > 10:
+                raise KeyboardInterrupt
+            return real_pairing(*args, **kwargs)
+
+        with patch('elo_checkpoint.CHECKPOINT_EVERY_PAIRINGS', 4), \
+                patch('monster_elo.run_pairing', side_effect=crash_after_ten):
+            with self.assertRaises(KeyboardInterrupt):
+                self._run('crash')
+        state = read_tournament_log(self.dir / 'crash.log.jsonl')
+        self.assertEqual((state['snapshot']['pass'], state['snapshot']['done']), (2, 4))
+        self.assertFalse(state['done'])
+
+        resumed = self._run('crash', resume=True)
+        self.assertEqual(_ratings(resumed), expected)
+        self.assertTrue(read_tournament_log(self.dir / 'crash.log.jsonl')['done'])
+
+    def test_torn_last_line_is_ignored(self):
+        self._run('torn')
+        log = self.dir / 'torn.log.jsonl'
+        with log.open('a', encoding='utf-8') as fh:
+            fh.write('{"type": "pairing", "pass"')
+        self.assertTrue(read_tournament_log(log)['done'])
+
+    def test_resume_with_other_settings_is_refused(self):
+        self._run('mismatch')
+        with self.assertRaises(ValueError):
+            run_elo_tournament(
+                seed=12, fights_per_pairing=3, tournament_passes=2, quiet=True,
+                output_path=self.dir / 'mismatch.json',
+                checkpoint_path=self.dir / 'mismatch.log.jsonl', resume=True,
+            )
+
+    def test_settings_round_trip_through_log(self):
+        self._run('settings', include_type_ids={'alpha', 'beta'})
+        settings = tournament_settings_from_log(self.dir / 'settings.log.jsonl')
+        self.assertEqual(settings['seed'], 11)
+        self.assertEqual(settings['include_type_ids'], {'alpha', 'beta'})
+        first = json.loads((self.dir / 'settings.log.jsonl').read_text().splitlines()[0])
+        self.assertEqual(first['type'], 'start')
+        self.assertEqual(len(first['pool']), 4)
+
+
+class ProgressMeterTests(unittest.TestCase):
+    def test_rate_and_eta(self):
+        now = [100.0]
+        lines = []
+        meter = ProgressMeter(total=100, out=lines.append, every=5.0, clock=lambda: now[0])
+        meter.skip(20)  # restored from a checkpoint
+        meter.start_pass(1, 20)
+        now[0] = 110.0
+        meter.update(1, 40, 50)
+        self.assertEqual(lines, ['Pass 1: 40 / 50 pairings  2.0/s  ETA 0:00:30'])
+        now[0] = 111.0
+        meter.update(1, 42, 50)  # throttled
+        self.assertEqual(len(lines), 1)
+        meter.update(1, 50, 50)  # pass end always prints
+        self.assertEqual(len(lines), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
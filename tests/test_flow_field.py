@@ -0,0 +1,116 @@
+"""Tests for monster pursuit distance fields."""
+import random
+import unittest
+
+from flow_field import FlowFieldCache, build_flow_field, get_flow_fields
+from monster_ai import pursuit_field, select_toward_tile
+from tile_grid import TileGrid
+
+
+def _rows(lines):
+    return [list(line) for line in lines]
+
+
+# From the left pocket, (1, 4) is only reachable around the bottom of the wall.
+_DETOUR = _rows([
+    '########',
+    '#..#...#',
+    '#..#...#',
+    '#..#...#',
+    '#......#',
+    '########',
+])
+
+
+class BuildFlowFieldTests(unittest.TestCase):
+    def test_distances_follow_walkable_path(self):
+        field = build_flow_field(_DETOUR, (1, 4))
+        self.assertEqual(field.distance(1, 4), 0)
+        self.assertEqual(field.distance(2, 5), 1)
+        self.assertEqual(field.distance(4, 3), 4)
+        self.assertEqual(field.distance(1, 2), 8)
+        self.assertIsNone(field.distance(1, 3))  # wall
+        self.assertIsNone(field.distance(-1, 0))
+
+    def test_no_corner_cutting(self):
+        rows = _rows([
+            '.#',
+            '#.',
+        ])
+        field = build_flow_field(rows, (0, 0))
+        self.assertIsNone(field.distance(1, 1))
+
+    def test_max_steps_bounds_the_search(self):
+        rows = _rows(['.' * 10])
+        field = build_flow_field(rows, (0, 0), max_steps=3)
+        self.assertEqual(field.distance(0, 3), 3)
+        self.assertIsNone(field.distance(0, 4))
+
+    def test_list_map_and_grid_agree(self):
+        grid = TileGrid.from_rows(_DETOUR)
+        self.assertEqual(
+            build_flow_field(grid, (3, 1)).dist, build_flow_field(_DETOUR, (3, 1)).dist
+        )
+
+
+class FlowFieldCacheTests(unittest.TestCase):
+    def test_shared_until_target_moves_or_terrain_changes(self):
+        grid = TileGrid.from_rows(_DETOUR)
+        cache = FlowFieldCache()
+        first = cache.field_for(1, grid, (1, 4))
+        self.assertIs(cache.field_for(1, grid, [1, 4]), first)
+        grid[2][2] = '&'  # monster marker: terrain unchanged
+        self.assertIs(cache.field_for(1, grid, (1, 4)), first)
+        self.assertIsNot(cache.field_for(1, grid, (2, 4)), first)
+        grid[4][3] = '#'
+        blocked = cache.field_for(1, grid, (1, 4))
+        self.assertIsNot(blocked, first)
+        self.assertIsNone(blocked.distance(1, 2))
+        self.assertEqual((cache.hits, cache.misses), (2, 3))
+
+    def test_lazily_attached_to_game_state(self):
+        class GS:
+            pass
+
+        gs = GS()
+        cache = get_flow_fields(gs)
+        self.assertIs(get_flow_fields(gs), cache)
+
+
+class PursuitTests(unittest.TestCase):
+    def test_field_steps_around_wall_where_greedy_stalls(self):
+        field = build_flow_field(_DETOUR, (1, 4))
+        rng = random.Random(0)
+        pos = [1, 2]
+        for _ in range(8):
+            pos = list(select_toward_tile(_DETOUR, pos, (1, 4), {}, 'm', rng, field))
+        self.assertEqual(pos, [1, 4])
+        # Greedy Chebyshev steps never leave the pocket.
+        pos = [1, 2]
+        for _ in range(20):
+            pos = list(select_toward_tile(_DETOUR, pos, (1, 4), {}, 'm', rng))
+            self.assertLess(pos[0], 4)
+
+    def test_out_of_field_falls_back_to_chebyshev(self):
+        rows = _rows(['.' * 12])
+        field = build_flow_field(rows, (0, 0), max_steps=2)
+        dest = select_toward_tile(rows, [0, 9], (0, 0), {}, 'm', random.Random(0), field)
+        self.assertEqual(dest, (0, 8))
+
+    def test_round_shares_one_field_per_target(self):
+        class GS:
+            pass
+
+        class Round:
+            flows = {}
+
+        gs, perception = GS(), Round()
+        grid = TileGrid.from_rows(_DETOUR)
+        a = pursuit_field(gs, 1, _DETOUR, [1, 4], perception)
+        self.assertIs(pursuit_field(gs, 1, _DETOUR, (1, 4), perception), a)
+        b = pursuit_field(gs, 1, grid, (3, 3))
+        self.assertIs(pursuit_field(gs, 1, grid, (3, 3)), b)
+
+
+if __name__ == '__main__':
+    unittest.main()
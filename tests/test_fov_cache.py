@@ -0,0 +1,96 @@
+"""Tests for the shared FOV cache and explored-set merge skipping."""
+import unittest
+from unittest.mock import patch
+
+from fov_cache import FovCache, merge_explored
+from player import Player
+from tile_grid import TileGrid
+from visibility import compute_fov
+
+
+def _room(h=9, w=9):
+    rows = [['.' for _ in range(w)] for _ in range(h)]
+    for x in range(w):
+        rows[0][x] = rows[h - 1][x] = '#'
+    for y in range(h):
+        rows[y][0] = rows[y][w - 1] = '#'
+    return rows
+
+
+class FovCacheTests(unittest.TestCase):
+    def test_hit_returns_same_result_until_opacity_changes(self):
+        grid = TileGrid.from_rows(_room())
+        cache = FovCache()
+        key1, fov1 = cache.visible_from(1, grid, (4, 4), 5)
+        key2, fov2 = cache.visible_from(1, grid, [4, 4], 5)
+        self.assertEqual(key1, key2)
+        self.assertIs(fov1, fov2)
+        self.assertEqual(fov1, compute_fov(grid, (4, 4), 5))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        grid[4][5] = '&'  # monsters do not block sight
+        self.assertIs(cache.visible_from(1, grid, (4, 4), 5)[1], fov1)
+
+        grid[4][5] = '#'
+        key3, fov3 = cache.visible_from(1, grid, (4, 4), 5)
+        self.assertNotEqual(key3, key1)
+        self.assertNotIn((4, 7), fov3)
+
+    def test_scope_and_radius_are_part_of_key(self):
+        grid = TileGrid.from_rows(_room())
+        cache = FovCache()
+        self.assertNotEqual(
+            cache.visible_from(1, grid, (4, 4), 5)[0],
+            cache.visible_from(2, grid, (4, 4), 5)[0],
+        )
+        self.assertNotEqual(
+            cache.visible_from(1, grid, (4, 4), 5)[0],
+            cache.visible_from(1, grid, (4, 4), 2)[0],
+        )
+
+    def test_lru_bound(self):
+        grid = TileGrid.from_rows(_room())
+        cache = FovCache(max_entries=2)
+        for x in (2, 3, 4):
+            cache.visible_from(1, grid, (4, x), 3)
+        self.assertEqual(len(cache.entries), 2)
+
+    def test_list_maps_are_not_cached(self):
+        cache = FovCache()
+        key, fov = cache.visible_from(1, _room(), (4, 4), 5)
+        self.assertIsNone(key)
+        self.assertIn((4, 4), fov)
+        self.assertEqual(len(cache.entries), 0)
+
+
+class MergeExploredTests(unittest.TestCase):
+    def test_repeat_fov_is_not_reunioned(self):
+        p = Player('hero', [1, 1])
+        explored = set()
+        merge_explored(p, explored, 'k', frozenset({(1, 1)}))
+        self.assertEqual(explored, {(1, 1)})
+        # Same key again: skipped, even if handed different tiles
+        merge_explored(p, explored, 'k', frozenset({(9, 9)}))
+        self.assertEqual(explored, {(1, 1)})
+
+    def test_new_explored_set_resets_merge_memory(self):
+        p = Player('hero', [1, 1])
+        merge_explored(p, set(), 'k', frozenset({(1, 1)}))
+        fresh = set()
+        merge_explored(p, fresh, 'k', frozenset({(1, 1)}))
+        self.assertEqual(fresh, {(1, 1)})
+
+    def test_merge_memory_is_bounded_to_recent_keys(self):
+        p = Player('hero', [1, 1])
+        explored = set()
+        with patch('fov_cache.MERGED_FOV_KEYS', 3):
+            for n in range(10):
+                merge_explored(p, explored, n, frozenset({(n, n)}))
+            merge_explored(p, explored, 8, frozenset())  # recent: kept, refreshed
+            merge_explored(p, explored, 10, frozenset())
+        self.assertEqual(list(p.merged_fov[1]), [9, 8, 10])
+        self.assertEqual(len(explored), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
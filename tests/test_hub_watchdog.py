@@ -0,0 +1,111 @@
+"""Hub-blocking watchdog: stall detection, attribution and aggregation."""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from hub_watchdog import HubWatchdog, describe_stack, watchdog_from_env
+from metrics import timed_handler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 10.0
+
+    def __call__(self):
+        return self.now
+
+
+@timed_handler('inventory_action')
+def _handler(player_id):
+    return _slow_path()
+
+
+def _slow_path():
+    return sys._getframe()
+
+
+class DescribeStackTests(unittest.TestCase):
+    def test_names_handler_player_and_innermost_site(self):
+        info = describe_stack(_handler('ann'))
+        self.assertEqual(info['handler'], 'inventory_action')
+        self.assertEqual(info['player_id'], 'ann')
+        self.assertTrue(info['site'].startswith('tests/test_hub_watchdog.py:'))
+        self.assertTrue(info['site'].endswith('in _slow_path'))
+        self.assertIn('_slow_path', info['stack'])
+
+    def test_background_task_falls_back_to_outermost_project_function(self):
+        def run_monster_turn():
+            return _slow_path()
+
+        info = describe_stack(run_monster_turn())
+        self.assertNotEqual(info['handler'], '?')
+        self.assertIsNone(info['player_id'])
+
+
+class WatchdogTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.lines = []
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = Path(self.tmp.name) / 'stalls.jsonl'
+        self.frame = _handler('bob')
+        self.dog = HubWatchdog(
+            100, log_path=str(self.log), clock=self.clock,
+            frames=lambda: {1: self.frame}, echo=self.lines.append,
+        )
+        self.dog.hub_thread = 1
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_stall_is_captured_then_filed_when_the_hub_yields(self):
+        self.dog.beat()
+        self.clock.now += 0.05
+        self.dog.check()
+        self.assertIsNone(self.dog.stall)
+
+        self.clock.now += 0.2
+        self.dog.check()
+        self.assertEqual(self.dog.stall['player_id'], 'bob')
+        self.clock.now += 0.15
+        self.dog.check()  # still stuck: one stall, not several
+        self.assertEqual(self.dog.stalls, 0)
+
+        self.dog.beat()
+        self.dog.check()
+        self.assertIsNone(self.dog.stall)
+        self.assertEqual(self.dog.stalls, 1)
+        event = self.dog.recent[-1]
+        self.assertEqual((event['handler'], event['ms']), ('inventory_action', 400.0))
+        self.assertIn('Hub blocked 400 ms in inventory_action (player bob)', self.lines[0])
+        self.assertEqual(json.loads(self.log.read_text())['site'], event['site'])
+        (key, agg), = self.dog.sites.items()
+        self.assertEqual(key, ('inventory_action', event['site']))
+        self.assertEqual((agg['count'], agg['player_ids']), (1, ['bob']))
+        self.assertIn('1 hub stalls over 100 ms', self.dog.report())
+
+    def test_late_beat_while_hub_polls_is_not_a_stall(self):
+        from eventlet.hubs import epolls
+
+        poll = type('Code', (), {'co_filename': epolls.__file__, 'co_name': 'do_poll'})()
+        self.frame = type('Frame', (), {'f_code': poll, 'f_back': None, 'f_lineno': 31})()
+        self.dog.beat()
+        self.clock.now += 0.3
+        self.dog.check()
+        self.assertEqual(self.dog.stats()['stalled_now'], 0)
+        self.dog.beat()
+        self.dog.check()
+        self.assertEqual((self.dog.stalls, self.dog.starved), (0, 1))
+        self.assertEqual(self.lines, [])
+
+    def test_env_threshold(self):
+        self.assertIsNone(watchdog_from_env({'HUB_WATCHDOG_MS': '0'}))
+        self.assertEqual(watchdog_from_env({'HUB_WATCHDOG_MS': '40'}).threshold, 0.04)
+        self.assertEqual(watchdog_from_env({}).threshold, 0.15)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+"""Tests for per-map broadcast subscriptions (level / interior interest)."""
+import unittest
+from unittest.mock import patch
+
+from dungeon_crawler import GameState
+from interest import InterestIndex, context_key
+from player import Player
+
+
+def _blank_map(h=7, w=7, fill='.'):
+    return [[fill for _ in range(w)] for _ in range(h)]
+
+
+def _player(pid, pos, level=0, interior_id=None):
+    p = Player(pid, list(pos))
+    p.dungeon_level = level
+    p.interior_id = interior_id
+    return p
+
+
+class InterestIndexTests(unittest.TestCase):
+    def test_update_moves_player_between_contexts(self):
+        index = InterestIndex()
+        hero = _player('hero', [1, 1], level=1)
+        index.update('hero', hero)
+        self.assertEqual(index.members, {(1, None): {'hero'}})
+        hero.dungeon_level = 2
+        index.update('hero', hero)
+        self.assertEqual(index.members, {(2, None): {'hero'}})
+
+    def test_subscribers_drop_stale_and_departed_entries(self):
+        index = InterestIndex()
+        hero = _player('hero', [1, 1], level=1)
+        ghost = _player('ghost', [2, 2], level=1)
+        players = {'hero': hero, 'ghost': ghost}
+        index.rebuild(players)
+        del players['ghost']
+        hero.interior_id = 'shop'
+        self.assertEqual(index.subscribers((1, None), players), [])
+        self.assertEqual(index.subscribers((1, 'shop'), players), ['hero'])
+        self.assertNotIn('ghost', index.contexts)
+
+    def test_context_key_treats_empty_interior_as_open_map(self):
+        self.assertEqual(context_key(_player('a', [0, 0], 3, '')), (3, None))
+
+    def test_occupant_follows_updates_and_discards(self):
+        index = InterestIndex()
+        hero = _player('hero', [1, 1], level=1)
+        players = {'hero': hero}
+        index.rebuild(players)
+        self.assertEqual(index.occupant((1, None), 1, 1, players), ('hero', hero))
+        hero.pos = [1, 2]
+        index.update('hero', hero)
+        self.assertEqual(index.occupant((1, None), 1, 1, players), (None, None))
+        self.assertEqual(index.occupant((1, None), 1, 2, players), ('hero', hero))
+        self.assertEqual(index.occupant((1, None), 1, 2, players, exclude='hero'), (None, None))
+        index.discard('hero')
+        self.assertEqual(index.tiles, {})
+
+    def test_occupant_refiles_body_that_moved_unannounced(self):
+        index = InterestIndex()
+        hero = _player('hero', [1, 1], level=1)
+        players = {'hero': hero}
+        index.rebuild(players)
+        hero.pos = [4, 4]
+        self.assertEqual(index.occupant((1, None), 1, 1, players), (None, None))
+        self.assertEqual(index.spots['hero'], ((1, None), (4, 4)))
+
+    def test_direct_assignment_refiles_player(self):
+        index = InterestIndex()
+        hero = _player('hero', [1, 1], level=1)
+        players = {'hero': hero}
+        index.rebuild(players)
+        hero.pos = [3, 5]
+        self.assertEqual(index.occupant((1, None), 3, 5, players), ('hero', hero))
+        hero.dungeon_level = 2
+        self.assertEqual(index.subscribers((2, None), players), ['hero'])
+        self.assertEqual(index.subscribers((1, None), players), [])
+        hero.interior_id = 'shop'
+        self.assertEqual(index.occupant((2, 'shop'), 3, 5, players), ('hero', hero))
+        index.discard('hero')
+        hero.pos = [0, 0]  # no longer indexed: the hook must not re-add it
+        self.assertEqual(index.contexts, {})
+
+    def test_pickled_player_drops_hook_and_loads_old_snapshots(self):
+        import pickle
+
+        index = InterestIndex()
+        hero = _player('hero', [1, 1], level=1)
+        index.update('hero', hero)
+        clone = pickle.loads(pickle.dumps(hero))
+        self.assertIsNone(clone.on_move)
+        self.assertEqual((clone.pos, clone.dungeon_level), ([1, 1], 1))
+        old = Player.__new__(Player)
+        old.__setstate__({'id': 'old', 'pos': [2, 3], 'dungeon_level': 4, 'interior_id': None})
+        self.assertEqual((old.pos, old.dungeon_level, old.interior_id), ([2, 3], 4, None))
+
+
+class GameStateObserverTests(unittest.TestCase):
+    def setUp(self):
+        with patch.object(GameState, 'generate_top_level', lambda self: None):
+            self.gs = GameState.__new__(GameState)
+            self.gs.map_generator = type('MG', (), {})()
+            self.gs.map_generator.find_tile = lambda game_map, symbol: next(
+                ([y, x] for y, row in enumerate(game_map) for x, cell in enumerate(row) if cell == symbol),
+                None,
+            )
+            self.gs.players = {}
+            self.gs.active_players = {}
+            self.gs.player_messages = {}
+            self.gs.active_combats = {}
+            self.gs.levels = {}
+            self.gs.cameras = {}
+            self.gs.viewports = {}
+            self.gs.manual_pan = {}
+        for level in (0, 1, 2):
+            m = _blank_map()
+            m[3][3] = '↑' if level else '.'
+            m[5][5] = '↓'
+            self.gs.levels[level] = (m, {})
+
+    def _add(self, pid, pos, level=0, active=True):
+        p = _player(pid, pos, level)
+        self.gs.players[pid] = p
+        if active:
+            self.gs.active_players[pid] = p
+        return p
+
+    def test_observers_only_include_active_players_on_that_map(self):
+        self._add('a', [1, 1], level=1)
+        self._add('b', [2, 2], level=1, active=False)
+        self._add('c', [1, 1], level=2)
+        self._add('d', [1, 1], level=0)
+        self.assertEqual(self.gs.observers([(1, None)]), ['a'])
+        self.assertEqual(
+            sorted(self.gs.observers([(1, None), (2, None)])), ['a', 'c']
+        )
+
+    def test_stair_move_resubscribes_player(self):
+        hero = self._add('hero', [1, 1], level=1)
+        self.assertEqual(self.gs.observers([(1, None)]), ['hero'])
+        self.assertTrue(self.gs.place_player_on_stair(hero, 2, '↑'))
+        self.assertEqual(self.gs.observers([(1, None)]), [])
+        self.assertEqual(self.gs.observers([(2, None)]), ['hero'])
+
+    def test_broadcast_level_skips_other_levels(self):
+        self._add('near', [1, 1], level=1)
+        self._add('far', [1, 1], level=2)
+        sent = []
+
+        class Socket:
+            def emit(self, event, data, room=None):
+                sent.append(room)
+
+        self.gs.broadcast_level(Socket(), 1)
+        self.assertEqual(sent, ['near'])
+
+    def test_players_on_level_answers_tile_lookups(self):
+        hero = self._add('hero', [1, 1], level=1)
+        self._add('other', [1, 1], level=2)
+        self._add('shopper', [2, 2], level=1).interior_id = 'shop'
+        on_level = self.gs.players_on_level(1)
+        self.assertEqual(set(on_level), {'hero'})
+        self.assertEqual(on_level.at(1, 1), ('hero', hero))
+        self.assertEqual(on_level.at(2, 2), (None, None))
+        self.assertEqual(on_level.at(1, 1, exclude='hero'), (None, None))
+
+    def test_move_refiles_tile_and_death_forgets_it(self):
+        hero = self._add('hero', [1, 1], level=1)
+        self.gs.player_messages['hero'] = []
+        self.assertEqual(self.gs.player_at((1, None), 1, 1), ('hero', hero))
+        self.assertTrue(self.gs.move_player('hero', 'e'))
+        self.assertEqual(self.gs.interest.spots['hero'], ((1, None), (1, 2)))
+        self.assertEqual(self.gs.player_at((1, None), 1, 2), ('hero', hero))
+        del self.gs.players['hero']
+        self.gs.forget_player('hero')
+        self.assertNotIn('hero', self.gs.interest.spots)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+"""Tests for background dungeon level pre-generation."""
+import unittest
+
+from dungeon_crawler import GameState
+from level_pipeline import LevelPipeline, run_inline
+from tile_grid import TileGrid
+
+
+def _find_tile(game_map, symbol):
+    return next(
+        ([y, x] for y, row in enumerate(game_map) for x, cell in enumerate(row) if cell == symbol),
+        None,
+    )
+
+
+class FakeGenerator:
+    calls = []
+
+    def generate_level(self, stairs_up_pos=None):
+        FakeGenerator.calls.append(stairs_up_pos)
+        m = [['.' for _ in range(20)] for _ in range(20)]
+        uy, ux = stairs_up_pos or (1, 1)
+        m[uy][ux] = '↑'
+        m[18][len(FakeGenerator.calls) % 19] = '↓'
+        return m, {}
+
+
+class Deferred:
+    """Runner that holds jobs until run() (stands in for the thread pool)."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def __call__(self, job, on_done):
+        runner = self
+
+        class Handle:
+            def wait(self):
+                return runner.run_one(entry)
+
+        entry = [job, on_done, None, False]
+        self.jobs.append(entry)
+        return Handle()
+
+    def run_one(self, entry):
+        if not entry[3]:
+            entry[2] = entry[0]()
+            entry[3] = True
+            entry[1](entry[2])
+        return entry[2]
+
+    def run(self):
+        while any(not e[3] for e in self.jobs):
+            for entry in list(self.jobs):
+                self.run_one(entry)
+
+
+def _town():
+    m = [['.' for _ in range(6)] for _ in range(6)]
+    m[2][3] = '↓'
+    return {0: (TileGrid.from_rows(m), {})}
+
+
+class LevelPipelineTests(unittest.TestCase):
+    def setUp(self):
+        FakeGenerator.calls = []
+
+    def test_reaching_a_level_builds_the_next_ones_in_order(self):
+        levels = _town()
+        pipe = LevelPipeline(levels, _find_tile, FakeGenerator, depth=2, runner=run_inline)
+        pipe.reached(0)
+        self.assertEqual(sorted(pipe.ready), [1, 2])
+        # Level 1's up stairs sit under the town's down stairs; level 2 under level 1's.
+        self.assertEqual(FakeGenerator.calls[0], [2, 3])
+        self.assertEqual(FakeGenerator.calls[1], _find_tile(pipe.ready[1][0], '↓'))
+        self.assertIsInstance(pipe.ready[1][0], TileGrid)
+        self.assertEqual(pipe.stats()['generated'], 2)
+
+    def test_take_returns_ready_level_without_generating(self):
+        levels = _town()
+        pipe = LevelPipeline(levels, _find_tile, FakeGenerator, depth=1, runner=run_inline)
+        pipe.reached(0)
+        ready = pipe.ready[1]
+        self.assertIs(pipe.take(1, [2, 3]), ready)
+        self.assertEqual(len(FakeGenerator.calls), 1)
+        self.assertEqual((pipe.hits, pipe.misses), (1, 0))
+
+    def test_one_job_at_a_time_and_take_waits_for_pending(self):
+        levels = _town()
+        runner = Deferred()
+        pipe = LevelPipeline(levels, _find_tile, FakeGenerator, depth=3, runner=runner)
+        pipe.reached(0)
+        self.assertEqual(sorted(pipe.pending), [1])
+        level = pipe.take(1, [2, 3])
+        self.assertEqual(pipe.hits, 1)
+        levels[1] = level
+        runner.run()
+        self.assertEqual(sorted(pipe.ready), [2, 3])
+
+    def test_take_generates_inline_on_miss(self):
+        levels = _town()
+        pipe = LevelPipeline(levels, _find_tile, FakeGenerator, depth=0, runner=run_inline)
+        pipe.reached(0)
+        self.assertEqual(pipe.ready, {})
+        game_map, _monsters = pipe.take(5, [1, 2])
+        self.assertEqual(game_map[1][2], '↑')
+        self.assertEqual(pipe.misses, 1)
+
+
+class GameStateAdoptionTests(unittest.TestCase):
+    def test_stair_descent_adopts_prefetched_level(self):
+        gs = GameState()
+        pipe = gs.start_level_pipeline(make_generator=FakeGenerator, runner=run_inline)
+        gs.add_player('hero')
+        ready = pipe.ready[1]
+        hero = gs.players['hero']
+        stairs = gs.map_generator.find_tile(gs.levels[0][0], '↓')
+        gs.ensure_level(1, stairs_up_pos=stairs)
+        self.assertIs(gs.levels[1], ready)
+        self.assertTrue(gs.place_player_on_stair(hero, 1, '↑'))
+        self.assertIn(2, pipe.ready)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Load-test bot bookkeeping (no server needed)."""
+
+import json
+import random
+import tempfile
+import unittest
+
+from dungeon_crawler import GameState
+from loadtest import Bot, percentile, seed_world
+from persistence import WorldStore
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, text):
+        self.sent.append(text)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _frame(pos, version, rows=None):
+    rows = rows or ['.....'] * 5
+    return '42' + json.dumps(['game_state', {
+        'version': version,
+        'camera': {'y': 0, 'x': 0},
+        'map': rows,
+        'player': {'pos': pos, 'dungeon_level': 1, 'interior_id': None},
+    }])
+
+
+def _delta(pos, version, base):
+    return '42' + json.dumps(['game_state_delta', {
+        'version': version, 'base': base, 'tiles': [], 'player': {'pos': pos},
+    }])
+
+
+class PercentileTests(unittest.TestCase):
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+        self.assertIsNone(percentile([], 50))
+
+
+class BotTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.bot = Bot('bot000', 'ws://unused', random.Random(1), stop_at=1e9, clock=self.clock)
+        self.bot.ws = FakeSocket()
+
+    def _moves(self):
+        return [m for m in self.bot.ws.sent if m.startswith('42["move"')]
+
+    def test_frames_are_acked_and_answer_the_matching_move(self):
+        self.bot.handle(_frame([2, 2], 1))
+        self.assertIn('42["state_ack",{"version":1}]', self.bot.ws.sent)
+        self.bot.next_move_at = self.clock.now
+        self.bot.act(self.clock.now)
+        self.assertEqual(len(self._moves()), 1)
+        direction = json.loads(self._moves()[0][2:])[1]
+        target = self.bot.pending[0][1]
+
+        self.clock.now += 0.04
+        self.bot.handle(_delta(target, 2, base=1))
+        self.assertEqual(self.bot.pos, target)
+        self.assertAlmostEqual(self.bot.stats.latencies[0], 0.04)
+        self.assertEqual(self.bot.pending, [])
+        self.assertIn(direction, ('n', 'ne', 'e', 'se', 's', 'sw', 'west', 'nw'))
+
+    def test_blocked_move_is_counted_unanswered(self):
+        self.bot.handle(_frame([2, 2], 1))
+        self.bot.pending = [(self.clock.now, [1, 2], (1, None)), (self.clock.now, [2, 3], (1, None))]
+        self.clock.now += 0.1
+        self.bot.handle(_delta([2, 3], 2, base=1))
+        self.assertEqual(self.bot.stats.unanswered, 1)
+        self.assertEqual(len(self.bot.stats.latencies), 1)
+
+    def test_diagonals_do_not_cut_corners(self):
+        self.bot.handle(_frame([1, 1], 1, rows=['...', '.#.', '...']))
+        self.bot.pos = [0, 0]
+        self.assertFalse(self.bot.can_step(1, 1))
+        self.assertTrue(self.bot.can_step(0, 1))
+
+
+class SeedWorldTests(unittest.TestCase):
+    def test_spread_places_bots_over_levels(self):
+        names = [f'bot{n:03d}' for n in range(4)]
+        with tempfile.TemporaryDirectory() as tmp:
+            seed_world(tmp, 'spread', names, seed=3)
+            restored = GameState()
+            WorldStore(tmp).recover(restored)
+        self.assertEqual(
+            sorted(restored.players[name].dungeon_level for name in names), [1, 2, 3, 4],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
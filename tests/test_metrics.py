@@ -0,0 +1,82 @@
+"""Prometheus text metrics: histograms, scrape-time gauges, /metrics route."""
+
+import unittest
+
+import dungeon_crawler
+from combat import CombatSystem
+from dungeon_crawler import GameState, register_world_metrics
+from metrics import Histogram, Registry, timed_handler
+
+
+class HistogramTests(unittest.TestCase):
+    def test_buckets_are_cumulative_and_inclusive(self):
+        hist = Histogram('t_seconds', 'Test.', buckets=(0.1, 1.0), labelnames=('handler',))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            hist.observe(value, 'move')
+        snap = hist.snapshot('move')
+        self.assertEqual(snap['buckets'], [(0.1, 2), (1.0, 3), (float('inf'), 4)])
+        self.assertEqual(snap['count'], 4)
+        text = '\n'.join(hist.render())
+        self.assertIn('t_seconds_bucket{handler="move",le="0.1"} 2', text)
+        self.assertIn('t_seconds_bucket{handler="move",le="+Inf"} 4', text)
+        self.assertIn('t_seconds_count{handler="move"} 4', text)
+
+    def test_timed_handler_observes_even_on_error(self):
+        from metrics import HANDLER_SECONDS
+
+        before = HANDLER_SECONDS.snapshot('test_boom')['count']
+
+        @timed_handler('test_boom')
+        def boom():
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            boom()
+        self.assertEqual(HANDLER_SECONDS.snapshot('test_boom')['count'], before + 1)
+
+
+class GaugeTests(unittest.TestCase):
+    def test_failing_gauge_is_skipped_and_stats_fields_exported(self):
+        registry = Registry()
+        registry.gauge('bad', 'Broken.', lambda: 1 / 0)
+        registry.stats_gauges('pipe', 'Pipeline', lambda: {
+            'hits': 3, 'ready': [1, 2], 'avg_gen_seconds': None, 'paused': True,
+        })
+        text = registry.render()
+        self.assertNotIn('bad', text)
+        self.assertIn('pipe_hits 3', text)
+        self.assertNotIn('pipe_ready', text)
+        self.assertNotIn('pipe_paused', text)
+        # Registered now, rendered once the pipeline has timed a level.
+        self.assertIn('pipe_avg_gen_seconds', registry.metrics)
+        self.assertNotIn('pipe_avg_gen_seconds', text)
+
+    def test_world_gauges(self):
+        game = GameState()
+        game.ensure_level(1)
+        game.add_player('ann')
+        registry = Registry()
+        register_world_metrics(game, CombatSystem(game, socketio=None), registry)
+        text = registry.render()
+        self.assertIn('dungeon_players 1', text)
+        self.assertIn('dungeon_levels_resident 2', text)
+        self.assertIn(f'dungeon_monsters{{level="1"}} {len(game.levels[1][1])}', text)
+        self.assertIn('dungeon_combat_timers 0', text)
+        self.assertIn('dungeon_fov_cache{stat="misses"}', text)
+
+
+class RouteTests(unittest.TestCase):
+    def test_metrics_route_serves_prometheus_text(self):
+        game = GameState()
+        game.add_player('ann')
+        game.get_game_state('ann')
+        response = dungeon_crawler.app.test_client().get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain; version=0.0.4'))
+        body = response.get_data(as_text=True)
+        self.assertIn('# TYPE dungeon_get_game_state_seconds histogram', body)
+        self.assertIn('dungeon_get_game_state_seconds_count{fog="no"}', body)
+
+
+if __name__ == '__main__':
+    unittest.main()
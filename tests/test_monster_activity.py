@@ -0,0 +1,140 @@
+"""Tests for dormant/awake monster tracking on quiet levels."""
+import unittest
+from unittest.mock import patch
+
+from monster import Monster
+from monster_activity import LevelActivity, get_level_activity, is_idle
+
+
+def _monster(mid, pos, sight=5):
+    return Monster.from_type('troll', list(pos), monster_id=mid, sight_range=sight)
+
+
+def _player(pos):
+    return type('P', (), {'pos': list(pos), 'dungeon_level': 1})()
+
+
+def _level(*monsters):
+    return {(m.pos[0], m.pos[1]): m for m in monsters}
+
+
+class LevelActivityTests(unittest.TestCase):
+    def test_new_monsters_start_awake_and_idle_ones_sleep(self):
+        near, far = _monster('near', (2, 2)), _monster('far', (40, 40))
+        monsters = _level(near, far)
+        players = {'hero': _player((2, 4))}
+        activity = LevelActivity()
+        activity.sync(monsters)
+        self.assertEqual(set(activity.awake), {'near', 'far'})
+        for mon in (near, far):
+            activity.settle(mon, players)
+        self.assertEqual(set(activity.awake), {'near'})
+        self.assertEqual(set(activity.dormant), {'far'})
+
+    def test_player_in_sight_range_wakes_dormant_monster(self):
+        mon = _monster('m', (40, 40), sight=6)
+        monsters = _level(mon)
+        activity = LevelActivity()
+        activity.sync(monsters)
+        activity.settle(mon, {})
+        self.assertEqual(activity.wake_near({'hero': _player((40, 47))}, monsters), [])
+        self.assertEqual(activity.wake_near({'hero': _player((34, 46))}, monsters), [mon])
+        self.assertIn('m', activity.awake)
+        self.assertEqual(activity.buckets, {})
+
+    def test_memory_keeps_monster_awake(self):
+        mon = _monster('m', (1, 1))
+        mon.memory_player_id = 'hero'
+        self.assertFalse(is_idle(mon, {}))
+
+    def test_wander_budget_round_robins_dormant_monsters(self):
+        mons = [_monster(f'm{i}', (i * 3, 50)) for i in range(5)]
+        monsters = _level(*mons)
+        activity = LevelActivity()
+        activity.sync(monsters)
+        for mon in mons:
+            activity.settle(mon, {})
+        turns = []
+        for _ in range(3):
+            awake, wanderers = activity.schedule(monsters, budget=2)
+            self.assertEqual(awake, [])
+            turns.extend(m.id for m in wanderers)
+        self.assertEqual(turns, ['m0', 'm1', 'm2', 'm3', 'm4', 'm0'])
+
+    def test_departed_monsters_are_dropped_and_new_ones_tracked(self):
+        a, b = _monster('a', (1, 1)), _monster('b', (30, 30))
+        monsters = _level(a, b)
+        activity = LevelActivity()
+        activity.sync(monsters)
+        activity.settle(b, {})
+        del monsters[(30, 30)]
+        c = _monster('c', (5, 5))
+        monsters[(5, 5)] = c
+        monsters[(6, 6)] = _monster('d', (6, 6))
+        activity.sync(monsters)
+        self.assertEqual(set(activity.awake), {'a', 'c', 'd'})
+        self.assertEqual(activity.dormant, {})
+
+    def test_versioned_sync_rescans_only_when_roster_changes(self):
+        a, b = _monster('a', (1, 1)), _monster('b', (30, 30))
+        monsters = _level(a, b)
+        activity = LevelActivity()
+        activity.sync(monsters, version=0)
+        # Same count, different monster: a count check would miss it.
+        del monsters[(30, 30)]
+        monsters[(5, 5)] = _monster('c', (5, 5))
+        with patch('monster_activity._resident') as resident:
+            activity.sync(monsters, version=0)
+            resident.assert_not_called()
+        activity.sync(monsters, version=1)
+        self.assertEqual(set(activity.awake), {'a', 'c'})
+        replaced = _level(_monster('z', (9, 9)))
+        activity.sync(replaced, version=1)  # new level dict, same version
+        self.assertEqual(set(activity.awake), {'z'})
+
+    def test_removing_a_monster_bumps_the_roster_version(self):
+        from dungeon_crawler import GameState
+
+        gs = GameState()
+        _grid, monsters = gs.ensure_level(1)
+        before = gs.roster_version(1)
+        self.assertTrue(gs.remove_monster_at(next(iter(monsters))))
+        self.assertEqual(gs.roster_version(1), before + 1)
+        self.assertEqual(gs.roster_version(2), 0)
+
+
+class MonsterRoundTests(unittest.TestCase):
+    def _gs(self, monsters, players):
+        class GS:
+            def ensure_level(self, n):
+                return game_map, monsters
+
+            def players_on_level(self, n):
+                return players
+
+            def broadcast_active_players(self, socketio):
+                pass
+
+            def move_monster(self, level_number, monster, dest):
+                return False
+
+        game_map = [['.' for _ in range(60)] for _ in range(60)]
+        return GS()
+
+    def test_round_skips_dormant_monsters_beyond_budget(self):
+        from monster_ai import process_monster_opportunity, run_monster_round_for_level
+
+        mons = [_monster(f'm{i}', (50, i * 2)) for i in range(6)]
+        monsters = _level(*mons)
+        gs = self._gs(monsters, {'hero': _player((1, 1))})
+        with patch('monster_ai.process_monster_opportunity', wraps=process_monster_opportunity) as opp:
+            run_monster_round_for_level(gs, 1, None, None, wander_budget=1)
+            self.assertEqual(opp.call_count, 6)  # first sight of the level
+            opp.reset_mock()
+            run_monster_round_for_level(gs, 1, None, None, wander_budget=1)
+            self.assertEqual(opp.call_count, 1)
+        self.assertEqual(len(get_level_activity(gs, 1).dormant), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,8 @@
 
 import json
 import random
+import subprocess
+import sys
 import tempfile
 import unittest
 from pathlib import Path
@@ -15,6 +17,8 @@ from monster_elo import (
     reset_combat_state,
     run_elo_tournament,
     run_pairing,
+    simulate_pairing_chunk,
+    start_fight_pool,
     save_elo_results,
     shift_ratings_floor_to_zero,
     simulate_monster_fight,
@@ -281,6 +285,81 @@ class TournamentTests(unittest.TestCase):
             MONSTER_TYPES.clear()
             MONSTER_TYPES.update(previous)
 
+    def test_parallel_ratings_depend_on_seed_not_worker_count(self):
+        previous = dict(MONSTER_TYPES)
+        try:
+            MONSTER_TYPES.clear()
+            self._register_tiny_pool()
+            ratings = []
+            # No real pool here: keep the suite in one process (the pool
+            # itself is covered by test_real_worker_pool...).
+            with tempfile.TemporaryDirectory() as tmp, \
+                    patch('monster_elo.PARALLEL_CHUNK_PAIRINGS', 2), \
+                    patch('monster_elo.start_fight_pool', return_value=None):
+                for workers in (2, 3):
+                    records, _, _ = run_elo_tournament(
+                        seed=9, fights_per_pairing=4, tournament_passes=2,
+                        output_path=Path(tmp) / f'w{workers}.json', quiet=True,
+                        workers=workers,
+                    )
+                    ratings.append({(r.type_id, r.level): round(r.elo, 6) for r in records})
+                    for rec in records:
+                        self.assertEqual(rec.wins + rec.losses + rec.draws, 3 * 4 * 2)
+            self.assertEqual(ratings[0], ratings[1])
+        finally:
+            MONSTER_TYPES.clear()
+            MONSTER_TYPES.update(previous)
+
+    def test_real_worker_pool_matches_inline_chunks(self):
+        # Runs the process pool in a fresh interpreter, never eventlet-patched.
+        script = (
+            'import json, sys, tempfile\n'
+            'import monster_elo\n'
+            'monster_elo.PARALLEL_CHUNK_PAIRINGS = 3\n'
+            'with tempfile.TemporaryDirectory() as tmp:\n'
+            '    recs, _, _ = monster_elo.run_elo_tournament(\n'
+            '        seed=3, fights_per_pairing=2, tournament_passes=1,\n'
+            '        include_type_ids={"troll", "goblin"}, output_path=tmp + "/r.json",\n'
+            '        quiet=True, workers=2)\n'
+            'print(json.dumps({f"{r.type_id}:{r.level}": round(r.elo, 6) for r in recs}))\n'
+        )
+        root = Path(__file__).resolve().parent.parent
+        proc = subprocess.run(
+            [sys.executable, '-c', script], cwd=root, capture_output=True,
+            text=True, timeout=120,
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        pooled = json.loads(proc.stdout.strip().splitlines()[-1])
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch('monster_elo.PARALLEL_CHUNK_PAIRINGS', 3), \
+                patch('monster_elo.start_fight_pool', return_value=None):
+            records, _, _ = run_elo_tournament(
+                seed=3, fights_per_pairing=2, tournament_passes=1,
+                include_type_ids={'troll', 'goblin'}, output_path=Path(tmp) / 'r.json',
+                quiet=True, workers=2,
+            )
+        inline = {f'{r.type_id}:{r.level}': round(r.elo, 6) for r in records}
+        self.assertEqual(pooled, inline)
+
+    def test_fight_pool_refused_under_patched_hub(self):
+        with patch('monster_elo._hub_patched', return_value=True):
+            self.assertIsNone(start_fight_pool([], 2))
+
+    def test_pairing_chunk_is_seeded(self):
+        previous = dict(MONSTER_TYPES)
+        try:
+            MONSTER_TYPES.clear()
+            self._register_tiny_pool()
+            records = build_test_monster_pool(rng=random.Random(1))
+            with patch('monster_elo._worker_monsters', [r.monster for r in records]):
+                first = simulate_pairing_chunk([(0, 1), (2, 3)], 3, 77, 1000)
+                again = simulate_pairing_chunk([(0, 1), (2, 3)], 3, 77, 1000)
+            self.assertEqual(len(first), 6)
+            self.assertEqual(first, again)
+        finally:
+            MONSTER_TYPES.clear()
+            MONSTER_TYPES.update(previous)
+
     def test_not_wired_into_dungeon_crawler(self):
         crawler = Path(__file__).resolve().parent.parent / 'dungeon_crawler.py'
         text = crawler.read_text(encoding='utf-8')
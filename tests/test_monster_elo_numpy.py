@@ -0,0 +1,105 @@
+"""NumPy batch engine for the monster Elo tournament."""
+
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from combat_damage import calculate_hit_chance
+from monster import Monster
+from monster_elo import run_elo_tournament, simulate_monster_fight
+from monster_elo_numpy import NUMPY_AVAILABLE
+from monster_types.base import MonsterTypeDef
+from monster_types.registry import MONSTER_TYPES, register_monster_type
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+    from monster_elo_numpy import combatant_arrays, hit_chances, simulate_duels
+
+
+def _register_pool():
+    register_monster_type(MonsterTypeDef(
+        type_id='brute', name='Brute', max_level=2, base_mhp=30,
+        base_attributes={'str': 9, 'int': 1, 'wis': 1, 'chr': 1, 'dex': 1, 'agi': 1},
+        level_scaling=4, spawn_weight=1,
+    ))
+    register_monster_type(MonsterTypeDef(
+        type_id='dodger', name='Dodger', max_level=2, base_mhp=22, armour=2,
+        base_attributes={'str': 7, 'int': 1, 'wis': 1, 'chr': 1, 'dex': 4, 'agi': 3},
+        level_scaling=4, spawn_weight=1,
+    ))
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, 'numpy not installed')
+class NumpyEngineTests(unittest.TestCase):
+    def setUp(self):
+        self.previous = dict(MONSTER_TYPES)
+        MONSTER_TYPES.clear()
+        _register_pool()
+
+    def tearDown(self):
+        MONSTER_TYPES.clear()
+        MONSTER_TYPES.update(self.previous)
+
+    def _pair(self):
+        a = Monster.from_type('brute', [0, 0], monster_id='a', level=1, rng=random.Random(1))
+        b = Monster.from_type('dodger', [0, 0], monster_id='b', level=1, rng=random.Random(2))
+        return a, b
+
+    def test_hit_chances_match_scalar_formula(self):
+        acc = np.array([0, 0, 1, 3, 5, 2])
+        dex = np.array([0, 4, 0, 3, 1, 9])
+        got = hit_chances(acc, dex)
+        for k in range(acc.size):
+            self.assertAlmostEqual(got[k], calculate_hit_chance(int(acc[k]), int(dex[k])))
+
+    def test_win_rate_matches_scalar_engine(self):
+        a, b = self._pair()
+        fights = 4000
+        rng = random.Random(11)
+        scalar = [
+            simulate_monster_fight(a, b, first_is_a=(k % 2 == 0), rng=rng)
+            for k in range(fights)
+        ]
+        stats = combatant_arrays([a, b])
+        score, rounds = simulate_duels(
+            stats, np.zeros(fights, dtype=int), np.ones(fights, dtype=int),
+            np.arange(fights) % 2 == 0, np.random.default_rng(11), 1000,
+        )
+        scalar_win = sum(s for s, _ in scalar) / fights
+        scalar_rounds = sum(r for _, r in scalar) / fights
+        self.assertAlmostEqual(float(score.mean()), scalar_win, delta=0.04)
+        self.assertAlmostEqual(float(rounds.mean()) / scalar_rounds, 1.0, delta=0.08)
+
+    def test_timeout_is_draw(self):
+        a, b = self._pair()
+        stats = combatant_arrays([a, b])
+        score, rounds = simulate_duels(
+            stats, [0, 0], [1, 1], [True, False], np.random.default_rng(0), 1,
+        )
+        self.assertEqual(score.tolist(), [0.5, 0.5])
+        self.assertEqual(rounds.tolist(), [1, 1])
+
+    def test_seeded_numpy_tournament_is_deterministic(self):
+        results = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ('a.json', 'b.json'):
+                records, _, _ = run_elo_tournament(
+                    seed=5, fights_per_pairing=6, tournament_passes=2,
+                    output_path=Path(tmp) / name, quiet=True, engine='numpy',
+                )
+                results.append({(r.type_id, r.level): round(r.elo, 6) for r in records})
+        self.assertEqual(results[0], results[1])
+        fights_each = 3 * 6 * 2  # three opponents, six fights, two passes
+        for rec in records:
+            self.assertEqual(rec.wins + rec.losses + rec.draws, fights_each)
+
+
+class EngineSelectionTests(unittest.TestCase):
+    def test_unknown_engine_rejected(self):
+        with self.assertRaises(ValueError):
+            run_elo_tournament(seed=1, quiet=True, engine='gpu')
+
+
+if __name__ == '__main__':
+    unittest.main()
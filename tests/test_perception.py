@@ -0,0 +1,83 @@
+"""Tests for the per-round shared monster perception snapshot."""
+import unittest
+
+from monster import Monster
+from monster_ai import PerceptionSnapshot, visible_players
+from player import Player
+from tile_grid import TileGrid
+from visibility import compute_fov
+
+
+def _grid(h=30, w=40, walls=()):
+    rows = [['.' for _ in range(w)] for _ in range(h)]
+    for y, x in walls:
+        rows[y][x] = '#'
+    return TileGrid.from_rows(rows)
+
+
+def _player(pid, pos, grid):
+    p = Player(pid, list(pos))
+    p.dungeon_level = 1
+    p.visible = compute_fov(grid, p.pos, p.effective_sight_range())
+    return p
+
+
+def _monster(pos, sight=20):
+    return Monster.from_type('troll', list(pos), monster_id=f'm{pos}', sight_range=sight)
+
+
+class PerceptionSnapshotTests(unittest.TestCase):
+    def test_player_fov_answers_nearby_monsters_without_casting(self):
+        grid = _grid()
+        players = {'a': _player('a', (10, 10), grid), 'b': _player('b', (10, 14), grid)}
+        snap = PerceptionSnapshot(grid, players)
+        for pos in ((12, 12), (8, 9), (10, 16)):
+            mon = _monster(pos)
+            self.assertEqual(
+                snap.visible_players(mon), visible_players(grid, mon, players)
+            )
+        self.assertEqual(snap.monster_fovs, 0)
+
+    def test_wall_blocks_shared_answer(self):
+        walls = [(y, 12) for y in range(30)]
+        grid = _grid(walls=walls)
+        players = {'a': _player('a', (10, 10), grid)}
+        snap = PerceptionSnapshot(grid, players)
+        self.assertEqual(snap.visible_players(_monster((10, 14))), [])
+        self.assertEqual(snap.monster_fovs, 0)
+
+    def test_far_player_falls_back_to_monster_fov(self):
+        grid = _grid()
+        players = {'a': _player('a', (5, 5), grid)}
+        snap = PerceptionSnapshot(grid, players)
+        mon = _monster((5, 20), sight=20)  # beyond the player's 8-tile sight
+        self.assertEqual([pid for pid, _p in snap.visible_players(mon)], ['a'])
+        self.assertEqual(snap.monster_fovs, 1)
+
+    def test_stale_player_fov_is_not_trusted(self):
+        grid = _grid()
+        hero = _player('a', (10, 10), grid)
+        hero.pos = [10, 11]  # moved without recomputing visibility
+        snap = PerceptionSnapshot(grid, {'a': hero})
+        snap.visible_players(_monster((10, 13)))
+        self.assertEqual(snap.monster_fovs, 1)
+
+    def test_out_of_range_skips_everything(self):
+        grid = _grid()
+        snap = PerceptionSnapshot(grid, {'a': _player('a', (1, 1), grid)})
+        self.assertEqual(snap.visible_players(_monster((25, 35), sight=5)), [])
+        self.assertEqual(snap.monster_fovs, 0)
+
+    def test_results_keep_player_order(self):
+        grid = _grid()
+        players = {
+            'far': _player('far', (10, 30), grid),
+            'near': _player('near', (10, 12), grid),
+        }
+        snap = PerceptionSnapshot(grid, players)
+        seen = snap.visible_players(_monster((10, 20)))
+        self.assertEqual([pid for pid, _p in seen], ['far', 'near'])
+
+
+if __name__ == '__main__':
+    unittest.main()
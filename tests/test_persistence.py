@@ -0,0 +1,122 @@
+"""World snapshot + write-ahead log recovery."""
+
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from dungeon_crawler import GameState
+from persistence import WorldStore, encode_record, read_wal
+from tile_grid import TileGrid
+
+
+def _grid_with_stairs():
+    rows = [['.'] * 6 for _ in range(4)]
+    rows[1][2] = '↓'
+    rows[2][4] = '#'
+    return TileGrid.from_rows(rows)
+
+
+def _crash_and_recover(directory):
+    """A fresh process's view: new GameState, recovered from directory."""
+    restored = GameState()
+    store = WorldStore(directory)
+    boot_id = store.recover(restored)
+    return restored, store, boot_id
+
+
+class TileGridPickleTests(unittest.TestCase):
+    def test_round_trip_keeps_glyphs_and_gets_new_serial(self):
+        grid = _grid_with_stairs()
+        grid.set(0, 0, '#')
+        copy = pickle.loads(pickle.dumps(grid))
+        self.assertEqual(copy, grid)
+        self.assertEqual(copy[1][2], '↓')
+        self.assertEqual(copy.version, grid.version)
+        self.assertNotEqual(copy.serial, grid.serial)
+        self.assertEqual(copy.opacity(), grid.opacity())
+
+
+class WalTests(unittest.TestCase):
+    def test_torn_tail_is_ignored(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'wal-00000001.log'
+            whole = encode_record(('move', 'a', [1, 2], 0, None))
+            path.write_bytes(whole + encode_record(('player_gone', 'a'))[:-3])
+            self.assertEqual(read_wal(path), [('move', 'a', [1, 2], 0, None)])
+
+
+class RecoveryTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.game = GameState()
+        self.store = WorldStore(self.dir)
+        self.store.start(self.game, 'boot-1')
+        self.game.persistence = self.store
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_wal_replays_moves_levels_and_deaths(self):
+        self.game.add_player('ann')
+        self.game.add_player('bob')
+        ann = self.game.players['ann']
+        grid, monsters = self.game.ensure_level(1)
+        ann.dungeon_level = 1
+        ann.pos = grid.find('↑')
+        self.game.record_move(ann)
+        ann.inventory.add('torch', quantity=2)
+        self.game.record_player(ann)
+        victim = next(iter(monsters))
+        self.game.remove_monster_at(victim)
+        del self.game.players['bob']
+        self.game.forget_player('bob')
+
+        restored, store, boot_id = _crash_and_recover(self.dir)
+        self.assertEqual(boot_id, 'boot-1')
+        self.assertGreaterEqual(store.replayed, 6)
+        self.assertEqual(sorted(restored.players), ['ann'])
+        again = restored.players['ann']
+        self.assertEqual((again.dungeon_level, again.pos), (1, ann.pos))
+        self.assertEqual(
+            sorted(item.type_id for item in again.inventory),
+            sorted(item.type_id for item in ann.inventory),
+        )
+        self.assertEqual(restored.levels[1][0], grid)
+        self.assertNotIn(victim, restored.levels[1][1])
+        self.assertEqual(restored.levels[0][0], self.game.levels[0][0])
+        self.assertEqual(restored.town_doors, self.game.town_doors)
+        self.assertFalse(again.in_combat)
+
+    def test_changes_during_a_snapshot_survive(self):
+        self.game.add_player('ann')
+        ann = self.game.players['ann']
+        start = list(ann.pos)
+
+        def step_while_capturing(_seconds):
+            # The last yield comes after ann was pickled.
+            ann.pos = [ann.pos[0], ann.pos[1] + 1]
+            self.game.record_move(ann)
+
+        with patch('persistence.SNAPSHOT_BATCH', 1):
+            self.store.snapshot(self.game, step_while_capturing)
+        self.assertGreater(ann.pos[1], start[1] + 1)
+        restored, _store, _boot = _crash_and_recover(self.dir)
+        self.assertEqual(restored.players['ann'].pos, ann.pos)
+
+    def test_snapshot_drops_replayed_segments(self):
+        self.game.add_player('ann')
+        first = self.store.segment
+        self.store.snapshot(self.game)
+        segments = sorted(p.name for p in self.dir.glob('wal-*.log'))
+        self.assertEqual(segments, [f'wal-{first + 1:08d}.log'])
+        restored, store, _boot = _crash_and_recover(self.dir)
+        self.assertEqual(store.replayed, 0)
+        self.assertIn('ann', restored.players)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+"""Tests for sharing one lit-view render between co-located viewers."""
+import unittest
+
+from dungeon_crawler import GameState
+from player import Player
+
+
+class SharedRenderTests(unittest.TestCase):
+    def setUp(self):
+        self.gs = GameState()
+        for pid in ('a', 'b'):
+            p = Player(pid, [5, 5])
+            p.dungeon_level = 0
+            self.gs.players[pid] = p
+            self.gs.active_players[pid] = p
+            self.gs.player_messages[pid] = []
+            self.gs.viewports[pid] = (10, 10)
+
+    def test_same_framing_shares_render_within_tick(self):
+        with self.gs.render_tick():
+            a = self.gs.get_game_state('a')
+            b = self.gs.get_game_state('b')
+        self.assertIs(a['map'], b['map'])
+        self.assertIs(a['entities'], b['entities'])
+        self.assertEqual(a['player']['id'], 'a')
+        self.assertEqual(b['player']['id'], 'b')
+
+    def test_no_sharing_outside_tick(self):
+        a = self.gs.get_game_state('a')
+        b = self.gs.get_game_state('b')
+        self.assertIsNot(a['map'], b['map'])
+        self.assertEqual(a['map'], b['map'])
+
+    def test_world_change_mid_tick_invalidates_render(self):
+        with self.gs.render_tick():
+            before = self.gs.get_game_state('a')
+            self.gs.players['a'].pos = [5, 6]
+            self.gs.touch_world()
+            after = self.gs.get_game_state('b')
+        self.assertIsNot(before['map'], after['map'])
+        self.assertEqual(after['map'][5 - after['camera']['y']][6 - after['camera']['x']], '@')
+
+    def test_different_viewport_renders_separately(self):
+        self.gs.viewports['b'] = (12, 12)
+        with self.gs.render_tick():
+            a = self.gs.get_game_state('a')
+            b = self.gs.get_game_state('b')
+        self.assertEqual(len(a['map']), 10)
+        self.assertEqual(len(b['map']), 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
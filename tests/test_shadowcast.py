@@ -0,0 +1,74 @@
+"""Iterative bitmap shadowcaster must match the recursive reference."""
+import random
+import unittest
+
+from map_generator import MapGenerator
+from tile_grid import TileGrid
+from visibility import FovMask, compute_fov, compute_fov_recursive
+
+
+def _random_rows(h, w, rng, wall_chance):
+    return [
+        ['#' if rng.random() < wall_chance else '.' for _ in range(w)]
+        for _ in range(h)
+    ]
+
+
+class ShadowcastEquivalenceTests(unittest.TestCase):
+    def test_matches_recursive_on_random_maps(self):
+        rng = random.Random(7)
+        for _ in range(30):
+            rows = _random_rows(rng.randint(1, 25), rng.randint(1, 25), rng, rng.random() * 0.5)
+            grid = TileGrid.from_rows(rows)
+            for _ in range(10):
+                origin = (rng.randint(-3, 27), rng.randint(-3, 27))
+                radius = rng.choice((0, 1, 2, 5, 9, 30))
+                expected = compute_fov_recursive(rows, origin, radius)
+                self.assertEqual(set(compute_fov(rows, origin, radius)), expected)
+                self.assertEqual(set(compute_fov(grid, origin, radius)), expected)
+
+    def test_matches_recursive_on_generated_dungeon(self):
+        random.seed(11)
+        rows, _monsters = MapGenerator().generate_level()
+        grid = TileGrid.from_rows(rows)
+        rng = random.Random(11)
+        for _ in range(40):
+            origin = (rng.randrange(len(rows)), rng.randrange(len(rows[0])))
+            self.assertEqual(
+                set(compute_fov(grid, origin, 8)),
+                compute_fov_recursive(rows, origin, 8),
+            )
+
+
+class FovMaskTests(unittest.TestCase):
+    def test_set_like_behaviour(self):
+        rows = [['.'] * 5 for _ in range(5)]
+        mask = compute_fov(rows, (2, 2), 1)
+        self.assertIsInstance(mask, FovMask)
+        expected = {(y, x) for y in (1, 2, 3) for x in (1, 2, 3)} - {(1, 1), (1, 3), (3, 1), (3, 3)}
+        self.assertEqual(mask, expected)
+        self.assertEqual(len(mask), len(expected))
+        self.assertIn([2, 3], mask)
+        self.assertNotIn((0, 0), mask)
+        self.assertNotIn((-5, 40), mask)
+        explored = set()
+        explored.update(mask)
+        self.assertEqual(explored, expected)
+
+    def test_window_is_clipped_to_map(self):
+        mask = compute_fov([['.'] * 4 for _ in range(3)], (0, 0), 20)
+        self.assertEqual((mask.rows, mask.cols), (3, 4))
+        self.assertEqual(len(mask.bits), 12)
+
+    def test_nothing_to_see_is_still_a_mask(self):
+        rows = [['.'] * 4 for _ in range(3)]
+        for game_map, radius in ((rows, -1), (rows, None), ([], 5), (TileGrid.from_rows(rows), -3)):
+            mask = compute_fov(game_map, (1, 1), radius)
+            self.assertIsInstance(mask, FovMask)
+            self.assertEqual((len(mask), list(mask)), (0, []))
+            self.assertNotIn((1, 1), mask)
+            self.assertEqual(mask, set())
+
+
+if __name__ == '__main__':
+    unittest.main()
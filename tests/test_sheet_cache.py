@@ -0,0 +1,103 @@
+"""JSON row cache beside the species / item workbooks."""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from item_types.registry import ITEM_TYPES
+from item_types.sheet import load_item_sheet, write_item_xlsx
+from monster_types.registry import MONSTER_TYPES
+from monster_types.sheet import load_monster_sheet, write_monster_xlsx
+from sheet_cache import cache_path_for, cache_status
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _goblin(**overrides):
+    row = {'type_id': 'goblin', 'name': 'Goblin', 'base_mhp': 8, 'spawn_weight': 2}
+    row.update(overrides)
+    return row
+
+
+class SheetCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'monsters.xlsx'
+        write_monster_xlsx(self.path, extra_rows=[_goblin()])
+        self.previous = dict(MONSTER_TYPES)
+
+    def tearDown(self):
+        MONSTER_TYPES.clear()
+        MONSTER_TYPES.update(self.previous)
+        self.tmp.cleanup()
+
+    def _ids(self, types):
+        return [td.id for td in types]
+
+    def test_unchanged_workbook_is_not_reparsed(self):
+        first = load_monster_sheet(self.path, register=False)
+        self.assertEqual(cache_status(self.path), 'fresh')
+        with patch('monster_types.sheet.iter_xlsx_rows', side_effect=AssertionError):
+            again = load_monster_sheet(self.path, register=False)
+        self.assertEqual([vars(td) for td in again], [vars(td) for td in first])
+
+    def test_touched_workbook_is_validated_by_hash(self):
+        load_monster_sheet(self.path, register=False)
+        st = self.path.stat()
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+        self.assertEqual(cache_status(self.path), 'rehash')
+        with patch('monster_types.sheet.iter_xlsx_rows', side_effect=AssertionError):
+            self._ids(load_monster_sheet(self.path, register=False))
+        self.assertEqual(cache_status(self.path), 'fresh')
+
+    def test_edited_workbook_is_reparsed(self):
+        load_monster_sheet(self.path, register=False)
+        write_monster_xlsx(self.path, extra_rows=[_goblin(base_mhp=30)])
+        st = self.path.stat()
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+        self.assertEqual(cache_status(self.path), 'stale')
+        types = load_monster_sheet(self.path, register=False)
+        self.assertEqual({td.id: td.base_mhp for td in types}['goblin'], 30)
+
+    def test_corrupt_cache_is_rebuilt(self):
+        load_monster_sheet(self.path, register=False)
+        cache_path_for(self.path).write_text('{"format": 1, "rows": [', encoding='utf-8')
+        self.assertEqual(self._ids(load_monster_sheet(self.path, register=False)), ['troll', 'goblin'])
+        payload = json.loads(cache_path_for(self.path).read_text(encoding='utf-8'))
+        self.assertEqual(payload['format'], 1)
+        self.assertEqual(cache_status(self.path), 'fresh')
+
+    def test_item_sheet_uses_cache(self):
+        previous = dict(ITEM_TYPES)
+        try:
+            path = Path(self.tmp.name) / 'items.xlsx'
+            write_item_xlsx(path)
+            first = load_item_sheet(path, register=False)
+            with patch('item_types.sheet.iter_xlsx_rows', side_effect=AssertionError):
+                again = load_item_sheet(path, register=False)
+            self.assertEqual([vars(td) for td in again], [vars(td) for td in first])
+        finally:
+            ITEM_TYPES.clear()
+            ITEM_TYPES.update(previous)
+
+    def test_cached_load_does_not_import_openpyxl(self):
+        load_monster_sheet(self.path, register=False)
+        code = (
+            'import sys; from monster_types.sheet import load_monster_sheet; '
+            f'types = load_monster_sheet({str(self.path)!r}, register=False); '
+            "print(len(types), 'openpyxl' in sys.modules)"
+        )
+        out = subprocess.run(
+            [sys.executable, '-c', code], cwd=PROJECT_ROOT, capture_output=True,
+            text=True, check=True,
+        ).stdout.split()[-2:]
+        self.assertEqual(out, ['2', 'False'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,19 +4,24 @@ import json
 import random
 import tempfile
 import unittest
+from collections import deque
 from pathlib import Path
 from unittest.mock import patch
 
 from monster import Monster
 from monster_elo import (
     INITIAL_ELO,
+    EloLadder,
     LadderFighter,
+    assign_spawn_elo,
     calibrate_instance_elo,
+    drain_calibration_queue,
     closest_ladder_index,
     elo_percentile,
     ladder_midpoint_elo,
     load_elo_ladder,
     pick_ladder_opponent,
+    provisional_elo,
     reload_elo_ladder,
 )
 from monster_types.base import MonsterTypeDef
@@ -89,6 +94,33 @@ class OpponentPickTests(unittest.TestCase):
         self.assertEqual(max(picks), 9)
 
 
+class EloLadderIndexTests(unittest.TestCase):
+    def test_bisect_matches_linear_scan(self):
+        rng = random.Random(4)
+        elos = sorted(rng.choice(range(0, 2000, 50)) for _ in range(40))
+        plain = [_fighter(e) for e in elos]
+        indexed = EloLadder(plain)
+        for rating in [-100, 0, 25, 26, 1000, 1975, 1990, 5000] + [rng.uniform(-50, 2050) for _ in range(200)]:
+            self.assertEqual(
+                closest_ladder_index(indexed, rating), closest_ladder_index(plain, rating), rating,
+            )
+            self.assertEqual(elo_percentile(rating, ladder=indexed), elo_percentile(rating, ladder=plain))
+
+    def test_same_opponents_drawn_from_either_ladder(self):
+        plain = [_fighter(i * 100) for i in range(12)]
+        indexed = EloLadder(plain)
+        a = [pick_ladder_opponent(plain, 640, rng=random.Random(9)) for _ in range(5)]
+        b = [pick_ladder_opponent(indexed, 640, rng=random.Random(9)) for _ in range(5)]
+        self.assertEqual([f.elo for f in a], [f.elo for f in b])
+
+    def test_provisional_elo_uses_type_index(self):
+        ladder = EloLadder([_fighter(100, type_id='a'), _fighter(700, type_id='b', level=2)])
+        monster = type('M', (), {'type_id': 'b', 'level': 2})()
+        self.assertEqual(provisional_elo(monster, ladder), 700.0)
+        monster.level = 3
+        self.assertEqual(provisional_elo(monster, ladder), ladder_midpoint_elo(ladder))
+
+
 class CalibrateTests(unittest.TestCase):
     def setUp(self):
         self.previous = dict(MONSTER_TYPES)
@@ -211,10 +243,10 @@ class CalibrateTests(unittest.TestCase):
         self.assertIn('elo', mon.to_dict())
         self.assertIn('elo', mon.to_inspect_dict())
 
-    def test_spawn_monsters_calls_calibrate(self):
+    def test_spawn_monsters_assigns_spawn_elo(self):
         from map_generator import MapGenerator
 
-        with patch('map_generator.calibrate_instance_elo') as cal:
+        with patch('map_generator.assign_spawn_elo') as cal:
             with patch('map_generator.MONSTER_PROBABILITY', 1.0):
                 with patch('map_generator.pick_spawn_type_id', return_value='elo_spawn_rat'):
                     with patch('map_generator.assign_monster_level', return_value=1):
@@ -226,5 +258,90 @@ class CalibrateTests(unittest.TestCase):
         self.assertGreater(cal.call_count, 0)
 
 
+class SpawnEloQueueTests(unittest.TestCase):
+    def setUp(self):
+        CalibrateTests.setUp(self)
+        monster_elo_mod._calibration_queue.clear()
+        monster_elo_mod._calibration_memo.clear()
+        self.ladder = [
+            _fighter(800, 'weak', 1, strength=3),
+            _fighter(1000, 'elo_spawn_rat', 2, strength=8),
+            _fighter(1200, 'strong', 1, strength=14),
+            _fighter(1600, 'boss', 1, strength=22),
+        ]
+
+    def tearDown(self):
+        monster_elo_mod._calibration_queue.clear()
+        monster_elo_mod._calibration_memo.clear()
+        CalibrateTests.tearDown(self)
+
+    def _rat(self, mid, seed=1):
+        return Monster.from_type(
+            'elo_spawn_rat', [0, 0], monster_id=mid, level=2, rng=random.Random(seed)
+        )
+
+    def test_spawn_gets_provisional_rating_and_drain_matches_calibration(self):
+        mon = self._rat('a')
+        self.assertFalse(assign_spawn_elo(mon, ladder=self.ladder))
+        self.assertEqual(mon.elo, 1000.0)  # the ladder's own entry for this type+level
+        self.assertEqual(monster_elo_mod.pending_calibrations(), 1)
+
+        expected = calibrate_instance_elo(
+            self._rat('ref'), fights=30, rng=random.Random(5), ladder=self.ladder
+        )
+        mon.hp = 3  # mid-fight when the refinement lands
+        self.assertEqual(
+            drain_calibration_queue(fights=30, rng=random.Random(5), ladder=self.ladder), 1
+        )
+        self.assertEqual(mon.elo, expected)
+        self.assertEqual(mon.hp, 3)
+
+    def test_identical_stat_roll_reuses_calibrated_rating(self):
+        first, twin = self._rat('a'), self._rat('b')
+        assign_spawn_elo(first, ladder=self.ladder)
+        drain_calibration_queue(fights=20, rng=random.Random(2), ladder=self.ladder)
+        with patch('monster_elo.calibrate_instance_elo') as cal:
+            self.assertTrue(assign_spawn_elo(twin, ladder=self.ladder))
+            cal.assert_not_called()
+        self.assertEqual(twin.elo, first.elo)
+        self.assertEqual(monster_elo_mod.pending_calibrations(), 0)
+
+    def test_live_elo_changes_survive_refinement(self):
+        mon = self._rat('a')
+        assign_spawn_elo(mon, ladder=self.ladder)
+        mon.elo += 40  # won a fight before calibration caught up
+        drain_calibration_queue(fights=20, rng=random.Random(2), ladder=self.ladder)
+        calibrated = monster_elo_mod._calibration_memo[monster_elo_mod.calibration_key(mon)]
+        self.assertEqual(mon.elo, calibrated + 40)
+
+    def test_dead_collected_and_unloaded_monsters_are_dropped(self):
+        dead, gone, away, kept = (self._rat(mid, seed) for seed, mid in enumerate('dgak'))
+        for mon in (dead, gone, away, kept):
+            assign_spawn_elo(mon, ladder=self.ladder)
+        dead.hp = 0
+        del gone
+        with patch('monster_elo.calibrate_instance_elo', return_value=1234.0) as cal:
+            refined = drain_calibration_queue(
+                ladder=self.ladder, is_resident=lambda mon: mon is not away
+            )
+        self.assertEqual((refined, cal.call_count), (1, 1))
+        self.assertEqual(kept.elo, 1234.0)
+        self.assertEqual(away.elo, 1000.0)
+        self.assertEqual(monster_elo_mod.pending_calibrations(), 0)
+
+    def test_queue_is_bounded(self):
+        with patch.object(monster_elo_mod, '_calibration_queue', deque(maxlen=3)):
+            rats = [self._rat(str(n), n) for n in range(5)]
+            for mon in rats:
+                assign_spawn_elo(mon, ladder=self.ladder)
+            self.assertEqual(monster_elo_mod.pending_calibrations(), 3)
+
+    def test_empty_ladder_is_final_without_queueing(self):
+        mon = self._rat('a')
+        self.assertTrue(assign_spawn_elo(mon, ladder=[]))
+        self.assertEqual(mon.elo, float(INITIAL_ELO))
+        self.assertEqual(monster_elo_mod.pending_calibrations(), 0)
+
+
 if __name__ == '__main__':
     unittest.main()
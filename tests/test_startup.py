@@ -0,0 +1,64 @@
+"""Import-time cost of the server: app factory and the startup profile."""
+
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+from startup_profile import format_report, package_totals, parse_importtime
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   flask.globals
+import time:       300 |        420 | flask
+import time:      2000 |       2000 |     dns.name
+import time:      1000 |       3000 |   dns
+import time:       500 |       3920 | dungeon_crawler
+"""
+
+
+class AppFactoryTests(unittest.TestCase):
+    def test_import_builds_nothing_until_create_app(self):
+        code = (
+            'import sys, dungeon_crawler as dc\n'
+            'print(dc.game_state is None, dc.combat_system is None,'
+            " 'openpyxl' in sys.modules, 'eventlet.green.socket' in sys.modules)\n"
+            'app = dc.create_app()\n'
+            'state = dc.game_state\n'
+            'print(app is dc.create_app(), dc.game_state is state,'
+            ' 0 in state.levels, dc.socketio.server is not None)\n'
+            'import os; os._exit(0)\n'
+        )
+        out = subprocess.run(
+            [sys.executable, '-c', code], cwd=PROJECT_ROOT, capture_output=True,
+            text=True, check=True, timeout=60,
+        ).stdout.splitlines()[-2:]
+        self.assertEqual(out, ['True True False False', 'True True True True'])
+
+
+class StartupProfileTests(unittest.TestCase):
+    def test_parse_importtime(self):
+        entries = parse_importtime(IMPORTTIME)
+        self.assertEqual(entries[0], ('flask.globals', 0.00012, 0.00012, 1))
+        self.assertEqual([e[0] for e in entries][-1], 'dungeon_crawler')
+        totals = package_totals(entries)
+        self.assertEqual(list(totals)[0], 'dns')
+        self.assertAlmostEqual(totals['dns'], 0.003)
+        self.assertAlmostEqual(totals['flask'], 0.00042)
+
+    def test_report_flags_budget(self):
+        profile = {
+            'phases': [['import dungeon_crawler', 0.4], ['create_app()', 0.2]],
+            'imports': parse_importtime(IMPORTTIME),
+        }
+        report, total = format_report(profile, top=2, budget=0.5)
+        self.assertAlmostEqual(total, 0.6)
+        self.assertIn('OVER 0.5 s budget', report)
+        self.assertIn('dungeon_crawler', report)
+        self.assertNotIn('flask.globals', report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+"""Tests for versioned game_state snapshots and delta encoding."""
+import copy
+import unittest
+
+from state_delta import SnapshotCache, diff_frames, entity_key
+
+
+def _frame(map_rows, entities=(), **extra):
+    rows = [list(r) for r in map_rows]
+    frame = {
+        'map': rows,
+        'fog': [['visible'] * len(r) for r in rows],
+        'entities': [dict(e) for e in entities],
+        'messages': ['hello'],
+        'players': 1,
+        'player': {'id': 'hero', 'hp': '10/10', 'dungeon_level': 1, 'interior_id': None},
+        'game_info': [],
+        'camera': {'y': 0, 'x': 0},
+        'viewport': {'h': len(rows), 'w': len(rows[0]) if rows else 0},
+        'map_size': {'h': 40, 'w': 40},
+        'boot_id': 'boot',
+    }
+    frame.update(extra)
+    return frame
+
+
+def _apply(base, delta):
+    """Python mirror of static/js/state_sync.js applyDelta."""
+    frame = copy.deepcopy(base)
+    for vy, vx, char, state in delta['tiles']:
+        frame['map'][vy][vx] = char
+        frame['fog'][vy][vx] = state
+    removed = set(delta['entities']['remove'])
+    by_key = {}
+    order = []
+    for e in base['entities']:
+        key = entity_key(e)
+        if key not in removed:
+            by_key[key] = e
+            order.append(key)
+    for e in delta['entities']['upsert']:
+        key = entity_key(e)
+        if key not in by_key:
+            order.append(key)
+        by_key[key] = e
+    frame['entities'] = [by_key[k] for k in delta['entities'].get('order', order)]
+    frame['player'].update(delta['player'])
+    frame.update(delta['set'])
+    for key in delta['unset']:
+        frame.pop(key, None)
+    if 'version' in delta:
+        frame['version'] = delta['version']
+    return frame
+
+
+GOBLIN = {'kind': 'monster', 'id': 'g1', 'vy': 1, 'vx': 1, 'sprite': 's', 'under': '.'}
+HERO = {'kind': 'player', 'id': 'hero', 'vy': 2, 'vx': 2, 'sprite': 'p', 'under': '.'}
+
+
+class DiffFramesTests(unittest.TestCase):
+    def test_only_changed_tiles_are_sent(self):
+        base = _frame(['....', '....', '....', '....'])
+        new = _frame(['....', '.@..', '....', '....'])
+        delta = diff_frames(base, new)
+        self.assertEqual(delta['tiles'], [[1, 1, '@', 'visible']])
+        self.assertEqual(delta['set'], {})
+        self.assertEqual(delta['player'], {})
+
+    def test_camera_change_forces_full_frame(self):
+        base = _frame(['....'] * 4)
+        new = _frame(['....'] * 4, camera={'y': 1, 'x': 0})
+        self.assertIsNone(diff_frames(base, new))
+
+    def test_floor_change_forces_full_frame(self):
+        base = _frame(['....'] * 4)
+        new = _frame(['....'] * 4)
+        new['player'] = dict(new['player'], dungeon_level=2)
+        self.assertIsNone(diff_frames(base, new))
+
+    def test_mostly_changed_viewport_forces_full_frame(self):
+        base = _frame(['....'] * 4)
+        new = _frame(['####', '####', '###.', '....'])
+        self.assertIsNone(diff_frames(base, new))
+
+    def test_entity_moves_and_removals_round_trip(self):
+        moved = dict(GOBLIN, vy=2, vx=1)
+        base = _frame(['....'] * 4, entities=[GOBLIN, HERO])
+        new = _frame(['....'] * 4, entities=[moved])
+        delta = diff_frames(base, new)
+        self.assertEqual(delta['entities']['upsert'], [moved])
+        self.assertEqual(delta['entities']['remove'], ['player:hero'])
+        self.assertEqual(_apply(base, delta)['entities'], [moved])
+
+    def test_optional_keys_set_and_unset(self):
+        base = _frame(['....'] * 4, stair_step={'y': 1, 'x': 1})
+        new = _frame(['....'] * 4, messages=['hello', 'a goblin appears'])
+        delta = diff_frames(base, new)
+        self.assertEqual(delta['unset'], ['stair_step'])
+        self.assertEqual(delta['set'], {'messages': ['hello', 'a goblin appears']})
+
+
+class SnapshotCacheTests(unittest.TestCase):
+    def test_without_ack_every_frame_is_full(self):
+        cache = SnapshotCache()
+        for expected_version in (1, 2, 3):
+            event, data = cache.encode('hero', _frame(['....'] * 4))
+            self.assertEqual(event, 'game_state')
+            self.assertEqual(data['version'], expected_version)
+
+    def test_delta_against_acked_frame_rebuilds_exact_frame(self):
+        cache = SnapshotCache()
+        _event, first = cache.encode('hero', _frame(['....'] * 4, entities=[GOBLIN]))
+        client_base = copy.deepcopy(first)
+        self.assertTrue(cache.ack('hero', first['version']))
+
+        new = _frame(['....', '..@.', '....', '....'], entities=[dict(GOBLIN, vx=2)])
+        new['player'] = dict(new['player'], hp='7/10')
+        expected = copy.deepcopy(new)
+        event, delta = cache.encode('hero', new)
+        self.assertEqual(event, 'game_state_delta')
+        self.assertEqual(delta['base'], first['version'])
+        self.assertEqual(delta['player'], {'hp': '7/10'})
+
+        rebuilt = _apply(client_base, delta)
+        expected['version'] = delta['version']
+        self.assertEqual(rebuilt, expected)
+
+    def test_unacked_deltas_stay_based_on_last_ack(self):
+        cache = SnapshotCache()
+        _event, first = cache.encode('hero', _frame(['....'] * 4))
+        cache.ack('hero', first['version'])
+        _e, d2 = cache.encode('hero', _frame(['.@..', '....', '....', '....']))
+        _e, d3 = cache.encode('hero', _frame(['..@.', '....', '....', '....']))
+        self.assertEqual(d2['base'], first['version'])
+        self.assertEqual(d3['base'], first['version'])
+        self.assertEqual(d3['tiles'], [[0, 2, '@', 'visible']])
+
+    def test_stored_frame_does_not_alias_live_messages(self):
+        cache = SnapshotCache()
+        messages = ['hello']
+        _e, first = cache.encode('hero', _frame(['....'] * 4, messages=messages))
+        cache.ack('hero', first['version'])
+        messages.append('new message')
+        _e, delta = cache.encode('hero', _frame(['....'] * 4, messages=messages))
+        self.assertEqual(delta['set'], {'messages': ['hello', 'new message']})
+
+    def test_full_flag_and_reset_start_new_baseline(self):
+        cache = SnapshotCache()
+        _e, first = cache.encode('hero', _frame(['....'] * 4))
+        cache.ack('hero', first['version'])
+        event, _data = cache.encode('hero', _frame(['....'] * 4), full=True)
+        self.assertEqual(event, 'game_state')
+        self.assertFalse(cache.ack('hero', first['version']))
+
+        cache.reset('hero')
+        event, data = cache.encode('hero', _frame(['....'] * 4))
+        self.assertEqual(event, 'game_state')
+        self.assertEqual(data['version'], 1)
+
+    def test_ack_of_unknown_version_is_ignored(self):
+        cache = SnapshotCache()
+        self.assertFalse(cache.ack('hero', 1))
+        cache.encode('hero', _frame(['....'] * 4))
+        self.assertFalse(cache.ack('hero', 'nope'))
+        self.assertFalse(cache.ack('hero', 99))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Tests for the bytearray-backed TileGrid map type."""
+import random
+import unittest
+
+from camera import slice_map
+from monster_ai import is_terrain_passable
+from tile_grid import TileGrid, map_row
+from visibility import compute_fov
+
+
+def _random_rows(h, w, seed):
+    rng = random.Random(seed)
+    glyphs = ['.', '.', '.', '#', 'g', '&', '↓', '↑', 'T']
+    return [[rng.choice(glyphs) for _ in range(w)] for _ in range(h)]
+
+
+class TileGridTests(unittest.TestCase):
+    def test_round_trip_and_list_compat(self):
+        rows = _random_rows(6, 9, 1)
+        grid = TileGrid.from_rows(rows)
+        self.assertEqual(len(grid), 6)
+        self.assertEqual(len(grid[0]), 9)
+        self.assertEqual(grid.to_rows(), rows)
+        self.assertEqual(grid, rows)
+        self.assertEqual([list(r) for r in grid], rows)
+        self.assertEqual(grid[2][3], rows[2][3])
+        self.assertEqual(grid[-1][-1], rows[-1][-1])
+        self.assertEqual(map_row(grid, 4), ''.join(rows[4]))
+
+    def test_writes_through_row_view(self):
+        grid = TileGrid(3, 3)
+        grid[1][2] = '↓'
+        self.assertEqual(grid.get(1, 2), '↓')
+        self.assertEqual(grid.find('↓'), [1, 2])
+        self.assertIsNone(grid.find('↑'))
+        with self.assertRaises(IndexError):
+            grid[3][0]
+        with self.assertRaises(ValueError):
+            grid[0][0] = '..'
+
+    def test_version_bumps_only_when_opacity_changes(self):
+        grid = TileGrid(3, 3)
+        grid[1][1] = '&'
+        self.assertEqual(grid.version, 0)
+        grid[1][1] = '#'
+        self.assertEqual(grid.version, 1)
+        self.assertEqual(grid.opacity()[4], 1)
+        grid[1][1] = '.'
+        self.assertEqual(grid.version, 2)
+        self.assertEqual(grid.opacity()[4], 0)
+
+    def test_passability_changes_bump_version(self):
+        grid = TileGrid(1, 3)
+        grid[0][1] = 'T'  # trees stop movement but not sight
+        self.assertEqual(grid.version, 1)
+        self.assertEqual(grid.passability(), bytes([1, 0, 1]))
+        self.assertEqual(grid.opacity(), bytes(3))
+
+    def test_slice_matches_list_slicing(self):
+        rows = _random_rows(7, 8, 2)
+        grid = TileGrid.from_rows(rows)
+        for cam_y, cam_x, vh, vw in ((0, 0, 4, 4), (-2, -3, 6, 5), (5, 6, 4, 4), (-9, 0, 3, 3), (0, 20, 2, 2)):
+            self.assertEqual(
+                slice_map(grid, cam_y, cam_x, vh, vw),
+                slice_map(rows, cam_y, cam_x, vh, vw),
+            )
+
+    def test_fov_and_passability_match_list_map(self):
+        for seed in range(5):
+            rows = _random_rows(15, 17, seed)
+            grid = TileGrid.from_rows(rows)
+            for origin in ((7, 8), (0, 0), (14, 3)):
+                self.assertEqual(compute_fov(grid, origin, 6), compute_fov(rows, origin, 6))
+            for y in range(-1, 16):
+                for x in range(-1, 18):
+                    self.assertEqual(
+                        is_terrain_passable(grid, y, x), is_terrain_passable(rows, y, x)
+                    )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""Move tracing: spans, trace ids from the client, Chrome export, move echo."""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import dungeon_crawler as dc
+import tracing
+from combat import CombatSystem
+from tracing import current, parse_trace_meta, span, to_chrome, traced
+
+
+class SpanTests(unittest.TestCase):
+    def test_span_without_trace_is_a_no_op(self):
+        with span('move_player'):
+            self.assertIsNone(current())
+
+    def test_nested_spans_are_ordered_by_start_with_depth(self):
+        with traced('t1', 'ann', client_sent=123) as trace:
+            with span('register_player_turn_action'):
+                with span('monster_round', level=3):
+                    pass
+            with span('emit', to='ann', event='game_state'):
+                pass
+        self.assertIsNone(current())
+        record = trace.record
+        self.assertEqual((record['id'], record['player_id'], record['client_sent']), ('t1', 'ann', 123))
+        names = [(s['name'], s['depth']) for s in record['spans']]
+        self.assertEqual(
+            names, [('register_player_turn_action', 0), ('monster_round', 1), ('emit', 0)]
+        )
+        self.assertEqual(record['spans'][1]['args'], {'level': 3})
+        self.assertIs(tracing.recent_traces()[-1], record)
+
+    def test_untraced_move_opens_nothing(self):
+        with traced(None, 'ann') as trace:
+            self.assertIsNone(trace)
+            self.assertIsNone(current())
+
+    def test_trace_log_is_jsonl(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'traces.jsonl')
+            with patch.dict(os.environ, {tracing.TRACE_LOG_ENV: path}):
+                for n in range(2):
+                    with traced(f'id{n}', 'ann'):
+                        with span('move_player'):
+                            pass
+            records = tracing.read_jsonl(path)
+        self.assertEqual([r['id'] for r in records], ['id0', 'id1'])
+        self.assertEqual(tracing.summarize(records)['move_player'][0], 2)
+
+
+class TraceMetaTests(unittest.TestCase):
+    def test_parse_trace_meta(self):
+        self.assertEqual(parse_trace_meta({'id': 'a-1', 't': 1700000000000}), ('a-1', 1700000000000))
+        self.assertEqual(parse_trace_meta({'id': 7}), ('7', None))
+        self.assertEqual(parse_trace_meta({'id': 'x' * 500, 't': 'soon'}), ('x' * 64, None))
+        for bad in (None, 'abc', {}, {'id': None}, {'id': True}, {'id': ['a']}):
+            self.assertEqual(parse_trace_meta(bad), (None, None))
+
+
+class ChromeTests(unittest.TestCase):
+    def test_chrome_events_one_thread_per_player(self):
+        records = [
+            {'id': 'a', 'player_id': 'ann', 'at': 10.0, 'server_ms': 4.0,
+             'spans': [{'name': 'move_player', 'start_ms': 0.5, 'ms': 1.0, 'depth': 0}]},
+            {'id': 'b', 'player_id': 'bob', 'at': 11.0, 'server_ms': 2.0, 'spans': []},
+        ]
+        events = to_chrome(records)['traceEvents']
+        complete = [e for e in events if e['ph'] == 'X']
+        self.assertEqual([e['name'] for e in complete], ['move', 'move_player', 'move'])
+        self.assertEqual(complete[1]['ts'], 10.0e6 + 500)
+        self.assertEqual(complete[1]['dur'], 1000.0)
+        self.assertNotEqual(complete[0]['tid'], complete[2]['tid'])
+        json.dumps(events)
+
+
+class MoveEchoTests(unittest.TestCase):
+    def setUp(self):
+        self.game = dc.GameState()
+        if dc.socketio.server is None:
+            dc.socketio.init_app(dc.app)
+        patches = [
+            patch.object(dc, 'game_state', self.game),
+            patch.object(dc, 'combat_system', CombatSystem(self.game, dc.socketio)),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.client = dc.socketio.test_client(dc.app)
+        self.addCleanup(self.client.disconnect)
+        boot = self.client.get_received()[0]['args'][0]['boot_id']
+        self.client.emit('select_id', {'id': 'tracer', 'boot_id': boot})
+        self.client.get_received()
+
+    def test_traced_move_echoes_spans_to_the_mover(self):
+        for direction in ('n', 's', 'e', 'west'):
+            self.client.emit('move', {'dir': direction, 'trace': {'id': 'm1', 't': 5}})
+            echoes = [p['args'][0] for p in self.client.get_received() if p['name'] == 'move_trace']
+            if echoes:
+                break
+        (echo,) = echoes
+        self.assertEqual(echo['id'], 'm1')
+        names = [s['name'] for s in echo['spans']]
+        for name in ('move_player', 'register_player_turn_action', 'get_game_state', 'emit'):
+            self.assertIn(name, names)
+        self.assertGreaterEqual(echo['server_ms'] + 0.01, max(s['start_ms'] + s['ms'] for s in echo['spans']))
+
+    def test_plain_move_is_not_traced(self):
+        self.client.emit('move', 'n')
+        names = [p['name'] for p in self.client.get_received()]
+        self.assertNotIn('move_trace', names)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,266 @@
+"""Compact byte-per-tile map storage.
+
+Levels are generated as lists of one-character strings and then frozen into a
+TileGrid for the life of the server: one bytearray of glyph codes instead of
+one Python list per row and one pointer per cell. ASCII glyphs are stored as
+their own code; the few non-ASCII glyphs (stairs) get codes from 128 up.
+
+``grid[y][x]`` reads and writes still work through light row views, so code
+and tests written against list-of-lists maps keep working; hot paths use
+``get``, ``glyph_row`` and ``opacity`` instead.
+"""
+
+from itertools import count
+
+from visibility import BLOCKING_TERRAIN, IMPASSABLE_TERRAIN
+
+# code -> glyph. 0-127 are ASCII; extra glyphs are registered from 128 up.
+_GLYPHS = [chr(i) for i in range(128)] + [None] * 128
+_CODES = {chr(i): i for i in range(128)}
+# chr(code) -> glyph, for latin-1 decoded rows (identity below 128).
+_DECODE = {}
+# code -> 1 if the glyph blocks sight.
+_OPAQUE = bytearray(256)
+# code -> 1 if the glyph can be walked on.
+_PASSABLE = bytearray(256)
+# Process-unique grid ids (id() can be reused once a grid is freed).
+_SERIALS = count(1)
+
+
+def _refresh_opacity(code):
+    glyph = _GLYPHS[code]
+    _OPAQUE[code] = 1 if glyph in BLOCKING_TERRAIN else 0
+    _PASSABLE[code] = 0 if glyph in IMPASSABLE_TERRAIN else 1
+
+
+for _code in range(128):
+    _refresh_opacity(_code)
+
+
+def glyph_code(glyph):
+    """Byte code for a one-character glyph (registering new non-ASCII glyphs)."""
+    code = _CODES.get(glyph)
+    if code is not None:
+        return code
+    if not isinstance(glyph, str) or len(glyph) != 1:
+        raise ValueError(f"tile glyph must be a single character, got {glyph!r}")
+    code = 128 + sum(1 for g in _GLYPHS[128:] if g is not None)
+    if code > 255:
+        raise ValueError("tile glyph table is full")
+    _GLYPHS[code] = glyph
+    _CODES[glyph] = code
+    _DECODE[code] = glyph  # str.translate keys are ordinals of chr(code)
+    _refresh_opacity(code)
+    return code
+
+
+for _glyph in ('↓', '↑'):
+    glyph_code(_glyph)
+
+
+class TileRow:
+    """Live view of one grid row; behaves like the row list it replaced."""
+
+    __slots__ = ('_grid', '_y')
+
+    def __init__(self, grid, y):
+        self._grid = grid
+        self._y = y
+
+    def __len__(self):
+        return self._grid.width
+
+    def __getitem__(self, x):
+        grid = self._grid
+        if isinstance(x, slice):
+            return list(grid.glyph_row(self._y))[x]
+        if x < 0:
+            x += grid.width
+        if not 0 <= x < grid.width:
+            raise IndexError('tile row index out of range')
+        return _GLYPHS[grid.cells[self._y * grid.width + x]]
+
+    def __setitem__(self, x, glyph):
+        grid = self._grid
+        if x < 0:
+            x += grid.width
+        if not 0 <= x < grid.width:
+            raise IndexError('tile row index out of range')
+        grid.set(self._y, x, glyph)
+
+    def __iter__(self):
+        return iter(self._grid.glyph_row(self._y))
+
+    def __contains__(self, glyph):
+        return glyph in self._grid.glyph_row(self._y)
+
+    def __eq__(self, other):
+        if isinstance(other, TileRow):
+            other = list(other)
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class TileGrid:
+    """Rectangular map of one-character glyphs backed by a bytearray."""
+
+    __slots__ = ('height', 'width', 'cells', 'version', 'serial', '_opacity', '_passable')
+
+    def __init__(self, height, width, fill='.'):
+        self.height = int(height)
+        self.width = int(width)
+        self.cells = bytearray([glyph_code(fill)]) * (self.height * self.width)
+        # Bumped when a write changes what blocks sight or movement (FOV and
+        # flow-field caches key on it).
+        self.version = 0
+        self.serial = next(_SERIALS)
+        self._opacity = None
+        self._passable = None
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Freeze a list-of-lists map (as built by MapGenerator)."""
+        if isinstance(rows, TileGrid):
+            return rows
+        height = len(rows)
+        width = len(rows[0]) if height else 0
+        grid = cls(height, width)
+        cells = grid.cells
+        i = 0
+        for row in rows:
+            if len(row) != width:
+                raise ValueError('map rows must all have the same width')
+            for glyph in row:
+                cells[i] = glyph_code(glyph)
+                i += 1
+        return grid
+
+    def to_rows(self):
+        """List-of-lists copy (the pre-TileGrid map representation)."""
+        return [list(self.glyph_row(y)) for y in range(self.height)]
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, y):
+        if y < 0:
+            y += self.height
+        if not 0 <= y < self.height:
+            raise IndexError('tile grid index out of range')
+        return TileRow(self, y)
+
+    def __iter__(self):
+        for y in range(self.height):
+            yield TileRow(self, y)
+
+    def __eq__(self, other):
+        if isinstance(other, TileGrid):
+            return (self.height, self.width, self.cells) == (
+                other.height, other.width, other.cells
+            )
+        if isinstance(other, list):
+            return self.to_rows() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"TileGrid({self.height}x{self.width})"
+
+    def __reduce__(self):
+        # Codes from 128 up are handed out per process, so carry their
+        # glyphs; the copy gets its own serial (cache keys must not collide).
+        extra = {code: _GLYPHS[code] for code in set(self.cells) if code >= 128}
+        return _restore_grid, (self.height, self.width, bytes(self.cells), extra, self.version)
+
+    def in_bounds(self, y, x):
+        return 0 <= y < self.height and 0 <= x < self.width
+
+    def get(self, y, x):
+        """Glyph at (y, x); caller checks bounds."""
+        return _GLYPHS[self.cells[y * self.width + x]]
+
+    def set(self, y, x, glyph):
+        i = y * self.width + x
+        code = glyph_code(glyph)
+        old = self.cells[i]
+        if old == code:
+            return
+        self.cells[i] = code
+        if _OPAQUE[old] != _OPAQUE[code] or _PASSABLE[old] != _PASSABLE[code]:
+            self.version += 1
+            self._opacity = None
+            self._passable = None
+
+    def glyph_row(self, y):
+        """Row y as a str of glyphs (one C-level decode, indexable by x)."""
+        w = self.width
+        raw = self.cells[y * w:(y + 1) * w].decode('latin-1')
+        return raw.translate(_DECODE) if _DECODE else raw
+
+    def terrain_token(self):
+        """Hashable id of this grid's current sight/movement-blocking layout."""
+        return (self.serial, self.version)
+
+    def opacity(self):
+        """bytes with 1 where the tile blocks sight, indexed y * width + x."""
+        if self._opacity is None:
+            self._opacity = bytes(self.cells.translate(_OPAQUE))
+        return self._opacity
+
+    def passability(self):
+        """bytes with 1 where the tile can be walked on, indexed y * width + x."""
+        if self._passable is None:
+            self._passable = bytes(self.cells.translate(_PASSABLE))
+        return self._passable
+
+    def find(self, glyph):
+        """First [y, x] holding glyph, or None."""
+        code = _CODES.get(glyph)
+        if code is None:
+            return None
+        i = self.cells.find(bytes([code]))
+        if i < 0:
+            return None
+        return [i // self.width, i % self.width]
+
+    def slice(self, cam_y, cam_x, vh, vw, oob):
+        """vh x vw list-of-lists window; cells outside the grid are ``oob``."""
+        h, w = self.height, self.width
+        x0 = max(0, cam_x)
+        x1 = min(w, cam_x + vw)
+        left = [oob] * max(0, min(vw, x0 - cam_x))
+        right = [oob] * max(0, vw - len(left) - max(0, x1 - x0))
+        rows = []
+        for vy in range(vh):
+            wy = cam_y + vy
+            if 0 <= wy < h and x0 < x1:
+                rows.append(left + list(self.glyph_row(wy)[x0:x1]) + right)
+            else:
+                rows.append([oob] * vw)
+        return rows
+
+
+def _restore_grid(height, width, cells, extra, version):
+    """Unpickle a TileGrid (see TileGrid.__reduce__)."""
+    grid = TileGrid(height, width)
+    if extra:
+        table = bytearray(range(256))
+        for code, glyph in extra.items():
+            table[code] = glyph_code(glyph)
+        cells = cells.translate(table)
+    grid.cells[:] = cells
+    grid.version = version
+    return grid
+
+
+def map_row(game_map, y):
+    """Indexable glyphs of row y for a TileGrid (str) or a list-of-lists map."""
+    glyph_row = getattr(game_map, 'glyph_row', None)
+    if glyph_row is not None:
+        return glyph_row(y)
+    return game_map[y]
@@ -0,0 +1,224 @@
+"""Per-move latency traces: where the 250 ms move budget goes.
+
+The browser (socket.js, with ?trace=1 or localStorage.dungeonTrace = '1')
+sends 'move' as {dir, trace: {id, t}}. The server opens a trace for that
+move, and code along the move path records spans into it:
+
+    move_player, recompute_visibility, register_player_turn_action
+    (monster_round inside), get_game_state, encode, emit (one per frame)
+
+When the handler returns, the mover gets 'move_trace' {id, server_ms,
+spans}, and the trace is kept in memory and appended to $MOVE_TRACE_LOG
+as one JSON line. Spans outside a traced move cost one attribute lookup.
+
+Convert a log for chrome://tracing or https://ui.perfetto.dev:
+
+    py tracing.py move_traces.jsonl --chrome move_traces.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+TRACE_LOG_ENV = 'MOVE_TRACE_LOG'
+RECENT_TRACES = 500
+MAX_SPANS = 256  # a broadcast to a crowded level emits one span per viewer
+MAX_TRACE_ID = 64
+
+# Greenlet-local once eventlet has patched threading, thread-local otherwise.
+_local = threading.local()
+_recent = deque(maxlen=RECENT_TRACES)
+
+
+class Trace:
+    """One traced move: spans as [name, start_ms, duration_ms, depth, args]."""
+
+    __slots__ = (
+        'trace_id', 'player_id', 'name', 'client_sent', 'started', 'wall', 'spans', 'depth', 'record',
+    )
+
+    def __init__(self, trace_id, player_id, name='move', client_sent=None):
+        self.trace_id = trace_id
+        self.player_id = player_id
+        self.name = name
+        self.client_sent = client_sent
+        self.started = time.perf_counter()
+        self.wall = time.time()
+        self.spans = []
+        self.depth = 0
+        self.record = None  # to_dict() once finished
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def to_dict(self):
+        return {
+            'id': self.trace_id,
+            'player_id': self.player_id,
+            'name': self.name,
+            'at': self.wall,
+            'client_sent': self.client_sent,
+            'server_ms': round(self.elapsed_ms(), 3),
+            'spans': [
+                {'name': n, 'start_ms': round(s, 3), 'ms': round(d, 3), 'depth': depth, **({'args': a} if a else {})}
+                for n, s, d, depth, a in sorted(self.spans, key=lambda item: item[1])
+            ],
+        }
+
+
+def current():
+    """The trace open on this greenlet, or None."""
+    return getattr(_local, 'trace', None)
+
+
+def parse_trace_meta(meta):
+    """(trace_id, client_sent_ms) from a move's 'trace' field, or (None, None)."""
+    if not isinstance(meta, dict):
+        return None, None
+    trace_id = meta.get('id')
+    if not isinstance(trace_id, (str, int)) or isinstance(trace_id, bool):
+        return None, None
+    sent = meta.get('t')
+    sent = sent if isinstance(sent, (int, float)) and not isinstance(sent, bool) else None
+    return str(trace_id)[:MAX_TRACE_ID], sent
+
+
+@contextmanager
+def traced(trace_id, player_id, name='move', client_sent=None):
+    """Open a trace on this greenlet for the block; yields it (None if trace_id is None)."""
+    if trace_id is None or current() is not None:
+        yield None
+        return
+    trace = Trace(trace_id, player_id, name, client_sent)
+    _local.trace = trace
+    try:
+        yield trace
+    finally:
+        _local.trace = None
+        finish(trace)
+
+
+@contextmanager
+def span(name, **args):
+    """Record a span in the open trace; a no-op when nothing is traced."""
+    trace = getattr(_local, 'trace', None)
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    trace.depth += 1
+    try:
+        yield
+    finally:
+        trace.depth -= 1
+        if len(trace.spans) < MAX_SPANS:
+            trace.spans.append([
+                name,
+                (start - trace.started) * 1000,
+                (time.perf_counter() - start) * 1000,
+                trace.depth,
+                args,
+            ])
+
+
+def finish(trace):
+    """Close out a trace: keep it, log it, and return its dict."""
+    record = trace.record = trace.to_dict()
+    _recent.append(record)
+    path = os.environ.get(TRACE_LOG_ENV)
+    if path:
+        try:
+            with open(path, 'a', encoding='utf-8') as fh:
+                fh.write(json.dumps(record) + '\n')
+        except OSError as exc:
+            print(f'Move trace log failed: {exc}')
+    return record
+
+
+def recent_traces():
+    return list(_recent)
+
+
+def echo_payload(record):
+    """What the mover gets back as 'move_trace'."""
+    return {
+        'id': record['id'],
+        'server_ms': record['server_ms'],
+        'spans': record['spans'],
+    }
+
+
+def to_chrome(records):
+    """Chrome trace-event JSON: one thread per player, complete ('X') events."""
+    events = []
+    threads = {}
+    for record in records:
+        tid = threads.setdefault(record.get('player_id'), len(threads) + 1)
+        base_us = record['at'] * 1e6
+        events.append({
+            'name': record.get('name', 'move'), 'ph': 'X', 'pid': 1, 'tid': tid,
+            'ts': base_us, 'dur': record['server_ms'] * 1000,
+            'args': {'id': record['id'], 'player_id': record.get('player_id')},
+        })
+        for item in record['spans']:
+            events.append({
+                'name': item['name'], 'ph': 'X', 'pid': 1, 'tid': tid,
+                'ts': base_us + item['start_ms'] * 1000, 'dur': item['ms'] * 1000,
+                'args': dict(item.get('args') or {}, id=record['id']),
+            })
+    for player_id, tid in threads.items():
+        events.append({
+            'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid,
+            'args': {'name': str(player_id)},
+        })
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def read_jsonl(path):
+    records = []
+    with open(path, encoding='utf-8') as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue  # torn last line from a running server
+    return records
+
+
+def summarize(records):
+    """{span name: (count, avg_ms, max_ms)} across records, plus 'server_ms'."""
+    totals = {}
+    for record in records:
+        for name, ms in [('server_ms', record['server_ms'])] + [(s['name'], s['ms']) for s in record['spans']]:
+            count, total, peak = totals.get(name, (0, 0.0, 0.0))
+            totals[name] = (count + 1, total + ms, max(peak, ms))
+    return {name: (count, total / count, peak) for name, (count, total, peak) in totals.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Summarize or convert move traces.')
+    parser.add_argument('log', help='JSONL written via $MOVE_TRACE_LOG')
+    parser.add_argument('--chrome', type=str, default=None, help='write Chrome trace JSON here')
+    args = parser.parse_args(argv)
+    records = read_jsonl(args.log)
+    if args.chrome:
+        with open(args.chrome, 'w', encoding='utf-8') as fh:
+            json.dump(to_chrome(records), fh)
+        print(f'Wrote {len(records)} traces to {args.chrome}')
+    print(f'{len(records)} traced moves')
+    for name, (count, avg, peak) in sorted(summarize(records).items(), key=lambda kv: -kv[1][1]):
+        print(f'  {name:<30} {count:6d}x  avg {avg:8.2f} ms  max {peak:8.2f} ms')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,9 @@
 """Modular field-of-view and fog-of-war helpers.
 
-Recursive shadowcasting: blocking tiles are visible, but sight does not
-pass through them. Works for any entity with a position and sight_range.
+Shadowcasting: blocking tiles are visible, but sight does not pass through
+them. Works for any entity with a position and sight_range. compute_fov runs
+an iterative scan over an opacity bitmap and returns a FovMask;
+compute_fov_recursive is the original recursive version, kept as reference.
 
 Toggle VISIBILITY_SYSTEM_ENABLED to False for developer full-map mode.
 """
@@ -44,6 +46,14 @@ def is_blocking(game_map, y, x):
     return game_map[y][x] in BLOCKING_TERRAIN
 
 
+def recall_glyph(cell):
+    """Terrain to remember for an in-bounds cell ('&' and other marks → floor)."""
+    if cell in PERMANENT_TERRAIN:
+        return cell
+    # Dynamic marks like '&' are not terrain — remember floor
+    return '.'
+
+
 def remembered_terrain(game_map, y, x):
     """Permanent terrain char for explored-but-not-visible fog recall."""
     if not game_map:
@@ -52,11 +62,7 @@ def remembered_terrain(game_map, y, x):
     w = len(game_map[0]) if h else 0
     if not (0 <= y < h and 0 <= x < w):
         return ' '
-    cell = game_map[y][x]
-    if cell in PERMANENT_TERRAIN:
-        return cell
-    # Dynamic marks like '&' are not terrain — remember floor
-    return '.'
+    return recall_glyph(game_map[y][x])
 
 
 def update_explored(explored_set, visible_set):
@@ -65,9 +71,151 @@ def update_explored(explored_set, visible_set):
     return explored_set
 
 
+class FovMask:
+    """
+    Visible tiles as a byte-per-tile window around the viewer.
+
+    Only the (2r+1)-square bounding box of the sight radius (clipped to the
+    map) is stored. Behaves like a read-only set of (y, x) tuples for
+    ``in``, iteration, len and equality.
+    """
+
+    __slots__ = ('origin', 'radius', 'token', 'top', 'left', 'rows', 'cols', 'bits')
+
+    def __init__(self, origin, radius, h, w):
+        oy, ox = origin
+        self.origin = (oy, ox)
+        self.radius = radius
+        # Terrain token of the TileGrid it was cast on (None for list maps)
+        self.token = None
+        self.top = max(0, oy - radius)
+        self.left = max(0, ox - radius)
+        self.rows = max(0, min(h, oy + radius + 1) - self.top)
+        self.cols = max(0, min(w, ox + radius + 1) - self.left)
+        self.bits = bytearray(self.rows * self.cols)
+
+    def __contains__(self, pos):
+        r = pos[0] - self.top
+        c = pos[1] - self.left
+        return 0 <= r < self.rows and 0 <= c < self.cols and self.bits[r * self.cols + c] == 1
+
+    def __iter__(self):
+        bits, cols, top, left = self.bits, self.cols, self.top, self.left
+        i = bits.find(1)
+        while i >= 0:
+            yield (top + i // cols, left + i % cols)
+            i = bits.find(1, i + 1)
+
+    def __len__(self):
+        return self.bits.count(1)
+
+    def __eq__(self, other):
+        if isinstance(other, FovMask):
+            return set(self) == set(other)
+        if isinstance(other, (set, frozenset)):
+            return set(self) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"FovMask(origin={self.origin}, radius={self.radius}, tiles={len(self)})"
+
+
+def opacity_bitmap(game_map):
+    """(h, w, bytes) with 1 where a tile blocks sight, indexed y * w + x."""
+    h = len(game_map)
+    w = len(game_map[0]) if h else 0
+    opacity = getattr(game_map, 'opacity', None)
+    if opacity is not None:  # TileGrid keeps this per level
+        return h, w, opacity()
+    return h, w, bytes(
+        1 if cell in BLOCKING_TERRAIN else 0 for row in game_map for cell in row
+    )
+
+
+def shadowcast(opaque, h, w, origin, radius):
+    """
+    Iterative shadowcasting over an opacity bitmap; returns a FovMask.
+
+    Same scan as compute_fov_recursive, with an explicit stack instead of
+    recursion. Slopes are kept as integer fractions (num, den > 0):
+    l = (2u + 1) / (2j - 1) and r = (2u - 1) / (2j + 1) for depth j and
+    column u = -dx, so every comparison is a cross-multiplication.
+    """
+    oy, ox = int(origin[0]), int(origin[1])
+    mask = FovMask((oy, ox), radius, h, w)
+    bits, cols, top, left = mask.bits, mask.cols, mask.top, mask.left
+    if 0 <= oy < h and 0 <= ox < w:
+        bits[(oy - top) * cols + (ox - left)] = 1
+    r2 = radius * radius
+
+    for xx, xy, yx, yy in _MULT:
+        # (first row, start num, start den, end num, end den)
+        stack = [(1, 1, 1, 0, 1)]
+        while stack:
+            row, sn, sd, en, ed = stack.pop()
+            if sn * ed < en * sd:
+                continue
+            for j in range(row, radius + 1):
+                ld = 2 * j - 1
+                rd = 2 * j + 1
+                blocked = False
+                nsn, nsd = sn, sd
+                for u in range(j, -1, -1):
+                    rn = 2 * u - 1
+                    if sn * rd < rn * sd:
+                        continue
+                    ln = 2 * u + 1
+                    if en * ld > ln * ed:
+                        break
+                    map_y = oy - u * xx - j * xy
+                    map_x = ox - u * yx - j * yy
+                    inside = 0 <= map_y < h and 0 <= map_x < w
+                    if inside and u * u + j * j <= r2:
+                        bits[(map_y - top) * cols + (map_x - left)] = 1
+                    blocking = not inside or opaque[map_y * w + map_x]
+                    if blocked:
+                        if blocking:
+                            nsn, nsd = rn, rd
+                            continue
+                        blocked = False
+                        sn, sd = nsn, nsd
+                    elif blocking and j < radius:
+                        blocked = True
+                        stack.append((j + 1, sn, sd, ln, ld))
+                        nsn, nsd = rn, rd
+                if blocked:
+                    break
+    return mask
+
+
 def compute_fov(game_map, origin, sight_range):
     """
-    Field of view via recursive shadowcasting.
+    Field of view via shadowcasting over the map's opacity bitmap.
+
+    origin: (y, x) or [y, x]
+    sight_range: max distance in tiles (inclusive). Uses circular radius.
+    Returns a FovMask of (y, x) (set-like), empty for an empty map or a
+    missing/negative range. Blocking tiles on a ray are included; tiles
+    behind them are not.
+    """
+    if not game_map or sight_range is None or sight_range < 0:
+        return FovMask((int(origin[0]), int(origin[1])), 0, 0, 0)
+    h, w, opaque = opacity_bitmap(game_map)
+    mask = shadowcast(opaque, h, w, origin, int(sight_range))
+    terrain_token = getattr(game_map, 'terrain_token', None)
+    if terrain_token is not None:
+        mask.token = terrain_token()
+    return mask
+
+
+def compute_fov_recursive(game_map, origin, sight_range):
+    """
+    Field of view via recursive shadowcasting (reference implementation).
+
+    compute_fov returns the same tiles; this is kept for equivalence tests
+    and the FOV micro-benchmark.
 
     origin: (y, x) or [y, x]
     sight_range: max distance in tiles (inclusive). Uses circular radius.
@@ -83,6 +231,17 @@ def compute_fov(game_map, origin, sight_range):
     radius = int(sight_range)
     visible = set()
 
+    opacity = getattr(game_map, 'opacity', None)
+    if opacity is not None:
+        # TileGrid: precomputed per-tile blocking bytes
+        opaque = opacity()
+
+        def blocks(y, x):
+            return not (0 <= y < h and 0 <= x < w) or opaque[y * w + x]
+    else:
+        def blocks(y, x):
+            return is_blocking(game_map, y, x)
+
     if 0 <= oy < h and 0 <= ox < w:
         visible.add((oy, ox))
 
@@ -112,13 +271,13 @@ def compute_fov(game_map, origin, sight_range):
                         visible.add((map_y, map_x))
 
                 if blocked:
-                    if is_blocking(game_map, map_y, map_x):
+                    if blocks(map_y, map_x):
                         new_start = r_slope
                         continue
                     blocked = False
                     start = new_start
                 else:
-                    if is_blocking(game_map, map_y, map_x) and j < radius:
+                    if blocks(map_y, map_x) and j < radius:
                         blocked = True
                         cast_light(j + 1, start, l_slope, xx, xy, yx, yy)
                         new_start = r_slope